@@ -0,0 +1,67 @@
+# benchmarks/bench_voting.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Measures per-sample latency of the EnsembleModel combination step
+#              (hard and soft voting) from 1e3 to 1e7 rows, alongside the legacy
+#              np.apply_along_axis hard vote for comparison.
+#
+# Usage: python -m benchmarks.bench_voting [--max-rows 10000000] [--legacy-max-rows 100000]
+
+import argparse
+import time
+
+import numpy as np
+
+from models.voting import hard_vote, soft_vote
+
+
+def legacy_hard_vote(predictions):
+    """The original per-sample hard vote, kept only as a baseline."""
+    return np.apply_along_axis(lambda x: np.bincount(x).argmax(), axis=0, arr=predictions.astype(int))
+
+
+def legacy_soft_vote(probas):
+    """The original soft vote combination (no class alignment)."""
+    return np.argmax(np.mean(probas, axis=0), axis=1)
+
+
+def time_call(fn, repeats=3):
+    """Best-of-n wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(max_rows=10**7, legacy_max_rows=10**5, n_models=3, n_classes=3, seed=42):
+    rng = np.random.default_rng(seed)
+    classes = np.arange(n_classes)
+    rows = [10**k for k in range(3, 8) if 10**k <= max_rows]
+
+    print(f"{'rows':>10} | {'hard ns/row':>12} | {'legacy hard':>12} | {'soft ns/row':>12} | {'legacy soft':>12}")
+    print("-" * 70)
+    for n in rows:
+        predictions = rng.integers(0, n_classes, size=(n_models, n))
+        probas = rng.random((n_models, n, n_classes))
+        probas /= probas.sum(axis=2, keepdims=True)
+        member_classes = [classes] * n_models
+
+        hard = time_call(lambda: hard_vote(predictions, classes)) / n * 1e9
+        soft = time_call(lambda: soft_vote(list(probas), member_classes, classes)) / n * 1e9
+        legacy_soft = time_call(lambda: legacy_soft_vote(probas)) / n * 1e9
+        if n <= legacy_max_rows:
+            legacy_hard = f"{time_call(lambda: legacy_hard_vote(predictions), repeats=1) / n * 1e9:12.1f}"
+        else:
+            legacy_hard = f"{'skipped':>12}"
+        print(f"{n:>10} | {hard:12.1f} | {legacy_hard} | {soft:12.1f} | {legacy_soft:12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ensemble vote combination.")
+    parser.add_argument("--max-rows", type=int, default=10**7)
+    parser.add_argument("--legacy-max-rows", type=int, default=10**5)
+    parser.add_argument("--models", type=int, default=3)
+    parser.add_argument("--classes", type=int, default=3)
+    args = parser.parse_args()
+    run(args.max_rows, args.legacy_max_rows, args.models, args.classes)
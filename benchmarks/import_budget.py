@@ -0,0 +1,108 @@
+# benchmarks/import_budget.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Import-time budget check for lightweight entry points. Each module is
+#              imported in a fresh interpreter; the check fails when the median import
+#              time exceeds its budget, when a heavy dependency (matplotlib, seaborn,
+#              pandas, sklearn) is pulled in eagerly, or when the import writes files.
+#
+# Usage:
+#   python -m benchmarks.import_budget
+#   python -m benchmarks.import_budget --repeats 7 --scale 2.0
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> (budget in ms, top-level packages it must not import)
+BUDGETS = {
+    "config": (50, ("numpy", "pandas", "sklearn", "matplotlib", "seaborn")),
+    "utils.instrumentation": (50, ("numpy", "pandas", "sklearn", "matplotlib", "seaborn")),
+    "models.ensemble_models": (400, ("pandas", "sklearn", "scipy", "matplotlib", "seaborn")),
+    "datasets.registry": (400, ("pandas", "sklearn", "matplotlib", "seaborn")),
+    "utils.results_store": (400, ("pandas", "sklearn", "matplotlib", "seaborn")),
+    "utils.visualization": (50, ("sklearn", "matplotlib", "seaborn")),
+    "dr.reducer": (400, ("pandas", "sklearn", "matplotlib", "seaborn")),
+    "eda.perform_eda": (400, ("pandas", "matplotlib", "seaborn")),
+}
+
+HEAVY = ("numpy", "pandas", "sklearn", "scipy", "matplotlib", "seaborn")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"ms": elapsed * 1e3, "loaded": loaded}}))
+"""
+
+
+def _snapshot(directory):
+    files = set()
+    for base, _, names in os.walk(directory):
+        if "__pycache__" in base or os.sep + ".git" in base:
+            continue
+        files.update(os.path.join(base, name) for name in names)
+    return files
+
+
+def measure(module, repeats=5):
+    """
+    Imports `module` in `repeats` fresh interpreters (after one warm-up for the
+    bytecode cache).
+
+    Returns:
+    dict: median_ms, min_ms, loaded (heavy packages present after import)
+    """
+    code = _PROBE.format(module=module, heavy=HEAVY)
+    env = {**os.environ, "PYTHONPATH": ROOT_DIR, "MPLBACKEND": "Agg"}
+    env.pop("ENSEMBLE_TRACE", None)
+    runs = []
+    for _ in range(repeats + 1):
+        out = subprocess.run([sys.executable, "-c", code], cwd=tempfile.gettempdir(), env=env,
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    times = sorted(r["ms"] for r in runs[1:])
+    return {"median_ms": times[len(times) // 2], "min_ms": times[0], "loaded": runs[-1]["loaded"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check import-time budgets.")
+    parser.add_argument("--modules", nargs="+", default=list(BUDGETS), choices=list(BUDGETS))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply every budget (slow CI machines)")
+    args = parser.parse_args(argv)
+
+    before = _snapshot(ROOT_DIR)
+    failures = []
+    for module in args.modules:
+        budget_ms, forbidden = BUDGETS[module]
+        budget_ms *= args.scale
+        result = measure(module, args.repeats)
+        eager = [name for name in result["loaded"] if name in forbidden]
+        ok = result["median_ms"] <= budget_ms and not eager
+        print(f"{module:<28} {result['median_ms']:8.1f} ms (budget {budget_ms:6.0f} ms)"
+              f"  {'ok' if ok else 'FAIL'}" + (f"  eager: {', '.join(eager)}" if eager else ""))
+        if not ok:
+            failures.append(module)
+
+    created = sorted(os.path.relpath(p, ROOT_DIR) for p in _snapshot(ROOT_DIR) - before)
+    if created:
+        print(f" Imports created files: {created}")
+        failures.append("side effects")
+
+    if failures:
+        print(f" Import budget exceeded: {failures}")
+        return 1
+    print(" All imports within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# benchmarks/run_benchmarks.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Benchmark suite for the ensemble hot paths (EnsembleModel fit/predict per
+#              strategy, EDA, DR, evaluation and the full workflow) on synthetic data.
+#              Each case runs in a fresh process and reports wall time, throughput and
+#              peak memory to a JSON file; --compare flags regressions against a baseline.
+#
+# Usage:
+#   python -m benchmarks.run_benchmarks --rows 10000 100000 --members 3 10 --output bench.json
+#   python -m benchmarks.run_benchmarks --quick --compare bench_baseline.json
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+STRATEGIES = ("hard_voting", "soft_voting", "averaging")
+CASES = ("fit", "fit_stream", "predict", "perform_eda", "reduce_dimensionality",
+         "evaluate_classification", "evaluate_many", "boosting_predict", "run_workflow")
+
+
+# === Synthetic data and members ===
+
+def make_data(rows, features, classes, regression=False, seed=42):
+    from sklearn.datasets import make_classification, make_regression
+
+    if regression:
+        return make_regression(n_samples=rows, n_features=features, noise=1.0, random_state=seed)
+    return make_classification(n_samples=rows, n_features=features,
+                               n_informative=max(2, min(features, 2 * classes)),
+                               n_classes=classes, random_state=seed)
+
+
+def make_members(strategy, n_members):
+    """Builds n_members estimators suitable for the strategy, cycling model types."""
+    from sklearn.linear_model import LogisticRegression, RidgeClassifier, SGDClassifier, Ridge, SGDRegressor
+
+    if strategy == "averaging":
+        pool = [lambda i: Ridge(alpha=1.0 + i), lambda i: SGDRegressor(random_state=i)]
+    elif strategy == "soft_voting":
+        pool = [lambda i: LogisticRegression(C=1.0 / (i + 1), max_iter=300),
+                lambda i: SGDClassifier(loss="log_loss", random_state=i)]
+    else:
+        pool = [lambda i: LogisticRegression(C=1.0 / (i + 1), max_iter=300),
+                lambda i: RidgeClassifier(alpha=1.0 + i),
+                lambda i: SGDClassifier(random_state=i)]
+    return {f"m{i}": pool[i % len(pool)](i) for i in range(n_members)}
+
+
+# === Cases: each returns (callable to time, rows processed per call) ===
+
+def setup_case(case, params):
+    rows, features, classes = params["rows"], params["features"], params["classes"]
+    strategy, members = params.get("strategy"), params.get("members")
+
+    if case in ("fit", "fit_stream", "predict"):
+        from models.ensemble_models import EnsembleModel
+
+        X, y = make_data(rows, features, classes, regression=strategy == "averaging")
+        ensemble = EnsembleModel(strategy=strategy, models=make_members(strategy, members))
+        if case == "fit":
+            return lambda: ensemble.fit(X, y), rows
+        if case == "fit_stream":
+            return lambda: ensemble.fit_stream((X, y), batch_size=8192), rows
+        ensemble.fit(X, y)
+        return lambda: ensemble.predict(X), rows
+
+    if case in ("perform_eda", "reduce_dimensionality"):
+        import pandas as pd
+
+        X, y = make_data(rows, features, classes)
+        df = pd.DataFrame(X, columns=[f"feature_{i}" for i in range(features)])
+        df["target"] = y
+        if case == "perform_eda":
+            from eda.perform_eda import perform_eda
+            return lambda: perform_eda(df, dataset_name="bench", mode=params["eda_mode"],
+                                       plots=params["eda_mode"] == "full"), rows
+        from dr.reducer import reduce_dimensionality
+        return lambda: reduce_dimensionality(df, label_col="target", n_components=2), rows
+
+    if case == "evaluate_classification":
+        from utils.evaluation import evaluate_classification
+
+        rng = np.random.default_rng(0)
+        y_true = rng.integers(0, classes, rows)
+        y_pred = np.where(rng.random(rows) < 0.8, y_true, rng.integers(0, classes, rows))
+        return lambda: evaluate_classification(y_true, y_pred, verbose=False), rows
+
+    if case == "evaluate_many":
+        from utils.evaluation import evaluate_many
+
+        # 3 strategies x 5 folds x 4 seeds scored in one call
+        rng = np.random.default_rng(0)
+        y_true = rng.integers(0, classes, rows)
+        folds = rng.integers(0, 5, rows)
+        y_preds = np.where(rng.random((12, rows)) < 0.8, y_true, rng.integers(0, classes, (12, rows)))
+        return lambda: evaluate_many(y_true, y_preds, folds=folds).fold_accuracy(), 12 * rows
+
+    if case == "boosting_predict":
+        from models.boosting import BoostedEnsemble
+        from sklearn.tree import DecisionTreeRegressor
+
+        # 500 gradient stages (depth-3 trees) fit on a capped sample, scored over all rows
+        X, y = make_data(rows, features, classes, regression=True)
+        n_fit = min(rows, 5000)
+        booster = BoostedEnsemble({"tree": DecisionTreeRegressor(max_depth=3)}, algorithm="gradient",
+                                  n_estimators=500, learning_rate=0.05, random_state=0)
+        booster.fit(X[:n_fit], y[:n_fit])
+        return lambda: booster.predict(X), rows
+
+    if case == "run_workflow":
+        from datasets.registry import register_dataset
+        from mainworkflow import run_workflow
+
+        X, y = make_data(rows, features, classes)
+        path = os.path.join(tempfile.mkdtemp(prefix="ensemble_bench_"), "data.npz")
+        np.savez(path, X=X, y=y)
+        name = f"bench_{rows}x{features}x{classes}"
+        register_dataset(name, path)
+        return lambda: run_workflow(name, eda_mode="fast"), rows
+
+    raise ValueError(f"Unknown benchmark case '{case}'. Options: {CASES}")
+
+
+def run_case(case, params, repeats):
+    """Runs one case in the current (fresh) process and returns its record."""
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    fn, rows = setup_case(case, params)
+
+    fn()  # warm-up: imports, caches, BLAS thread pools
+    walls = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        walls.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak_alloc = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(walls)
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "case": case,
+        "params": params,
+        "name": benchmark_name(case, params),
+        "wall_s": best,
+        "wall_median_s": float(np.median(walls)),
+        "throughput_rows_s": rows / best if best > 0 else None,
+        "peak_rss_mb": peak_rss_kb / 1024 if sys.platform != "darwin" else peak_rss_kb / 1024 ** 2,
+        "peak_alloc_mb": peak_alloc / 1024 ** 2,
+    }
+
+
+def _run_case_child(args):
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+
+    # Keep the table readable: workflow prints/log lines are not benchmark output
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        return run_case(*args)
+
+
+def benchmark_name(case, params):
+    keys = ("strategy", "members", "eda_mode", "rows", "features", "classes")
+    return case + "[" + ",".join(f"{k}={params[k]}" for k in keys if params.get(k) is not None) + "]"
+
+
+def build_grid(cases, rows, features, classes, members, eda_modes):
+    """Expands the CLI options into (case, params) pairs."""
+    grid = []
+    for case in cases:
+        for r, f, c in itertools.product(rows, features, classes):
+            base = {"rows": r, "features": f, "classes": c}
+            if case in ("fit", "fit_stream", "predict"):
+                for strategy, m in itertools.product(STRATEGIES, members):
+                    grid.append((case, {**base, "strategy": strategy, "members": m}))
+            elif case == "perform_eda":
+                for mode in eda_modes:
+                    grid.append((case, {**base, "eda_mode": mode}))
+            else:
+                grid.append((case, base))
+    return grid
+
+
+# === Results file and regression check ===
+
+def environment():
+    import sklearn
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance=0.2, metrics=("wall_s", "peak_rss_mb")):
+    """
+    Flags cases whose metrics grew by more than `tolerance` (fraction) vs the baseline.
+
+    Returns:
+    list: Regression dicts (name, metric, baseline, current, change)
+    """
+    previous = {r["name"]: r for r in baseline["results"]}
+    regressions = []
+    for record in results:
+        old = previous.get(record["name"])
+        if old is None:
+            continue
+        for metric in metrics:
+            if not old.get(metric) or record.get(metric) is None:
+                continue
+            change = record[metric] / old[metric] - 1.0
+            if change > tolerance:
+                regressions.append({"name": record["name"], "metric": metric,
+                                    "baseline": old[metric], "current": record[metric],
+                                    "change": change})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ensemble hot paths.")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    parser.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000])
+    parser.add_argument("--features", nargs="+", type=int, default=[20])
+    parser.add_argument("--classes", nargs="+", type=int, default=[3])
+    parser.add_argument("--members", nargs="+", type=int, default=[3, 10])
+    parser.add_argument("--eda-modes", nargs="+", default=["fast"], choices=["fast", "full"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="Small grid for smoke runs")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.rows, args.members, args.repeats = [2_000], [3], 1
+    grid = build_grid(args.cases, args.rows, args.features, args.classes, args.members, args.eda_modes)
+
+    # A fresh process per case keeps peak RSS and import state independent
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for case, params in grid:
+        with context.Pool(1) as pool:
+            record = pool.apply(_run_case_child, ((case, params, args.repeats),))
+        results.append(record)
+        print(f"{record['name']:<70} {record['wall_s'] * 1e3:10.2f} ms "
+              f"{record['throughput_rows_s'] or 0:14.0f} rows/s {record['peak_rss_mb']:8.1f} MB")
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f" Saved benchmark results to: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f" REGRESSION {r['name']} {r['metric']}: {r['baseline']:.4g} -> "
+                  f"{r['current']:.4g} (+{r['change']:.0%})")
+        if regressions:
+            return 1
+        print(f" No regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
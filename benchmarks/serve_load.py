@@ -0,0 +1,159 @@
+# benchmarks/serve_load.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Load generator for serving.server. Opens N keep-alive connections that
+#              each send requests of a few random rows back to back, then reports client
+#              latency p50/p99 and throughput next to the server's own /stats. With
+#              --artifact it starts a local server per --max-batch-size value, so
+#              micro-batching can be compared against unbatched scoring (size 1).
+#
+# Usage:
+#   python -m benchmarks.serve_load --port 8080 --concurrency 32 --requests 2000
+#   python -m benchmarks.serve_load --artifact results/models/iris_hard_voting --max-batch-size 1 64 256
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+async def _open(host, port, unix_path):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def _call(reader, writer, method, path, payload=None):
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def _client(host, port, unix_path, n_requests, rows, n_features, endpoint, seed, latencies):
+    rng = np.random.default_rng(seed)
+    reader, writer = await _open(host, port, unix_path)
+    errors = 0
+    try:
+        for _ in range(n_requests):
+            payload = {"instances": rng.normal(size=(rows, n_features)).round(4).tolist()}
+            start = time.perf_counter()
+            status, _ = await _call(reader, writer, "POST", endpoint, payload)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+    finally:
+        writer.close()
+    return errors
+
+
+async def run_load(host="127.0.0.1", port=8080, unix_path=None, concurrency=16, requests=1000,
+                   rows=1, endpoint="/predict", seed=0):
+    """
+    Sends `requests` requests spread over `concurrency` connections.
+
+    :return: dict with client p50/p99 (ms), requests/s, rows/s, errors and the server /stats
+    """
+    reader, writer = await _open(host, port, unix_path)
+    _, health = await _call(reader, writer, "GET", "/health")
+    writer.close()
+    n_features = health.get("n_features") or 4
+
+    latencies = []
+    per_client = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    errors = await asyncio.gather(*[
+        _client(host, port, unix_path, n, rows, n_features, endpoint, seed + i, latencies)
+        for i, n in enumerate(per_client) if n])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await _open(host, port, unix_path)
+    _, server_stats = await _call(reader, writer, "GET", "/stats")
+    writer.close()
+    p50, p99 = np.percentile(np.asarray(latencies) * 1e3, [50, 99])
+    return {"concurrency": concurrency, "requests": len(latencies), "rows_per_request": rows,
+            "errors": int(sum(errors)), "p50_ms": float(p50), "p99_ms": float(p99),
+            "requests_per_s": len(latencies) / elapsed, "rows_per_s": len(latencies) * rows / elapsed,
+            "server": server_stats}
+
+
+def _start_server(artifact, unix_path, max_batch_size, max_wait_ms, workers, worker_kind):
+    cmd = [sys.executable, "-m", "serving.server", "--artifact", artifact, "--unix", unix_path,
+           "--max-batch-size", str(max_batch_size), "--max-wait-ms", str(max_wait_ms),
+           "--workers", str(workers), "--worker-kind", worker_kind]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    # The server prints one line once it is listening
+    if not process.stdout.readline():
+        raise RuntimeError(f"Server failed to start: {' '.join(cmd)}")
+    return process
+
+
+def print_result(label, result):
+    server = result["server"]
+    print(f"{label:<22} client p50 {result['p50_ms']:7.2f} ms | p99 {result['p99_ms']:7.2f} ms | "
+          f"{result['requests_per_s']:8.0f} req/s | server p50 {server['p50_ms']:6.2f} ms "
+          f"p99 {server['p99_ms']:6.2f} ms | mean batch {server['mean_batch_rows']:6.1f} rows | "
+          f"errors {result['errors']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the local scoring server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="Unix socket of a running server")
+    parser.add_argument("--artifact", help="Start a local server for this artifact per batch size")
+    parser.add_argument("--max-batch-size", nargs="+", type=int, default=[1, 256])
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--worker-kind", default="thread", choices=["thread", "process"])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=1, help="Rows per request")
+    parser.add_argument("--endpoint", default="/predict", choices=["/predict", "/predict_proba"])
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    if not args.artifact:
+        result = asyncio.run(run_load(args.host, args.port, args.unix, args.concurrency,
+                                      args.requests, args.rows, args.endpoint))
+        print_result("server", result)
+        results.append(result)
+    else:
+        for size in args.max_batch_size:
+            unix_path = os.path.join(tempfile.gettempdir(), f"ensemble_serve_{os.getpid()}.sock")
+            process = _start_server(args.artifact, unix_path, size, args.max_wait_ms,
+                                    args.workers, args.worker_kind)
+            try:
+                result = asyncio.run(run_load(unix_path=unix_path, concurrency=args.concurrency,
+                                              requests=args.requests, rows=args.rows,
+                                              endpoint=args.endpoint))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+            result["max_batch_size"] = size
+            print_result(f"max_batch_size={size}", result)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f" Saved load test results to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
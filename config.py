@@ -1,6 +1,9 @@
 # config.py
 # Authors: David Blodgett and Microsoft Copilot
 # Description: Central configuration module for setting paths, logging, and shared constants.
+#              Importing it has no side effects: output directories are created by the
+#              code that writes into them, and the timestamped log file is only created
+#              when the first record is logged (LOG_FILE resolves on first access).
 
 import os
 import logging
@@ -13,36 +16,61 @@ RESULTS_DIR = os.path.join(BASE_DIR, "results")
 PLOTS_DIR = os.path.join(BASE_DIR, "plots")
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
 
-# Ensure required directories exist
-for path in [RESULTS_DIR, PLOTS_DIR, LOGS_DIR]:
-    os.makedirs(path, exist_ok=True)
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-# === Logging Configuration ===
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-LOG_FILE = os.path.join(LOGS_DIR, f"experiment_log_{timestamp}.log")
+_log_file = None
+
+
+def ensure_dirs():
+    """Creates the results, plots and logs directories."""
+    for path in [RESULTS_DIR, PLOTS_DIR, LOGS_DIR]:
+        os.makedirs(path, exist_ok=True)
+
+
+def get_log_file():
+    """Path of this process's log file, timestamped on first use."""
+    global _log_file
+    if _log_file is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        _log_file = os.path.join(LOGS_DIR, f"experiment_log_{timestamp}.log")
+    return _log_file
+
+
+class _DeferredFileHandler(logging.FileHandler):
+    """FileHandler that creates LOGS_DIR and the log file on the first emitted record."""
+
+    def __init__(self):
+        super().__init__(os.path.join(LOGS_DIR, "experiment_log.log"), mode="w", delay=True)
+
+    def _open(self):
+        self.baseFilename = get_log_file()
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
 
+
+def __getattr__(name):
+    # Module-level lazy attribute: `from config import LOG_FILE` fixes the timestamp then
+    if name == "LOG_FILE":
+        return get_log_file()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# === Logging Configuration ===
 # Create a named logger
 logger = logging.getLogger("ensemble_logger")
 logger.setLevel(logging.INFO)
 
-# File handler
-file_handler = logging.FileHandler(LOG_FILE, mode="w")
-file_handler.setFormatter(logging.Formatter(
-    "%(asctime)s [%(levelname)s] %(message)s",
-    "%Y-%m-%d %H:%M:%S"
-))
-
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(logging.Formatter(
-    "%(asctime)s [%(levelname)s] %(message)s",
-    "%Y-%m-%d %H:%M:%S"
-))
-
 # Attach handlers if they haven’t already been added
 if not logger.handlers:
+    file_handler = _DeferredFileHandler()
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
 
 # === Shared Constants (expandable as needed) ===
-RANDOM_SEED = 42
\ No newline at end of file
+RANDOM_SEED = 42
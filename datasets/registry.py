@@ -0,0 +1,317 @@
+# datasets/registry.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Dataset registry with an on-disk binary cache. CSV, Parquet and NumPy
+#              sources are converted once (in chunks) to raw row-major arrays plus a
+#              JSON metadata sidecar, and reopened zero-copy as read-only memmaps on
+#              every later load. Train/test splits are returned as index arrays.
+
+import json
+import os
+
+import numpy as np
+
+from config import BASE_DIR
+
+CACHE_DIR = os.path.join(BASE_DIR, "datasets", "cache")
+CACHE_FORMAT_VERSION = 1
+CSV_CHUNK_ROWS = 100_000
+
+# name -> spec dict (see register_dataset)
+DATASETS = {}
+
+
+def register_dataset(name, source=None, label_col="target", fmt=None, loader=None,
+                     dtype="float64", **read_kwargs):
+    """
+    Registers a dataset under a name so it can be loaded with load_dataset(name).
+
+    Parameters:
+        name (str): Registry key, also used as the cache folder name
+        source (str): Path to a .csv, .parquet, .npy or .npz file
+        label_col (str|int): Label column name (CSV/Parquet) or index (.npy)
+        fmt (str): Overrides the format inferred from the file extension
+        loader (callable): Alternative to `source`; returns a DataFrame with the label column
+        dtype (str): Feature dtype stored in the cache
+        **read_kwargs: Passed to pandas.read_csv / read_parquet
+    """
+    if (source is None) == (loader is None):
+        raise ValueError("Provide exactly one of `source` or `loader`.")
+    if source is not None and fmt is None:
+        fmt = os.path.splitext(source)[1].lstrip(".").lower()
+    if fmt not in (None, "csv", "parquet", "npy", "npz"):
+        raise ValueError(f"Unsupported dataset format '{fmt}'.")
+    DATASETS[name] = {
+        "source": source, "label_col": label_col, "fmt": fmt, "loader": loader,
+        "dtype": dtype, "read_kwargs": read_kwargs,
+    }
+
+
+def _iris_frame():
+    from sklearn.datasets import load_iris
+
+    iris = load_iris(as_frame=True)
+    df = iris.data.copy()
+    df.columns = [f"feature_{i}" for i in range(df.shape[1])]
+    df["target"] = iris.target
+    return df
+
+
+def _diabetes_frame():
+    from sklearn.datasets import load_diabetes
+
+    diabetes = load_diabetes(as_frame=True)
+    df = diabetes.data.copy()
+    df.columns = [f"feature_{i}" for i in range(df.shape[1])]
+    df["target"] = diabetes.target
+    return df
+
+
+register_dataset("iris", loader=_iris_frame)
+register_dataset("diabetes", loader=_diabetes_frame)
+
+
+class Dataset:
+    """
+    A cached dataset: X is a read-only memmap, y a small in-memory label array.
+    """
+
+    def __init__(self, name, X, y, meta):
+        self.name = name
+        self.X = X
+        self.y = y
+        self.meta = meta
+        self.feature_names = meta["feature_names"]
+        self.label_col = meta["label_col"]
+
+    @property
+    def shape(self):
+        return self.X.shape
+
+    def split(self, test_size=0.25, random_state=42, stratify=True, sort=False):
+        """
+        Splits row indices into train/test without touching X.
+
+        Parameters:
+            test_size (float): Proportion of rows in the test split
+            random_state (int): Seed for the shuffle
+            stratify (bool): Preserve class proportions in both splits
+            sort (bool): Sort each index array so memmap reads are sequential
+
+        Returns:
+            DatasetSplit
+        """
+        from sklearn.model_selection import train_test_split
+
+        indices = np.arange(self.X.shape[0])
+        train_idx, test_idx = train_test_split(
+            indices, test_size=test_size, random_state=random_state,
+            stratify=self.y if stratify else None)
+        if sort:
+            train_idx.sort()
+            test_idx.sort()
+        return DatasetSplit(self, train_idx, test_idx)
+
+    def iter_batches(self, batch_size=65536, indices=None):
+        """
+        Yields (X_batch, y_batch) chunks, reading only one chunk of X at a time.
+
+        Parameters:
+            batch_size (int): Rows per chunk
+            indices (array-like): Optional subset of rows, e.g. split.train_idx
+        """
+        n_rows = self.X.shape[0] if indices is None else len(indices)
+        for start in range(0, n_rows, batch_size):
+            stop = min(start + batch_size, n_rows)
+            rows = slice(start, stop) if indices is None else indices[start:stop]
+            yield np.asarray(self.X[rows]), self.y[rows]
+
+
+class DatasetSplit:
+    """
+    Train/test split held as index arrays into a Dataset. Rows are only gathered
+    from the memmap when X_train/X_test are accessed.
+    """
+
+    def __init__(self, dataset, train_idx, test_idx):
+        self.dataset = dataset
+        self.train_idx = train_idx
+        self.test_idx = test_idx
+
+    @property
+    def X_train(self):
+        return self.dataset.X[self.train_idx]
+
+    @property
+    def X_test(self):
+        return self.dataset.X[self.test_idx]
+
+    @property
+    def y_train(self):
+        return self.dataset.y[self.train_idx]
+
+    @property
+    def y_test(self):
+        return self.dataset.y[self.test_idx]
+
+    def as_tuple(self):
+        """Materializes (X_train, X_test, y_train, y_test), like load_iris_data()."""
+        return self.X_train, self.X_test, self.y_train, self.y_test
+
+
+def _source_signature(spec):
+    """Identifies the source version; a change invalidates the cache."""
+    if spec["loader"] is not None:
+        loader = spec["loader"]
+        return {"loader": f"{loader.__module__}.{loader.__qualname__}"}
+    stat = os.stat(spec["source"])
+    return {"source": os.path.abspath(spec["source"]), "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns}
+
+
+def _iter_source_frames(spec):
+    """Yields DataFrame chunks (features + label column) from a CSV/Parquet/loader source."""
+    import pandas as pd
+
+    if spec["loader"] is not None:
+        yield spec["loader"]()
+    elif spec["fmt"] == "csv":
+        yield from pd.read_csv(spec["source"], chunksize=CSV_CHUNK_ROWS, **spec["read_kwargs"])
+    elif spec["fmt"] == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            # Without pyarrow, fall back to whatever engine pandas can find
+            yield pd.read_parquet(spec["source"], **spec["read_kwargs"])
+            return
+        read_kwargs = dict(spec["read_kwargs"])
+        columns = read_kwargs.pop("columns", None)
+        if read_kwargs:
+            # Options iter_batches has no equivalent for (filters, engine, ...) go through pandas
+            yield pd.read_parquet(spec["source"], columns=columns, **read_kwargs)
+            return
+        for batch in pq.ParquetFile(spec["source"]).iter_batches(batch_size=CSV_CHUNK_ROWS,
+                                                                 columns=columns):
+            yield batch.to_pandas()
+
+
+def _iter_numpy_source(spec):
+    """Yields (X_chunk, y_chunk, feature_names) from a .npy/.npz source."""
+    if spec["fmt"] == "npz":
+        with np.load(spec["source"]) as archive:
+            X, y = archive["X"], archive["y"]
+        label_col = spec["label_col"] if isinstance(spec["label_col"], str) else "target"
+        names = [f"feature_{i}" for i in range(X.shape[1])]
+        for start in range(0, X.shape[0], CSV_CHUNK_ROWS):
+            yield X[start:start + CSV_CHUNK_ROWS], y[start:start + CSV_CHUNK_ROWS], names, label_col
+        return
+
+    data = np.load(spec["source"], mmap_mode="r")
+    label = spec["label_col"] if isinstance(spec["label_col"], int) else data.shape[1] - 1
+    features = [i for i in range(data.shape[1]) if i != label % data.shape[1]]
+    names = [f"feature_{i}" for i in range(len(features))]
+    for start in range(0, data.shape[0], CSV_CHUNK_ROWS):
+        # Slice the rows first so fancy indexing only copies one chunk of the memmap
+        rows = data[start:start + CSV_CHUNK_ROWS]
+        yield rows[:, features], rows[:, label], names, spec["label_col"]
+
+
+def _build_cache(name, spec, cache_path):
+    """Converts the source to X.bin / y.npy / meta.json, one chunk at a time."""
+    os.makedirs(cache_path, exist_ok=True)
+    # Per-process staging names (like persistence.save) so concurrent builders don't clobber
+    # each other's partial files; the last os.replace wins with a complete cache
+    suffix = f".tmp-{os.getpid()}"
+    x_tmp = os.path.join(cache_path, "X.bin" + suffix)
+    y_tmp = os.path.join(cache_path, "y.npy" + suffix)
+    meta_tmp = os.path.join(cache_path, "meta.json" + suffix)
+    dtype = np.dtype(spec["dtype"])
+
+    if spec["fmt"] in ("npy", "npz"):
+        chunks = _iter_numpy_source(spec)
+    else:
+        label_col = spec["label_col"]
+        chunks = ((frame.drop(columns=[label_col]).to_numpy(dtype=dtype),
+                   frame[label_col].to_numpy(), [str(c) for c in frame.columns if c != label_col],
+                   label_col)
+                  for frame in _iter_source_frames(spec))
+
+    n_rows = 0
+    feature_names, label_col = None, spec["label_col"]
+    y_chunks = []
+    try:
+        with open(x_tmp, "wb") as f:
+            for X_chunk, y_chunk, names, label_col in chunks:
+                feature_names = feature_names or names
+                f.write(np.ascontiguousarray(X_chunk, dtype=dtype).tobytes())
+                y_chunks.append(np.asarray(y_chunk))
+                n_rows += len(y_chunk)
+
+        y = np.concatenate(y_chunks) if y_chunks else np.empty(0)
+        classes = None
+        if y.dtype.kind in "OUS":
+            classes, y = np.unique(y.astype(str), return_inverse=True)
+            classes = classes.tolist()
+        with open(y_tmp, "wb") as f:
+            np.save(f, y)
+    except BaseException:
+        for path in (x_tmp, y_tmp):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    meta = {
+        "format_version": CACHE_FORMAT_VERSION,
+        "name": name,
+        "signature": _source_signature(spec),
+        "n_rows": n_rows,
+        "n_features": len(feature_names or []),
+        "dtype": dtype.str,
+        "feature_names": feature_names or [],
+        "label_col": label_col,
+        "classes": classes,
+    }
+    with open(meta_tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    # meta.json goes last: readers treat its presence as "cache complete"
+    os.replace(x_tmp, os.path.join(cache_path, "X.bin"))
+    os.replace(y_tmp, os.path.join(cache_path, "y.npy"))
+    os.replace(meta_tmp, os.path.join(cache_path, "meta.json"))
+    return meta
+
+
+def _read_meta(cache_path):
+    meta_path = os.path.join(cache_path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def load_dataset(name, cache_dir=None, refresh=False):
+    """
+    Loads a registered dataset, converting it to the binary cache on first use.
+
+    Parameters:
+        name (str): Registered dataset name
+        cache_dir (str): Cache root, defaults to datasets/cache
+        refresh (bool): Rebuild the cache even if it looks current
+
+    Returns:
+        Dataset: X as a read-only memmap, y in memory
+    """
+    if name not in DATASETS:
+        raise KeyError(f"Unknown dataset '{name}'. Registered: {sorted(DATASETS)}")
+    spec = DATASETS[name]
+    cache_path = os.path.join(cache_dir or CACHE_DIR, name)
+
+    meta = None if refresh else _read_meta(cache_path)
+    if (meta is None or meta.get("format_version") != CACHE_FORMAT_VERSION
+            or meta.get("signature") != _source_signature(spec)):
+        meta = _build_cache(name, spec, cache_path)
+
+    X = np.memmap(os.path.join(cache_path, "X.bin"), dtype=np.dtype(meta["dtype"]), mode="r",
+                  shape=(meta["n_rows"], meta["n_features"]))
+    y = np.load(os.path.join(cache_path, "y.npy"))
+    if meta["classes"] is not None:
+        y = np.asarray(meta["classes"])[y]
+    return Dataset(name, X, y, meta)
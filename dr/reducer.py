@@ -1,15 +1,155 @@
 # dr/reducer.py
 # Authors: David Blodgett and Microsoft Copilot
 # Description: Applies unsupervised dimensionality reduction (PCA) and saves variance plot.
-#              Returns a transformed DataFrame with labels preserved.
+#              Provides a fit-once DimensionalityReducer (full, randomized or
+#              incremental PCA) that can be reused on test/inference data and
+#              persisted, and returns a transformed DataFrame with labels preserved.
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
 import os
-from sklearn.decomposition import PCA
+import pickle
 
-def reduce_dimensionality(df, label_col="target", n_components=2):
+from utils.instrumentation import instrument
+from utils.plot_pool import submit_plot
+
+REDUCER_METHODS = ("pca", "randomized", "incremental")
+
+
+class DimensionalityReducer:
+    """
+    Fit-once PCA wrapper. 'pca' uses a full SVD, 'randomized' a randomized SVD
+    for wide data, and 'incremental' streams chunks through IncrementalPCA so
+    the data never has to fit in memory at once.
+    """
+
+    def __init__(self, n_components=2, method="pca", batch_size=None, random_state=None):
+        """
+        Parameters:
+            n_components (int): Number of components to retain
+            method (str): 'pca', 'randomized' or 'incremental'
+            batch_size (int): Rows per chunk for 'incremental' fit/transform
+            random_state (int): Seed for the randomized solver
+        """
+        if method not in REDUCER_METHODS:
+            raise ValueError(f"Unknown DR method '{method}'. Options: {REDUCER_METHODS}")
+        self.n_components = n_components
+        self.method = method
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.model = None
+        self.feature_names = None
+
+    def _build(self, n_features):
+        from sklearn.decomposition import PCA, IncrementalPCA
+
+        n_components = min(self.n_components, n_features)
+        if self.method == "incremental":
+            return IncrementalPCA(n_components=n_components, batch_size=self.batch_size)
+        if self.method == "randomized":
+            return PCA(n_components=n_components, svd_solver="randomized",
+                       random_state=self.random_state)
+        return PCA(n_components=n_components)
+
+    def _remember_columns(self, X):
+        if hasattr(X, "columns"):
+            self.feature_names = [str(c) for c in X.columns]
+
+    def _check_columns(self, X):
+        """Reorders DataFrame columns to the fitted order (errors if any are missing)."""
+        if self.feature_names is not None and hasattr(X, "columns"):
+            return X[self.feature_names]
+        return X
+
+    def fit(self, X):
+        """
+        Fits the reducer once. Incremental reducers read X in batch_size chunks,
+        so X may be a read-only memmap larger than memory.
+        """
+        self._remember_columns(X)
+        self.model = self._build(np.shape(X)[1])
+        if self.method == "incremental":
+            batch_size = self.batch_size or max(5 * self.model.n_components, 10000)
+            for start in range(0, np.shape(X)[0], batch_size):
+                chunk = X.iloc[start:start + batch_size] if hasattr(X, "iloc") else X[start:start + batch_size]
+                self.model.partial_fit(np.asarray(chunk))
+        else:
+            self.model.fit(np.asarray(X))
+        return self
+
+    def partial_fit(self, X_chunk):
+        """
+        Updates an incremental reducer with one chunk, e.g. from Dataset.iter_batches().
+        """
+        if self.method != "incremental":
+            raise ValueError("partial_fit is only available for method='incremental'.")
+        if self.model is None:
+            self._remember_columns(X_chunk)
+            self.model = self._build(np.shape(X_chunk)[1])
+        self.model.partial_fit(np.asarray(self._check_columns(X_chunk)))
+        return self
+
+    def transform(self, X, batch_size=None):
+        """
+        Projects X with the fitted components, optionally chunk by chunk.
+        """
+        if self.model is None:
+            raise ValueError("Reducer is not fitted. Call fit() first.")
+        X = self._check_columns(X)
+        batch_size = batch_size or self.batch_size
+        if not batch_size or np.shape(X)[0] <= batch_size:
+            return self.model.transform(np.asarray(X))
+        out = np.empty((np.shape(X)[0], self.n_components_))
+        for start in range(0, np.shape(X)[0], batch_size):
+            chunk = X.iloc[start:start + batch_size] if hasattr(X, "iloc") else X[start:start + batch_size]
+            out[start:start + batch_size] = self.model.transform(np.asarray(chunk))
+        return out
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
+
+    @property
+    def n_components_(self):
+        return self.model.n_components_
+
+    @property
+    def explained_variance_ratio_(self):
+        return self.model.explained_variance_ratio_
+
+    @property
+    def component_names(self):
+        return [f"PC{i+1}" for i in range(self.n_components_)]
+
+    def save(self, path):
+        """Pickles the fitted reducer so scoring jobs can reuse it without refitting."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def load(path):
+        """Loads a reducer saved with save()."""
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def render_scree(path, component_names, ratios):
+    """Draws the explained-variance scree plot to `path` (runs in a plot worker)."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(6, 4))
+    sns.barplot(x=component_names, y=ratios)
+    plt.title("PCA Explained Variance Ratio")
+    plt.ylabel("Ratio")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+@instrument("dr.reduce_dimensionality")
+def reduce_dimensionality(df, label_col="target", n_components=2, method="pca",
+                          batch_size=None, return_reducer=False):
     """
     Applies PCA to reduce dataset dimensionality and saves variance plot.
 
@@ -17,45 +157,43 @@ def reduce_dimensionality(df, label_col="target", n_components=2):
         df (pd.DataFrame): Full dataset with features + label
         label_col (str): Name of label column to preserve
         n_components (int): Number of PCA components to retain
+        method (str): 'pca', 'randomized' or 'incremental' (see DimensionalityReducer)
+        batch_size (int): Chunk size for the incremental reducer
+        return_reducer (bool): Also return the fitted reducer for test/inference data
 
     Returns:
         pd.DataFrame: PCA-reduced features + original label column
+        (pd.DataFrame, DimensionalityReducer) when return_reducer is True
     """
+    # pandas is imported here so loading a saved reducer for inference does not pay for it
+    import pandas as pd
+
     # Set plot directory for DR outputs
     plot_dir = os.path.join("plots", "dr")
-    os.makedirs(plot_dir, exist_ok=True)
 
     features = df.drop(columns=[label_col])
     labels = df[label_col]
 
-    pca = PCA(n_components=min(n_components, features.shape[1]))
-    reduced = pca.fit_transform(features)
+    reducer = DimensionalityReducer(n_components=n_components, method=method, batch_size=batch_size)
+    reduced = reducer.fit_transform(features)
 
-    pc_cols = [f"PC{i+1}" for i in range(pca.n_components_)]
+    pc_cols = reducer.component_names
     df_pca = pd.DataFrame(reduced, columns=pc_cols)
     df_pca[label_col] = labels.reset_index(drop=True)
 
-    # Scree plot showing explained variance
-    plt.figure(figsize=(6, 4))
-    sns.barplot(x=pc_cols, y=pca.explained_variance_ratio_)
-    plt.title("PCA Explained Variance Ratio")
-    plt.ylabel("Ratio")
-    plt.tight_layout()
+    # Scree plot showing explained variance (rendered by the plot pool)
     plot_path = os.path.join(plot_dir, f"{label_col}_pca_variance.png")
-    plt.savefig(plot_path)
-    plt.close()
-    print(f" Saved variance plot to: {plot_path}")
+    submit_plot(render_scree, plot_path, "variance plot",
+                component_names=pc_cols, ratios=np.asarray(reducer.explained_variance_ratio_))
 
+    if return_reducer:
+        return df_pca, reducer
     return df_pca
 
 # Test block
+# Run from the repository root: python -m dr.reducer
 if __name__ == "__main__":
-    import sys
-    import os
-
-    ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    sys.path.append(ROOT)
-
+    import pandas as pd
     from datasets.load_data import load_iris_data
 
     X_train, _, y_train, _ = load_iris_data()
@@ -3,32 +3,133 @@
 # Description: Performs exploratory data analysis (EDA) on a given dataset,
 #              including pairplots and class distribution, and returns a flag
 #              recommending whether dimensionality reduction (DR) should be considered.
+#              A fast mode computes stats in one chunked pass and only plots a
+#              capped stratified sample (or nothing).
 
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 import numpy as np
 
 import os
-import sys
 
-# Add root directory to sys.path
-ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-sys.path.append(ROOT_DIR)
+from eda.stats import compute_stats, stratified_sample
+from utils.instrumentation import instrument
+from utils.plot_pool import submit_plot
 
-def perform_eda(df, dataset_name="dataset", save_dir="results/eda"):  
+MAX_FEATURES = 10
+CORR_THRESHOLD = 0.95
+EDA_MODES = ("full", "fast")
+
+
+def recommend_dr(num_features, corr_matrix):
+    """
+    Decides whether DR should be considered from the feature count and the
+    absolute correlation matrix alone.
+
+    Returns:
+    tuple: (recommend: bool, reason: str, high_corr_pairs: int)
+    """
+    corr = np.abs(np.asarray(corr_matrix, dtype=float))
+    upper = np.triu(np.ones(corr.shape), k=1).astype(bool)
+    high_corr = int(np.sum(corr[upper] > CORR_THRESHOLD))
+
+    if num_features > MAX_FEATURES:
+        reason = f"{num_features} features exceeds threshold of {MAX_FEATURES}"
+        recommend = True
+    elif high_corr > 0:
+        reason = f"{int(high_corr)} highly correlated feature pairs (ρ > {CORR_THRESHOLD})"
+        recommend = True
+    else:
+        reason = "Feature count and correlation within acceptable limits"
+        recommend = False
+    return recommend, reason, high_corr
+
+
+def render_pairplot(path, data, hue, title):
+    """Draws a seaborn pairplot to `path` (runs in a plot worker)."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.pairplot(data, hue=hue)
+    plt.suptitle(title, y=1.02)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_class_distribution(path, classes, counts, title):
+    """Draws the class-count bar chart to `path` (runs in a plot worker)."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.barplot(x=classes, y=counts)
+    plt.title(title)
+    plt.ylabel("Count")
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def perform_fast_eda(df, dataset_name="dataset", plots=False, sample_size=2000,
+                     max_plot_features=8, chunk_size=100_000):
+    """
+    Statistics-only EDA for wide/large tables:
+    - One chunked pass for describe-stats, class counts and correlation
+    - Optional plots drawn from a capped stratified sample
+    - Returns the same DR recommendation dict as perform_eda
+    """
+    label_col = df.columns[-1]
+    stats = compute_stats(df, label_col, chunk_size=chunk_size)
+
+    print("\n Dataset summary (streaming):")
+    print(stats.describe())
+    print(f"\n Rows: {len(df)}, features: {df.shape[1] - 1}, rows with missing values: {stats.n_missing_rows}")
+    print(" Class counts:", stats.class_counts)
+
+    if plots:
+        plot_dir = os.path.join("plots", "eda")
+        sample = df.iloc[stratified_sample(df[label_col].to_numpy(), sample_size)]
+        plot_cols = list(df.columns[:-1][:max_plot_features]) + [label_col]
+
+        pairplot_path = os.path.join(plot_dir, f"{dataset_name}_pairplot.png")
+        submit_plot(render_pairplot, pairplot_path, "pairplot", data=sample[plot_cols],
+                    hue=label_col, title=f"{dataset_name} Pairplot (sample of {len(sample)})")
+
+        classdist_path = os.path.join(plot_dir, f"{dataset_name}_class_distribution.png")
+        submit_plot(render_class_distribution, classdist_path, "class distribution",
+                    classes=list(stats.class_counts.keys()), counts=list(stats.class_counts.values()),
+                    title=f"{dataset_name} Class Distribution")
+
+    num_features = df.shape[1] - 1
+    recommend, reason, high_corr = recommend_dr(num_features, stats.correlation())
+    return {
+        "recommend_dr": recommend,
+        "reason": reason,
+        "num_features": num_features,
+        "high_corr_pairs": high_corr,
+        "class_counts": stats.class_counts,
+    }
+
+
+@instrument("eda.perform_eda")
+def perform_eda(df, dataset_name="dataset", save_dir="results/eda", mode="full", plots=True,
+                sample_size=2000):
     """
     Performs exploratory data analysis on a DataFrame:
     - Displays basic info
     - Saves pairplot and class distribution plots
     - Analyzes feature count and correlation
     - Returns a recommendation for DR with reasoning
+
+    mode="fast" switches to perform_fast_eda (streaming stats, sampled plots
+    only when plots=True).
     """
-    
+    if mode not in EDA_MODES:
+        raise ValueError(f"Unknown EDA mode '{mode}'. Options: {EDA_MODES}")
+    if mode == "fast":
+        return perform_fast_eda(df, dataset_name=dataset_name, plots=plots, sample_size=sample_size)
+
     #os.makedirs(save_dir, exist_ok=True)
     # === Set plot directory ===
     plot_dir = os.path.join("plots", "eda")
-    os.makedirs(plot_dir, exist_ok=True)
     
     print("\n Head of dataset:")
     print(df.head())
@@ -43,43 +144,21 @@ def perform_eda(df, dataset_name="dataset", save_dir="results/eda"):
     label_col = df.columns[-1]
     features = df.iloc[:, :-1]
 
-    # Pairplot
+    # Pairplot (rendered by the plot pool)
     pairplot_path = os.path.join(plot_dir, f"{dataset_name}_pairplot.png")
-    sns.pairplot(df, hue=label_col)
-    plt.suptitle(f"{dataset_name} Pairplot", y=1.02)
-    plt.tight_layout()
-    plt.savefig(pairplot_path)
-    plt.close()
+    submit_plot(render_pairplot, pairplot_path, "pairplot", data=df, hue=label_col,
+                title=f"{dataset_name} Pairplot")
 
     # Class distribution
     class_counts = df[label_col].value_counts()
     classdist_path = os.path.join(plot_dir, f"{dataset_name}_class_distribution.png")
-    sns.barplot(x=class_counts.index, y=class_counts.values)
-    plt.title(f"{dataset_name} Class Distribution")
-    plt.ylabel("Count")
-    plt.tight_layout()
-    plt.savefig(classdist_path)
-    plt.close()
+    submit_plot(render_class_distribution, classdist_path, "class distribution",
+                classes=class_counts.index.to_numpy(), counts=class_counts.to_numpy(),
+                title=f"{dataset_name} Class Distribution")
 
     # === DR Recommendation Logic ===
     num_features = features.shape[1]
-    MAX_FEATURES = 10
-
-    # Check for high correlation
-    corr_matrix = features.corr().abs()
-    upper = np.triu(np.ones(corr_matrix.shape), k=1).astype(bool)
-    high_corr = (corr_matrix.where(upper) > 0.95).sum().sum()
-
-    # Decide
-    if num_features > MAX_FEATURES:
-        reason = f"{num_features} features exceeds threshold of {MAX_FEATURES}"
-        recommend = True
-    elif high_corr > 0:
-        reason = f"{int(high_corr)} highly correlated feature pairs (ρ > 0.95)"
-        recommend = True
-    else:
-        reason = "Feature count and correlation within acceptable limits"
-        recommend = False
+    recommend, reason, high_corr = recommend_dr(num_features, features.corr())
 
     return {
         "recommend_dr": recommend,
@@ -88,8 +167,9 @@ def perform_eda(df, dataset_name="dataset", save_dir="results/eda"):
         "high_corr_pairs": int(high_corr)
     }
 
-# Standalone test block (optional)
+# Standalone test block (optional), run from the repository root: python -m eda.perform_eda
 if __name__ == "__main__":
+    import pandas as pd
     from datasets.load_data import load_iris_data
 
     X_train, _, y_train, _ = load_iris_data()
@@ -0,0 +1,128 @@
+# eda/stats.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Single-pass, chunked statistics for fast EDA. Per-feature count,
+#              mean, variance, min/max, the correlation matrix and class counts are
+#              accumulated chunk by chunk with pairwise (Chan et al.) merges, so
+#              wide/large tables never need a dense pandas copy.
+
+import numpy as np
+
+
+class StreamingStats:
+    """
+    Accumulates describe-style statistics, the feature correlation matrix and
+    class counts over row chunks. Rows containing NaN in any feature are
+    counted in `n_missing_rows` and excluded from the moments.
+    """
+
+    def __init__(self, feature_names=None):
+        self.feature_names = feature_names
+        self.count = 0
+        self.mean = None
+        self.comoment = None  # sum of outer products of deviations, (d, d)
+        self.min = None
+        self.max = None
+        self.n_missing_rows = 0
+        self.class_counts = {}
+
+    def update(self, X, y=None):
+        """
+        Folds one chunk into the running statistics.
+
+        Parameters:
+            X (array-like): Chunk of shape (n_rows, n_features)
+            y (array-like): Optional labels for the chunk
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if y is not None:
+            labels, counts = np.unique(np.asarray(y), return_counts=True)
+            for label, count in zip(labels.tolist(), counts.tolist()):
+                self.class_counts[label] = self.class_counts.get(label, 0) + count
+
+        valid = ~np.isnan(X).any(axis=1)
+        if not valid.all():
+            self.n_missing_rows += int((~valid).sum())
+            X = X[valid]
+        n_b = X.shape[0]
+        if n_b == 0:
+            return self
+
+        mean_b = X.mean(axis=0)
+        centered = X - mean_b
+        comoment_b = centered.T @ centered
+
+        if self.count == 0:
+            self.mean, self.comoment = mean_b, comoment_b
+            self.min, self.max = X.min(axis=0), X.max(axis=0)
+        else:
+            n_a = self.count
+            delta = mean_b - self.mean
+            total = n_a + n_b
+            self.comoment += comoment_b + np.outer(delta, delta) * (n_a * n_b / total)
+            self.mean = self.mean + delta * (n_b / total)
+            np.minimum(self.min, X.min(axis=0), out=self.min)
+            np.maximum(self.max, X.max(axis=0), out=self.max)
+        self.count += n_b
+        return self
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, as in pandas)."""
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+        return np.sqrt(np.diag(self.comoment) / (self.count - 1))
+
+    def correlation(self):
+        """Pearson correlation matrix as a DataFrame."""
+        import pandas as pd
+
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = self.comoment / np.outer(scale, scale)
+        return pd.DataFrame(corr, index=self.feature_names, columns=self.feature_names)
+
+    def describe(self):
+        """describe()-style summary (count, mean, std, min, max)."""
+        import pandas as pd
+
+        return pd.DataFrame(
+            [np.full_like(self.mean, self.count), self.mean, self.std, self.min, self.max],
+            index=["count", "mean", "std", "min", "max"], columns=self.feature_names)
+
+
+def compute_stats(df, label_col, chunk_size=100_000):
+    """
+    Runs StreamingStats over a DataFrame in row chunks.
+
+    Parameters:
+        df (pd.DataFrame): Features + label column
+        label_col (str): Name of the label column
+        chunk_size (int): Rows per chunk
+
+    Returns:
+        StreamingStats
+    """
+    feature_cols = [c for c in df.columns if c != label_col]
+    stats = StreamingStats(feature_names=feature_cols)
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        stats.update(chunk[feature_cols].to_numpy(dtype=np.float64), chunk[label_col].to_numpy())
+    return stats
+
+
+def stratified_sample(labels, sample_size, random_state=42):
+    """
+    Row positions of a class-proportional sample of at most sample_size rows.
+    Every class keeps at least one row.
+    """
+    labels = np.asarray(labels)
+    if len(labels) <= sample_size:
+        return np.arange(len(labels))
+    rng = np.random.default_rng(random_state)
+    classes, inverse = np.unique(labels, return_inverse=True)
+    picks = []
+    for code in range(len(classes)):
+        rows = np.flatnonzero(inverse == code)
+        take = max(1, int(round(sample_size * len(rows) / len(labels))))
+        picks.append(rng.choice(rows, min(take, len(rows)), replace=False))
+    return np.sort(np.concatenate(picks))
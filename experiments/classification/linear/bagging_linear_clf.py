@@ -3,32 +3,42 @@
 # Description: Executes a bagging ensemble of linear classifiers on the Iris dataset
 #              using multiple voting strategies, with centralized logging and evaluation.
 
-import sys
-import os
-
-# Add root directory to sys.path
-ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
-sys.path.append(ROOT_DIR)
-
-from config import logger, RESULTS_DIR
+from config import logger, RANDOM_SEED
 from models.ensemble_models import EnsembleModel
+from models.cache import FittedModelCache
+from models.cross_validation import cross_val_predictions, evaluate_cv
+from models.tuning import MemberTuner
 from sklearn.linear_model import LogisticRegression, RidgeClassifier, SGDClassifier
 from utils.evaluation import evaluate_classification
+from utils.instrumentation import instrument, span
+from utils.run_records import RunRecorder
+from utils.results_store import ResultsStore
 from datasets.load_data import load_iris_data
 
 from utils.visualization import plot_confusion_matrix
 from utils.visualization import plot_strategy_accuracies
 
-import csv
-from datetime import datetime
-
 
 class BaggingLinearClassifierExperiment:
-    def __init__(self):
+    # Strategy label -> (voting strategy, bagged). The plain runs are the original comparison
+    # on the full training set; the bagged ones train bootstrap members and report OOB accuracy
+    strategies = {
+        "hard_voting": ("hard_voting", False),
+        "soft_voting": ("soft_voting", False),
+        "bagged_hard_voting": ("hard_voting", True),
+        "bagged_soft_voting": ("soft_voting", True),
+    }
+
+    def __init__(self, dataset_name="iris", run_id=None, store=None):
         logger.info("Initializing BaggingLinearClassifierExperiment...")
+        self.dataset_name = dataset_name
+        self.recorder = RunRecorder(run_id=run_id, experiment="bagging_linear_clf", dataset=dataset_name)
+        self.store = store or ResultsStore()
         self.models = self._define_models()
-        self.results_dir = RESULTS_DIR
-        os.makedirs(self.results_dir, exist_ok=True)
+        # Shared across strategies so each member is fit once per dataset/seed
+        self.model_cache = FittedModelCache()
+        # Fitted ensemble per strategy from the last run(), e.g. for saving with FittedPipeline
+        self.ensembles = {}
 
     def _define_models(self):
         logger.info("Defining base linear classifiers for ensemble...")
@@ -38,67 +48,135 @@ class BaggingLinearClassifierExperiment:
             "SGDClassifier": SGDClassifier(max_iter=1000, tol=1e-3),
         }
 
+    def _search_spaces(self):
+        """Per-member search spaces for tune_members (keys match _define_models)."""
+        return {
+            "LogisticRegression": {"C": [0.01, 0.1, 1.0, 10.0, 100.0]},
+            "RidgeClassifier": {"alpha": [0.01, 0.1, 1.0, 10.0, 100.0]},
+            # Only losses with predict_proba, so the tuned member still takes part in soft voting
+            "SGDClassifier": {"alpha": [1e-5, 1e-4, 1e-3, 1e-2],
+                              "loss": ["log_loss", "modified_huber"],
+                              "penalty": ["l2", "elasticnet"]},
+        }
+
+    @instrument("experiment.bagging_linear_clf.tune_members")
+    def tune_members(self, X, y, method="halving"):
+        """
+        Successive-halving (or Hyperband) search over each member's search space
+        on the training data; the tuned members replace self.models for run() and
+        run_cv(). Results are stored under run id '<run_id>_tuning'.
+        """
+        logger.info(f"Tuning ensemble members with {method}...")
+        tuner = MemberTuner(self._search_spaces(), method=method, random_state=RANDOM_SEED)
+        tuner.fit(self.models, X, y)
+        self.models = tuner.tuned_models()
+
+        run_params = {"random_seed": RANDOM_SEED, "method": method, "n_fits": tuner.n_fits_,
+                      "best_params": tuner.best_params_}
+        with self.store.run(f"{self.recorder.run_id}_tuning", experiment="bagging_linear_clf_tuning",
+                            dataset=self.dataset_name, params=run_params) as batch:
+            for row in tuner.summary():
+                logger.info(f"Tuned {row['member']}: {row['params']} (validation accuracy "
+                            f"{row['score']:.4f}, {row['fits']} fits over {row['resource']})")
+                self.recorder.metric("tuned_accuracy", row["score"], strategy=row["member"],
+                                     params=row["params"], fits=row["fits"])
+                batch.add_metric("validation_accuracy", row["score"], strategy=row["member"])
+                batch.add_metric("fits", row["fits"], strategy=row["member"])
+        return tuner
+
+    @instrument("experiment.bagging_linear_clf.run")
     def run(self, X_train, X_test, y_train, y_test):
         logger.info("Starting ensemble strategy comparison...")
 
         strategy_scores = {}
-        for strategy in ["hard_voting", "soft_voting"]:
-            logger.info(f"Running strategy: {strategy}")
-            print(f"\nStrategy: {strategy}")
-
-            # 🎯 Filter models that support predict_proba for soft voting
-            if strategy == "soft_voting":
-                usable_models = {
-                    name: model for name, model in self.models.items()
-                    if hasattr(model, "predict_proba")
-                }
-            else:
-                usable_models = self.models
-
-            logger.info(f"Models used for strategy '{strategy}': {list(usable_models.keys())}")
-            try:
-                ensemble = EnsembleModel(models=usable_models, strategy=strategy)
-                ensemble.fit(X_train, y_train)
-                y_pred = ensemble.predict(X_test)
-
-                acc, cm, report = evaluate_classification(y_test, y_pred)
-                plot_confusion_matrix(y_test, y_pred, title=f"{strategy} Confusion Matrix")
-                strategy_scores[strategy] = acc
-               
-                
-                logger.info(f"Model accuracy: {acc:.4f}")
-                logger.info(f"Confusion matrix:\n{cm}")
-                logger.info("Classification report:\n" + report)
-
-                results_path = os.path.join(self.results_dir, f"results_{strategy}.txt")
-                with open(results_path, "w") as f:
-                    f.write(f"Strategy: {strategy}\n")
-                    f.write(f"Models Used: {list(usable_models.keys())}\n")
-                    f.write(f"Accuracy: {acc:.4f}\n\n")
-                    f.write("Confusion Matrix:\n")
-                    f.write(str(cm) + "\n\n")
-                    f.write("Classification Report:\n")
-                    f.write(report)
-
-                logger.info(f"Saved results to {results_path}")
-                csv_path = os.path.join(self.results_dir, "summary_results.csv")
-                write_header = not os.path.exists(csv_path)
-
-                with open(csv_path, mode="a", newline="") as csvfile:
-                    writer = csv.writer(csvfile)
-                    if write_header:
-                        writer.writerow(["Timestamp", "Strategy", "Accuracy", "Models Used"])
-                    writer.writerow([
-                        datetime.now().isoformat(timespec='seconds'),
-                        strategy,
-                        f"{acc:.4f}",
-                        ", ".join(usable_models.keys())
-                    ])
-            except Exception as e:
-                logger.error(f"Strategy {strategy} failed: {str(e)}")
-                print(f" Strategy {strategy} encountered an error. See log for details.")
-        plot_strategy_accuracies(strategy_scores)
-
+        run_params = {"random_seed": RANDOM_SEED, "models": list(self.models.keys())}
+        # All records of this run are written to the results store in one transaction
+        with self.store.run(self.recorder.run_id, experiment="bagging_linear_clf",
+                            dataset=self.dataset_name, params=run_params) as batch:
+            for strategy, (voting, bagged) in self.strategies.items():
+                logger.info(f"Running strategy: {strategy}")
+                print(f"\nStrategy: {strategy}")
+
+                # 🎯 Filter models that support predict_proba for soft voting
+                if voting == "soft_voting":
+                    usable_models = {
+                        name: model for name, model in self.models.items()
+                        if hasattr(model, "predict_proba")
+                    }
+                else:
+                    usable_models = self.models
+
+                logger.info(f"Models used for strategy '{strategy}': {list(usable_models.keys())}")
+                try:
+                    ensemble = EnsembleModel(
+                        models=usable_models, strategy=voting,
+                        bootstrap=bagged, oob_score=bagged, random_state=RANDOM_SEED,
+                        cache=self.model_cache
+                    )
+                    ensemble.fit(X_train, y_train)
+                    if bagged:
+                        logger.info(f"Out-of-bag accuracy: {ensemble.oob_score_:.4f}")
+                        self.recorder.metric("oob_accuracy", ensemble.oob_score_, strategy=strategy)
+                        batch.add_metric("oob_accuracy", ensemble.oob_score_, strategy=strategy)
+                    ensemble.compile()
+                    self.ensembles[strategy] = ensemble
+                    logger.info(f"Fused linear members: {len(ensemble.fused_index_)}/{len(ensemble.estimators_)}")
+                    y_pred = ensemble.predict(X_test)
+
+                    with span("experiment.evaluate", strategy=strategy):
+                        acc, cm, report = evaluate_classification(y_test, y_pred)
+                    with span("plot.confusion_matrix", strategy=strategy):
+                        plot_confusion_matrix(y_test, y_pred, title=f"{strategy} Confusion Matrix", cm=cm)
+                    strategy_scores[strategy] = acc
+
+                    logger.info(f"Model accuracy: {acc:.4f}")
+                    self.recorder.metric("accuracy", acc, strategy=strategy,
+                                         models=list(usable_models.keys()))
+                    logger.info(f"Confusion matrix:\n{cm}")
+                    logger.info("Classification report:\n" + report)
+
+                    batch.add_strategy(strategy, models=usable_models.keys(), report=report)
+                    batch.add_metric("accuracy", acc, strategy=strategy)
+                    batch.add_confusion_matrix(strategy, cm, labels=ensemble.classes_)
+                except Exception as e:
+                    logger.error(f"Strategy {strategy} failed: {str(e)}")
+                    self.recorder.error(str(e), strategy=strategy)
+                    batch.add_metric("failed", 1.0, strategy=strategy)
+                    print(f" Strategy {strategy} encountered an error. See log for details.")
+        logger.info(f"Saved run {self.recorder.run_id} to {self.store.path}")
+        logger.info(f"Fitted-model cache: {self.model_cache.stats()}")
+        if strategy_scores:
+            with span("plot.strategy_accuracies"):
+                plot_strategy_accuracies(strategy_scores)
+        return strategy_scores
+
+    @instrument("experiment.bagging_linear_clf.run_cv")
+    def run_cv(self, X, y, n_splits=5, weight_settings=None, stacking=True):
+        """
+        k-fold evaluation: each member is fit once per fold and every voting
+        strategy, weight setting and stacking is scored from the shared
+        out-of-fold matrix. Results are stored under run id '<run_id>_cv'.
+        """
+        logger.info(f"Starting {n_splits}-fold cross-validated strategy comparison...")
+        oof = cross_val_predictions(self.models, X, y, n_splits=n_splits, random_state=RANDOM_SEED)
+        results = evaluate_cv(oof, weight_settings=weight_settings, stacking=stacking)
+
+        run_params = {"random_seed": RANDOM_SEED, "models": list(self.models.keys()), "n_splits": n_splits}
+        with self.store.run(f"{self.recorder.run_id}_cv", experiment="bagging_linear_clf_cv",
+                            dataset=self.dataset_name, params=run_params) as batch:
+            for result in results:
+                label = f"{result['strategy']}[{result['weights']}]"
+                logger.info(f"CV {label}: accuracy {result['accuracy_mean']:.4f} "
+                            f"± {result['accuracy_std']:.4f} over {n_splits} folds")
+                self.recorder.metric("cv_accuracy", result["accuracy_mean"], strategy=label,
+                                     std=result["accuracy_std"], folds=result["fold_accuracy"])
+                batch.add_strategy(label, models=result["members"], report=result["report"])
+                batch.add_metric("accuracy", result["accuracy_mean"], strategy=label)
+                batch.add_metric("accuracy_std", result["accuracy_std"], strategy=label)
+                batch.add_confusion_matrix(label, result["confusion_matrix"], labels=oof.classes_)
+        return results
+
+# Run from the repository root: python -m experiments.classification.linear.bagging_linear_clf
 if __name__ == "__main__":
     experiment = BaggingLinearClassifierExperiment()
     experiment.run()
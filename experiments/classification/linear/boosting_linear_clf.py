@@ -1 +1,118 @@
-# Auto-generated Python module
+# experiments/classification/linear/boosting_linear_clf.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Executes AdaBoost (SAMME) over linear classifiers, cycling through the
+#              members stage by stage or picking the best member per stage. A slice
+#              of the training data is held out for early stopping; test accuracy
+#              after every stage comes from one staged prediction pass.
+
+from config import logger, RANDOM_SEED
+from models.boosting import BoostedEnsemble
+from sklearn.linear_model import LogisticRegression, Perceptron, RidgeClassifier
+from sklearn.model_selection import train_test_split
+from utils.evaluation import evaluate_classification
+from utils.instrumentation import instrument, span
+from utils.run_records import RunRecorder
+from utils.results_store import ResultsStore
+
+from utils.visualization import plot_confusion_matrix
+from utils.visualization import plot_strategy_accuracies
+
+
+class BoostingLinearClassifierExperiment:
+    experiment_name = "boosting_linear_clf"
+    # Fraction of the training rows held out for early stopping
+    validation_size = 0.2
+    # Stages without validation improvement before a booster stops
+    patience = 10
+
+    def __init__(self, dataset_name="iris", run_id=None, store=None):
+        logger.info(f"Initializing {type(self).__name__}...")
+        self.dataset_name = dataset_name
+        self.recorder = RunRecorder(run_id=run_id, experiment=self.experiment_name, dataset=dataset_name)
+        self.store = store or ResultsStore()
+        self.models = self._define_models()
+        # Fitted booster per configuration from the last run()
+        self.boosters = {}
+
+    def _define_models(self):
+        logger.info("Defining base linear classifiers for boosting...")
+        return {
+            "LogisticRegression": LogisticRegression(max_iter=1000),
+            "RidgeClassifier": RidgeClassifier(),
+            "Perceptron": Perceptron(),
+        }
+
+    def _configurations(self):
+        """Configuration label -> BoostedEnsemble arguments ('models' defaults to self.models)."""
+        return {
+            "adaboost_cycle": dict(algorithm="adaboost", n_estimators=50, learning_rate=0.5),
+            "adaboost_best": dict(algorithm="adaboost", n_estimators=50, learning_rate=0.5,
+                                  member_selection="best"),
+        }
+
+    @instrument("experiment.boosting_clf.run")
+    def run(self, X_train, X_test, y_train, y_test):
+        logger.info("Starting boosting configuration comparison...")
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=self.validation_size, random_state=RANDOM_SEED, stratify=y_train)
+
+        scores = {}
+        configurations = self._configurations()
+        run_params = {"random_seed": RANDOM_SEED, "models": list(self.models.keys()),
+                      "configurations": list(configurations), "patience": self.patience}
+        with self.store.run(self.recorder.run_id, experiment=self.experiment_name,
+                            dataset=self.dataset_name, params=run_params) as batch:
+            for label, params in configurations.items():
+                logger.info(f"Running configuration: {label}")
+                print(f"\nConfiguration: {label}")
+                params = dict(params)
+                models = params.pop("models", self.models)
+                try:
+                    booster = BoostedEnsemble(models=models, random_state=RANDOM_SEED, **params)
+                    booster.fit(X_fit, y_fit, validation=(X_val, y_val), patience=self.patience)
+                    self.boosters[label] = booster
+                    logger.info(f"Kept {booster.n_estimators_} stages; "
+                                f"best validation loss {min(booster.validation_loss_):.4f}")
+                    y_pred = booster.predict(X_test)
+                    # Test accuracy after every stage from one scoring pass
+                    staged_accuracy = (booster.staged_predict(X_test) == y_test).mean(axis=1)
+
+                    with span("experiment.evaluate", strategy=label):
+                        acc, cm, report = evaluate_classification(y_test, y_pred)
+                    with span("plot.confusion_matrix", strategy=label):
+                        plot_confusion_matrix(y_test, y_pred, title=f"{label} Confusion Matrix", cm=cm)
+                    scores[label] = acc
+
+                    logger.info(f"Model accuracy: {acc:.4f}")
+                    logger.info(f"Confusion matrix:\n{cm}")
+                    logger.info("Classification report:\n" + report)
+                    self.recorder.metric("accuracy", acc, strategy=label, models=list(models.keys()),
+                                         stages=booster.n_estimators_)
+                    batch.add_strategy(label, models=models.keys(), report=report)
+                    batch.add_metric("accuracy", acc, strategy=label)
+                    batch.add_metric("n_stages", booster.n_estimators_, strategy=label)
+                    batch.add_metric("validation_loss", min(booster.validation_loss_), strategy=label)
+                    if len(staged_accuracy):
+                        batch.add_metric("best_staged_accuracy", staged_accuracy.max(), strategy=label)
+                    batch.add_confusion_matrix(label, cm, labels=booster.classes_)
+                except Exception as e:
+                    logger.error(f"Configuration {label} failed: {str(e)}")
+                    self.recorder.error(str(e), strategy=label)
+                    batch.add_metric("failed", 1.0, strategy=label)
+                    print(f" Configuration {label} encountered an error. See log for details.")
+        logger.info(f"Saved run {self.recorder.run_id} to {self.store.path}")
+        if scores:
+            with span("plot.strategy_accuracies"):
+                plot_strategy_accuracies(scores)
+        return scores
+
+# Run from the repository root: python -m experiments.classification.linear.boosting_linear_clf
+if __name__ == "__main__":
+    from datasets.registry import load_dataset
+    from utils.plot_pool import flush_plots
+
+    dataset = load_dataset("iris")
+    split = dataset.split(test_size=0.25, random_state=RANDOM_SEED)
+    experiment = BoostingLinearClassifierExperiment(dataset_name="iris")
+    experiment.run(*split.as_tuple())
+    flush_plots()
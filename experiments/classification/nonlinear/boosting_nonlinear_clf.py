@@ -1 +1,39 @@
-# Auto-generated Python module
+# experiments/classification/nonlinear/boosting_nonlinear_clf.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Executes AdaBoost over decision stumps and shallow trees, plus gradient
+#              boosting with log loss on regression trees, with the same validation
+#              early stopping, evaluation and results store as the linear experiment.
+
+from config import logger, RANDOM_SEED
+from experiments.classification.linear.boosting_linear_clf import BoostingLinearClassifierExperiment
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+
+class BoostingNonlinearClassifierExperiment(BoostingLinearClassifierExperiment):
+    experiment_name = "boosting_nonlinear_clf"
+
+    def _define_models(self):
+        logger.info("Defining base nonlinear classifiers for boosting...")
+        return {
+            "DecisionStump": DecisionTreeClassifier(max_depth=1),
+            "DecisionTreeClassifier": DecisionTreeClassifier(max_depth=3),
+        }
+
+    def _configurations(self):
+        configurations = super()._configurations()
+        # Gradient boosting fits regression trees to the log-loss gradients
+        configurations["gradient_log_loss"] = dict(
+            algorithm="gradient", loss="log_loss", n_estimators=200, learning_rate=0.1, subsample=0.8,
+            models={"DecisionTreeRegressor": DecisionTreeRegressor(max_depth=3)})
+        return configurations
+
+# Run from the repository root: python -m experiments.classification.nonlinear.boosting_nonlinear_clf
+if __name__ == "__main__":
+    from datasets.registry import load_dataset
+    from utils.plot_pool import flush_plots
+
+    dataset = load_dataset("iris")
+    split = dataset.split(test_size=0.25, random_state=RANDOM_SEED)
+    experiment = BoostingNonlinearClassifierExperiment(dataset_name="iris")
+    experiment.run(*split.as_tuple())
+    flush_plots()
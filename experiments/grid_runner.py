@@ -0,0 +1,348 @@
+# experiments/grid_runner.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Declarative experiment grid runner. A spec lists datasets, DR settings,
+#              member sets, voting strategies and seeds; every combination is a cell.
+#              Loading, EDA and DR run once per (dataset, DR setting) in the parent and
+#              are shared with the cells through memory-mapped .npy files. Cells run in a
+#              process pool sized by CPU count and available memory, results go to the
+#              results store, and cells already completed there are skipped (resumable).
+#
+# Usage:
+#   python -m experiments.grid_runner experiments/grid_example.json
+#   python -m experiments.grid_runner experiments/grid_example.json --max-workers 2 --dry-run
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from config import logger
+
+CLASSIFICATION_STRATEGIES = ("hard_voting", "soft_voting")
+GRID_EXPERIMENT_PREFIX = "grid:"
+# Rough per-cell memory: the process baseline plus a multiple of its data
+CELL_BASE_MEMORY_MB = 250
+CELL_DATA_MULTIPLIER = 4
+
+
+def _member_factories():
+    from sklearn.linear_model import LogisticRegression, RidgeClassifier, SGDClassifier
+    from sklearn.naive_bayes import GaussianNB
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.svm import SVC
+    from sklearn.tree import DecisionTreeClassifier
+
+    return {
+        "LogisticRegression": lambda: LogisticRegression(max_iter=1000),
+        "RidgeClassifier": lambda: RidgeClassifier(),
+        "SGDClassifier": lambda: SGDClassifier(max_iter=1000, tol=1e-3),
+        "DecisionTreeClassifier": lambda: DecisionTreeClassifier(max_depth=5),
+        "KNeighborsClassifier": lambda: KNeighborsClassifier(),
+        "GaussianNB": lambda: GaussianNB(),
+        "SVC": lambda: SVC(probability=True),
+    }
+
+
+def build_members(names):
+    """Fresh, unfitted estimators for the given registry names."""
+    factories = _member_factories()
+    unknown = [name for name in names if name not in factories]
+    if unknown:
+        raise ValueError(f"Unknown members {unknown}. Options: {sorted(factories)}")
+    return {name: factories[name]() for name in names}
+
+
+# === Spec and cells ===
+
+def load_spec(spec):
+    """
+    Normalizes a grid spec given as a dict or a JSON file path.
+
+    Keys:
+        name (str): Grid name, part of every cell id
+        datasets (list): Registered dataset names
+        dr (list): DR settings, null for none or {"n_components", "method"}
+        member_sets (dict): Set name -> list of member names (see build_members)
+        strategies (list): 'hard_voting' and/or 'soft_voting'
+        seeds (list): Ensemble random_state values
+        ensemble (dict): Extra EnsembleModel arguments (bootstrap, max_samples, ...)
+        eda (bool): Run fast EDA once per dataset
+        test_size (float), split_seed (int): Shared train/test split
+    """
+    if isinstance(spec, str):
+        with open(spec) as f:
+            spec = json.load(f)
+    spec = {
+        "name": "grid", "dr": [None], "seeds": [42], "ensemble": {}, "eda": False,
+        "test_size": 0.25, "split_seed": 42, **spec,
+    }
+    for key in ("datasets", "member_sets", "strategies"):
+        if not spec.get(key):
+            raise ValueError(f"Grid spec needs a non-empty '{key}'")
+    bad = [s for s in spec["strategies"] if s not in CLASSIFICATION_STRATEGIES]
+    if bad:
+        raise ValueError(f"Unsupported strategies {bad}. Options: {CLASSIFICATION_STRATEGIES}")
+    for names in spec["member_sets"].values():
+        build_members(names)
+    return spec
+
+
+def _key(obj):
+    return hashlib.blake2b(json.dumps(obj, sort_keys=True).encode(), digest_size=6).hexdigest()
+
+
+def expand_cells(spec):
+    """One dict per grid cell; the cell id is stable across runs of the same spec."""
+    cells = []
+    for dataset, dr, (set_name, members), strategy, seed in itertools.product(
+            spec["datasets"], spec["dr"], spec["member_sets"].items(), spec["strategies"], spec["seeds"]):
+        cell = {"grid": spec["name"], "dataset": dataset, "dr": dr, "member_set": set_name,
+                "members": list(members), "strategy": strategy, "seed": seed,
+                "ensemble": spec["ensemble"], "test_size": spec["test_size"],
+                "split_seed": spec["split_seed"]}
+        cell["cell_id"] = f"{spec['name']}_{_key(cell)}"
+        cells.append(cell)
+    return cells
+
+
+def completed_cells(store, cells):
+    """Ids of cells with a completed run in the results store."""
+    ids = [cell["cell_id"] for cell in cells]
+    done = set()
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows = store.query(
+            f"SELECT run_id FROM runs WHERE status = 'completed' AND run_id IN ({','.join('?' * len(chunk))})",
+            chunk)
+        done.update(row["run_id"] for row in rows)
+    return done
+
+
+# === Shared preprocessing ===
+
+def prepare_inputs(spec, cells, work_dir):
+    """
+    Loads, splits, (optionally) explores and reduces each dataset once per DR
+    setting used by the remaining cells, saving X_train/X_test/y_train/y_test
+    as .npy files the workers memory-map.
+
+    Returns:
+        dict: prep key -> {"paths": {...}, "nbytes": int}
+    """
+    from datasets.registry import load_dataset
+
+    prepared, explored = {}, set()
+    for cell in cells:
+        prep_key = _key([cell["dataset"], cell["dr"], cell["test_size"], cell["split_seed"]])
+        cell["prep_key"] = prep_key
+        if prep_key in prepared:
+            continue
+
+        dataset = load_dataset(cell["dataset"])
+        X_train, X_test, y_train, y_test = dataset.split(
+            test_size=cell["test_size"], random_state=cell["split_seed"]).as_tuple()
+
+        if spec["eda"] and cell["dataset"] not in explored:
+            import pandas as pd
+            from eda.perform_eda import perform_fast_eda
+
+            df = pd.DataFrame(X_train, columns=dataset.feature_names)
+            df["target"] = y_train
+            result = perform_fast_eda(df, dataset_name=cell["dataset"], plots=False)
+            logger.info(f"EDA {cell['dataset']}: recommend DR={result['recommend_dr']} ({result['reason']})")
+            explored.add(cell["dataset"])
+
+        if cell["dr"]:
+            from dr.reducer import DimensionalityReducer
+
+            reducer = DimensionalityReducer(**cell["dr"]).fit(X_train)
+            X_train, X_test = reducer.transform(X_train), reducer.transform(X_test)
+
+        paths = {}
+        for part, array in (("X_train", X_train), ("X_test", X_test), ("y_train", y_train), ("y_test", y_test)):
+            paths[part] = os.path.join(work_dir, f"{prep_key}_{part}.npy")
+            np.save(paths[part], np.ascontiguousarray(array))
+        prepared[prep_key] = {"paths": paths, "nbytes": int(np.asarray(X_train).nbytes
+                                                            + np.asarray(X_test).nbytes)}
+        logger.info(f"Prepared {cell['dataset']} (dr={cell['dr']}): train {np.shape(X_train)}, test {np.shape(X_test)}")
+    return prepared
+
+
+# === Scheduling ===
+
+def _available_memory_mb():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def resource_limit(n_cells, cell_memory_mb, max_workers=None):
+    """
+    Concurrency limit: no more workers than CPUs, cells, the caller's cap, or
+    cells that fit into currently available memory.
+    """
+    limit = min(os.cpu_count() or 1, n_cells)
+    if max_workers:
+        limit = min(limit, max_workers)
+    available = _available_memory_mb()
+    if available is not None:
+        limit = min(limit, max(1, int(available * 0.8 // cell_memory_mb)))
+    return max(1, limit)
+
+
+def _worker_env(n_workers):
+    # Split BLAS threads between workers instead of oversubscribing the CPUs
+    threads = str(max(1, (os.cpu_count() or 1) // n_workers))
+    return {name: threads for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")}
+
+
+# === Cells ===
+
+def run_cell(cell, paths, store_path=None):
+    """
+    Fits and scores one ensemble cell and writes it to the results store.
+
+    Returns:
+        dict: cell_id, accuracy, fit_s, predict_s
+    """
+    from models.ensemble_models import EnsembleModel
+    from utils.evaluation import evaluate_classification
+    from utils.results_store import ResultsStore
+
+    arrays = {part: np.load(path, mmap_mode="r") for part, path in paths.items()}
+    members = build_members(cell["members"])
+    if cell["strategy"] == "soft_voting":
+        members = {name: m for name, m in members.items() if hasattr(m, "predict_proba")}
+        if not members:
+            raise ValueError(f"No member of '{cell['member_set']}' supports predict_proba")
+
+    store = ResultsStore(store_path)
+    params = {k: v for k, v in cell.items() if k not in ("cell_id", "prep_key")}
+    with store.run(cell["cell_id"], experiment=GRID_EXPERIMENT_PREFIX + cell["grid"],
+                   dataset=cell["dataset"], params=params) as batch:
+        ensemble = EnsembleModel(models=members, strategy=cell["strategy"],
+                                 random_state=cell["seed"], **cell["ensemble"])
+        start = time.perf_counter()
+        ensemble.fit(arrays["X_train"], arrays["y_train"])
+        fit_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_pred = ensemble.predict(arrays["X_test"])
+        predict_s = time.perf_counter() - start
+
+        acc, cm, report = evaluate_classification(arrays["y_test"], y_pred, verbose=False)
+        batch.add_strategy(cell["strategy"], models=members.keys(), report=report)
+        batch.add_metric("accuracy", acc, strategy=cell["strategy"])
+        batch.add_metric("fit_s", fit_s, strategy=cell["strategy"])
+        batch.add_metric("predict_s", predict_s, strategy=cell["strategy"])
+        if getattr(ensemble, "oob_score_", None) is not None:
+            batch.add_metric("oob_accuracy", ensemble.oob_score_, strategy=cell["strategy"])
+        batch.add_confusion_matrix(cell["strategy"], cm, labels=ensemble.classes_)
+    return {"cell_id": cell["cell_id"], "accuracy": acc, "fit_s": fit_s, "predict_s": predict_s}
+
+
+def _run_cell_job(args):
+    cell, paths, store_path = args
+    try:
+        return run_cell(cell, paths, store_path)
+    except Exception as e:
+        return {"cell_id": cell["cell_id"], "error": f"{type(e).__name__}: {e}"}
+
+
+def run_grid(spec, store=None, max_workers=None, resume=True, dry_run=False):
+    """
+    Runs every cell of a grid spec that is not already completed.
+
+    Parameters:
+        spec (dict | str): Grid spec or path to a JSON spec (see load_spec)
+        store (ResultsStore): Results store, defaults to results/results.db
+        max_workers (int): Upper bound on concurrent cells (None = resource limit only)
+        resume (bool): Skip cells completed in the store
+        dry_run (bool): Only report which cells would run
+
+    Returns:
+        list: One result dict per executed cell (errors included)
+    """
+    from utils.results_store import ResultsStore
+
+    spec = load_spec(spec)
+    store = store or ResultsStore()
+    cells = expand_cells(spec)
+    done = completed_cells(store, cells) if resume else set()
+    todo = [cell for cell in cells if cell["cell_id"] not in done]
+    logger.info(f"Grid '{spec['name']}': {len(cells)} cells, {len(done)} already completed, {len(todo)} to run")
+    if dry_run or not todo:
+        return []
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ensemble_grid_") as work_dir:
+        prepared = prepare_inputs(spec, todo, work_dir)
+        largest = max(entry["nbytes"] for entry in prepared.values()) / 1024 ** 2
+        workers = resource_limit(len(todo), CELL_BASE_MEMORY_MB + CELL_DATA_MULTIPLIER * largest, max_workers)
+        jobs = [(cell, prepared[cell["prep_key"]]["paths"], store.path) for cell in todo]
+        logger.info(f"Running {len(jobs)} cells on {workers} worker(s)")
+
+        if workers == 1:
+            results = _collect(map(_run_cell_job, jobs), len(jobs))
+        else:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            saved_env = {name: os.environ.get(name) for name in _worker_env(workers)}
+            os.environ.update(_worker_env(workers))
+            try:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context("spawn")) as pool:
+                    results = _collect(pool.map(_run_cell_job, jobs), len(jobs))
+            finally:
+                for name, value in saved_env.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+    return results
+
+
+def _collect(iterator, total):
+    results = []
+    for i, result in enumerate(iterator, 1):
+        results.append(result)
+        if "error" in result:
+            logger.error(f"[{i}/{total}] {result['cell_id']} failed: {result['error']}")
+        else:
+            logger.info(f"[{i}/{total}] {result['cell_id']} accuracy={result['accuracy']:.4f} "
+                        f"fit={result['fit_s']:.3f}s predict={result['predict_s']:.3f}s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an experiment grid from a JSON spec.")
+    parser.add_argument("spec", help="Path to the grid spec JSON")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--no-resume", action="store_true", help="Re-run completed cells")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_grid(args.spec, max_workers=args.max_workers, resume=not args.no_resume,
+                       dry_run=args.dry_run)
+    failed = [r for r in results if "error" in r]
+    print(f" Grid finished: {len(results) - len(failed)} cells succeeded, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
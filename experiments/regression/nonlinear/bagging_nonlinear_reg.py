@@ -1 +1,37 @@
-# Auto-generated Python module
+# experiments/regression/nonlinear/bagging_nonlinear_reg.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Executes a bagging ensemble of nonlinear regressors (trees, nearest
+#              neighbours, kernel SVR, extra trees) with the same strategies, streaming
+#              evaluation and results store as the linear regression experiment.
+
+from config import logger, RANDOM_SEED
+from experiments.regression.linear.bagging_linear_reg import BaggingLinearRegressorExperiment
+from sklearn.ensemble import ExtraTreesRegressor
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.svm import SVR
+from sklearn.tree import DecisionTreeRegressor, ExtraTreeRegressor
+
+
+class BaggingNonlinearRegressorExperiment(BaggingLinearRegressorExperiment):
+    experiment_name = "bagging_nonlinear_reg"
+
+    def _define_models(self):
+        logger.info("Defining base nonlinear regressors for ensemble...")
+        return {
+            "DecisionTreeRegressor": DecisionTreeRegressor(max_depth=6),
+            "KNeighborsRegressor": KNeighborsRegressor(n_neighbors=10),
+            "SVR": SVR(C=100.0),
+            "ExtraTreeRegressor": ExtraTreeRegressor(max_depth=6),
+            "ExtraTreesRegressor": ExtraTreesRegressor(n_estimators=50, max_depth=6),
+        }
+
+# Run from the repository root: python -m experiments.regression.nonlinear.bagging_nonlinear_reg
+if __name__ == "__main__":
+    from datasets.registry import load_dataset
+    from utils.plot_pool import flush_plots
+
+    dataset = load_dataset("diabetes")
+    split = dataset.split(test_size=0.25, random_state=RANDOM_SEED, stratify=False)
+    experiment = BaggingNonlinearRegressorExperiment(dataset_name="diabetes")
+    experiment.run(*split.as_tuple())
+    flush_plots()
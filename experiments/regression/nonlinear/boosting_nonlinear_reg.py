@@ -1 +1,40 @@
-# Auto-generated Python module
+# experiments/regression/nonlinear/boosting_nonlinear_reg.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Executes gradient boosting with regression trees (plain and stochastic
+#              row subsampling) with the same early stopping, streaming evaluation and
+#              results store as the linear boosting regression experiment.
+
+from config import logger, RANDOM_SEED
+from experiments.regression.linear.boosting_linear_reg import BoostingLinearRegressorExperiment
+from sklearn.tree import DecisionTreeRegressor
+
+
+class BoostingNonlinearRegressorExperiment(BoostingLinearRegressorExperiment):
+    experiment_name = "boosting_nonlinear_reg"
+
+    def _define_models(self):
+        logger.info("Defining base nonlinear regressors for boosting...")
+        return {
+            "DecisionTreeRegressor": DecisionTreeRegressor(max_depth=3),
+        }
+
+    def _configurations(self):
+        return {
+            "gradient_squared_error": dict(algorithm="gradient", loss="squared_error",
+                                           n_estimators=500, learning_rate=0.05),
+            "gradient_absolute_error": dict(algorithm="gradient", loss="absolute_error",
+                                            n_estimators=500, learning_rate=0.05),
+            "stochastic_gradient": dict(algorithm="gradient", loss="squared_error",
+                                        n_estimators=500, learning_rate=0.05, subsample=0.5),
+        }
+
+# Run from the repository root: python -m experiments.regression.nonlinear.boosting_nonlinear_reg
+if __name__ == "__main__":
+    from datasets.registry import load_dataset
+    from utils.plot_pool import flush_plots
+
+    dataset = load_dataset("diabetes")
+    split = dataset.split(test_size=0.25, random_state=RANDOM_SEED, stratify=False)
+    experiment = BoostingNonlinearRegressorExperiment(dataset_name="diabetes")
+    experiment.run(*split.as_tuple())
+    flush_plots()
@@ -4,45 +4,75 @@
 
 from eda.perform_eda import perform_eda
 from dr.reducer import reduce_dimensionality
-from datasets.load_data import load_iris_data
+from datasets.registry import load_dataset
 from experiments.classification.linear.bagging_linear_clf import BaggingLinearClassifierExperiment
+from utils.instrumentation import instrument, span
+from utils.plot_pool import flush_plots, set_plot_mode
+import os
 import pandas as pd
 
-def run_workflow():
-    # === Step 1: Load data ===
-    X_train, X_test, y_train, y_test = load_iris_data()
+@instrument("workflow.run")
+def run_workflow(dataset_name="iris", eda_mode="full", plot_mode=None, cv_folds=None,
+                 artifact_dir=None, tune_members=None):
+    # Plots render in background workers by default; 'off'/'deferred' for batch sweeps
+    if plot_mode is not None:
+        set_plot_mode(plot_mode)
+
+    # === Step 1: Load data (binary cache after the first run) ===
+    with span("workflow.load", dataset=dataset_name):
+        dataset = load_dataset(dataset_name)
+        X_train, X_test, y_train, y_test = dataset.split(test_size=0.25, random_state=42).as_tuple()
     label_col = "target"
+    X_train_raw, reducer = X_train, None
 
     # === Step 2: Build training DataFrame for EDA/DR only ===
-    df_train = pd.DataFrame(X_train, columns=[f"feature_{i}" for i in range(X_train.shape[1])])
+    df_train = pd.DataFrame(X_train, columns=dataset.feature_names)
     df_train[label_col] = y_train
 
     # === Step 3: Perform EDA on training data ===
-    eda_result = perform_eda(df_train, dataset_name="iris")
+    eda_result = perform_eda(df_train, dataset_name=dataset_name, mode=eda_mode)
 
     print(f"\n📌 DR Recommendation: {'Yes' if eda_result['recommend_dr'] else 'No'} — {eda_result['reason']}")
 
     # === Step 4: Dimensionality Reduction if recommended ===
     if eda_result["recommend_dr"]:
-        # 🔹 Apply DR to training set
-        df_train_reduced = reduce_dimensionality(df_train, label_col=label_col)
+        # 🔹 Fit DR once on the training set
+        df_train_reduced, reducer = reduce_dimensionality(df_train, label_col=label_col, return_reducer=True)
 
         # 🔹 Split into features and labels
         X_train = df_train_reduced.drop(columns=[label_col]).values
         y_train = df_train_reduced[label_col].values
 
-        # 🔹 Fit PCA again on training set, apply it to test set using same transform
-        from sklearn.decomposition import PCA
-
-        pca = PCA(n_components=2)
-        pca.fit(df_train.drop(columns=[label_col]))  # Fit on original training features
-
-        df_test = pd.DataFrame(X_test, columns=[f"feature_{i}" for i in range(X_test.shape[1])])
-        X_test = pca.transform(df_test)
+        # 🔹 Apply the same fitted reducer to the test set
+        with span("dr.transform_test"):
+            df_test = pd.DataFrame(X_test, columns=dataset.feature_names)
+            X_test = reducer.transform(df_test)
 
     # === Step 5: Run experiment ===
-    experiment = BaggingLinearClassifierExperiment()
+    experiment = BaggingLinearClassifierExperiment(dataset_name=dataset_name)
+    if tune_members:
+        # 'halving' or 'hyperband' search per member before the ensembles are built
+        experiment.tune_members(X_train, y_train, method=tune_members)
     experiment.run(X_train, X_test, y_train, y_test)
+    if cv_folds:
+        # k-fold scores (mean ± std) on the training split, from one OOF matrix
+        experiment.run_cv(X_train, y_train, n_splits=cv_folds)
+
+    # === Step 6: Save fitted pipelines (reducer + ensemble) for scoring jobs ===
+    if artifact_dir:
+        from models.persistence import FittedPipeline
+
+        with span("workflow.save_pipelines"):
+            for strategy, ensemble in experiment.ensembles.items():
+                path = os.path.join(artifact_dir, f"{dataset_name}_{strategy}")
+                FittedPipeline(ensemble, reducer, feature_names=dataset.feature_names).save(
+                    path, X_train_raw, y_train, metadata={"dataset": dataset_name,
+                                                          "run_id": experiment.recorder.run_id})
+                print(f" Saved fitted pipeline to: {path}")
+
+    # === Step 7: Wait for queued plots ===
+    with span("plot.flush"):
+        flush_plots()
 
 if __name__ == "__main__":
     run_workflow()
\ No newline at end of file
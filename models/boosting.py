@@ -0,0 +1,569 @@
+# models/boosting.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Sequential boosting over ensemble members: AdaBoost (SAMME) sample
+#              reweighting for classification and gradient boosting on residuals
+#              (squared/absolute error for regression, log loss for classification).
+#              Training and validation margins are kept as running sums, so each
+#              stage only predicts with its own new members; the validation loss
+#              drives early stopping. Compiled stages are scored together (one GEMM
+#              for linear members, packed trees for decision trees), so staged
+#              prediction never loops over stages in Python.
+
+import warnings
+
+import numpy as np
+
+from models.executors import get_executor, materialize, share, worker_task
+from models.fused import FusedLinearEnsemble, PackedTrees, fusable, packable
+from models.voting import encode_labels
+from models import sampling, streaming
+from utils.instrumentation import instrument, span
+
+ALGORITHMS = ("adaboost", "gradient")
+LOSSES = {"regression": ("squared_error", "absolute_error"), "classification": ("log_loss",)}
+MEMBER_SELECTIONS = ("cycle", "best")
+
+
+@worker_task
+def _fit_stage(model, X_ref, target, sample_weight=None, rows=None):
+    """
+    Fits one stage candidate on the (sub)sampled rows. Runs inside the executor,
+    so it must stay at module level to be picklable for process pools.
+    """
+    X = materialize(X_ref)
+    if rows is not None:
+        X, target = X[rows], target[rows]
+        sample_weight = None if sample_weight is None else sample_weight[rows]
+    with span("boosting.fit_stage", model=type(model).__name__):
+        if sample_weight is None:
+            model.fit(X, target)
+        else:
+            model.fit(X, target, sample_weight=sample_weight)
+    return model
+
+
+def _softmax(scores):
+    """Row-wise softmax over the last axis."""
+    proba = scores - scores.max(axis=-1, keepdims=True)
+    np.exp(proba, out=proba)
+    proba /= proba.sum(axis=-1, keepdims=True)
+    return proba
+
+
+class BoostedEnsemble:
+    """
+    Stage-wise additive ensemble built from the same kind of members as
+    EnsembleModel. Each stage clones one member prototype (or the best of all of
+    them, see member_selection) and fits it to the reweighted samples (AdaBoost)
+    or to the negative gradient of the loss (gradient boosting).
+
+    The fitted model is a flat list of units: one estimator with the stage it
+    belongs to, the margin column it adds to and its weight (AdaBoost alpha or
+    learning rate). AdaBoost units add their weight to the column of the class
+    they predict; gradient units add weight * prediction.
+    """
+
+    def __init__(self, models: dict = None, algorithm: str = "adaboost", n_estimators: int = 100,
+                 learning_rate: float = 1.0, loss: str = None, subsample: float = 1.0,
+                 member_selection: str = "cycle", random_state=None, task: str = None,
+                 n_jobs: int = None, executor=None):
+        """
+        :param models: Dict of name -> estimator used as stage prototypes
+        :param algorithm: 'adaboost' (SAMME, classification) or 'gradient'
+        :param n_estimators: Maximum number of boosting stages
+        :param learning_rate: Shrinkage applied to every stage
+        :param loss: Gradient boosting loss: 'squared_error' or 'absolute_error' for
+                     regression, 'log_loss' for classification (default: per task)
+        :param subsample: Fraction of rows drawn (without replacement) for each stage
+        :param member_selection: 'cycle' fits the prototypes in turn, one per stage;
+                                 'best' fits all of them and keeps the one that
+                                 reduces the training loss most
+        :param random_state: Seed for row subsampling and the stage estimators
+        :param task: 'classification' or 'regression' (default: implied by algorithm/loss)
+        :param n_jobs: Workers used to fit the candidates of a stage
+        :param executor: 'serial', 'thread', 'process' or a concurrent.futures.Executor
+        """
+        self.models = []
+        self.names = []
+        self.algorithm = algorithm
+        self.n_estimators = n_estimators
+        self.learning_rate = learning_rate
+        self.loss = loss
+        self.subsample = subsample
+        self.member_selection = member_selection
+        self.random_state = random_state
+        self.task = task
+        self.n_jobs = n_jobs
+        self.executor = executor
+
+        if models:
+            for name, model in models.items():
+                self.add_model(model, name=name)
+
+    @classmethod
+    def from_ensemble(cls, ensemble, **params):
+        """
+        Boosts the members of an EnsembleModel instead of voting over them. The
+        task, seed and executor settings carry over unless given in params.
+
+        :param ensemble: EnsembleModel whose models become the stage prototypes
+        :param params: Any BoostedEnsemble argument
+        :return: Unfitted BoostedEnsemble
+        """
+        from models.ensemble_models import default_task
+
+        params.setdefault("task", ensemble.task or default_task(ensemble.strategy))
+        for name in ("random_state", "n_jobs", "executor"):
+            params.setdefault(name, getattr(ensemble, name))
+        return cls(models=dict(zip(ensemble.names, ensemble.models)), **params)
+
+    def add_model(self, model, name: str = None):
+        """
+        Add a stage prototype.
+
+        :param model: Any sklearn-compatible estimator; fit(sample_weight=...) is
+                      used by AdaBoost when available, otherwise rows are resampled
+        :param name: Optional display name, defaults to the estimator class name
+        """
+        self.models.append(model)
+        self.names.append(name or f"{type(model).__name__}_{len(self.models) - 1}")
+
+    def _task(self):
+        """Validated (task, loss); also sets is_classifier."""
+        if self.algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{self.algorithm}'. Options: {ALGORITHMS}")
+        if self.member_selection not in MEMBER_SELECTIONS:
+            raise ValueError(f"Unknown member_selection '{self.member_selection}'. Options: {MEMBER_SELECTIONS}")
+        task = self.task
+        if task is None:
+            task = "classification" if self.algorithm == "adaboost" or self.loss == "log_loss" else "regression"
+        if task not in LOSSES:
+            raise ValueError(f"Unknown task '{task}'. Options: {tuple(LOSSES)}")
+        if self.algorithm == "adaboost":
+            if task != "classification":
+                raise ValueError("AdaBoost (SAMME) is only available for classification; use algorithm='gradient'.")
+            loss = None
+        else:
+            loss = self.loss or LOSSES[task][0]
+            if loss not in LOSSES[task]:
+                raise ValueError(f"Loss '{loss}' does not apply to {task}. Options: {LOSSES[task]}")
+        self.is_classifier = task == "classification"
+        return task, loss
+
+    def _check_members(self):
+        """AdaBoost boosts classifiers; gradient boosting fits regressors to gradients."""
+        from sklearn.base import is_classifier
+
+        wanted = self.algorithm == "adaboost"
+        wrong = [name for name, model in zip(self.names, self.models) if is_classifier(model) != wanted]
+        if wrong:
+            kind = "classifiers" if wanted else "regressors (they are fit to residuals)"
+            raise ValueError(f"{self.algorithm} boosting needs {kind}; got {wrong}")
+
+    def _clone_stage(self, index, stage):
+        """Unfitted copy of prototype `index` for one stage, with its own seed."""
+        from sklearn.base import clone
+
+        model = clone(self.models[index])
+        if self.random_state is not None and "random_state" in model.get_params():
+            if model.get_params()["random_state"] is None:
+                seed = sampling.member_seeds(self.random_state, [f"{self.names[index]}/{stage}"])[0]
+                model.set_params(random_state=sampling.estimator_seed(seed))
+        return model
+
+    # Losses on margins F of shape (n_samples, n_outputs). `target` is the float
+    # response for regression and the class codes for classification.
+
+    def _initial_margin(self, target):
+        if self.algorithm == "adaboost":
+            return np.zeros(len(self.classes_))
+        if self.loss_ == "squared_error":
+            return np.array([np.mean(target)])
+        if self.loss_ == "absolute_error":
+            return np.array([np.median(target)])
+        prior = np.clip(np.bincount(target, minlength=len(self.classes_)) / len(target), 1e-12, 1 - 1e-12)
+        if len(prior) == 2:
+            return np.array([np.log(prior[1] / prior[0])])
+        return np.log(prior)
+
+    def _loss_sum(self, F, target):
+        rows = np.arange(len(F))
+        if self.algorithm == "adaboost":
+            # SAMME exponential loss exp(-f_y / (K - 1)) on centered margins
+            centered = F[rows, target] - F.mean(axis=1)
+            return float(np.sum(np.exp(-centered / max(F.shape[1] - 1, 1))))
+        if self.loss_ == "squared_error":
+            return float(np.sum((target - F[:, 0]) ** 2))
+        if self.loss_ == "absolute_error":
+            return float(np.sum(np.abs(target - F[:, 0])))
+        if F.shape[1] == 1:
+            return float(np.sum(np.logaddexp(0.0, F[:, 0]) - target * F[:, 0]))
+        top = F.max(axis=1)
+        return float(np.sum(top + np.log(np.exp(F - top[:, None]).sum(axis=1)) - F[rows, target]))
+
+    def _negative_gradient(self, F, target):
+        if self.loss_ == "squared_error":
+            return (target - F[:, 0])[:, None]
+        if self.loss_ == "absolute_error":
+            return np.sign(target - F[:, 0])[:, None]
+        if F.shape[1] == 1:
+            from scipy.special import expit
+
+            return (target - expit(F[:, 0]))[:, None]
+        gradient = -_softmax(F)
+        gradient[np.arange(len(F)), target] += 1.0
+        return gradient
+
+    @staticmethod
+    def _line_search(residual, output):
+        """
+        Step minimizing sum |residual - step * output|: the |output|-weighted
+        median of residual / output (members fit the sign of the residuals, so
+        their raw outputs are in the wrong units for absolute error).
+        """
+        moving = output != 0
+        if not moving.any():
+            return 0.0
+        ratio = residual[moving] / output[moving]
+        order = np.argsort(ratio)
+        cumulative = np.cumsum(np.abs(output[moving])[order])
+        return float(ratio[order][np.searchsorted(cumulative, 0.5 * cumulative[-1])])
+
+    def _target(self, y):
+        y = np.asarray(y)
+        if self.is_classifier:
+            return encode_labels(y[None, :], self.classes_)[0]
+        return y.astype(np.float64)
+
+    def _unit_output(self, model, X):
+        """One unit's raw output: encoded class (AdaBoost) or predicted value."""
+        prediction = np.asarray(model.predict(X))
+        if self.algorithm == "adaboost":
+            return encode_labels(prediction[None, :], self.classes_)[0]
+        return prediction.astype(np.float64)
+
+    def _add_units(self, F, outputs, units):
+        """Adds freshly fitted units' outputs (in unit order) onto margins F in place."""
+        rows = np.arange(len(F))
+        for (_, _, column, weight), output in zip(units, outputs):
+            if self.algorithm == "adaboost":
+                F[rows, output] += weight
+            else:
+                F[:, column] += weight * output
+
+    def _validation_loss(self, source, margins, units):
+        """
+        Brings the cached validation margins up to date with the new units (only
+        they predict) and returns the mean validation loss. Batches must come in
+        the same order every pass.
+        """
+        total = n = 0
+        for i, (X_b, y_b) in enumerate(source()):
+            X_b = np.asarray(X_b)
+            target = self._target(y_b)
+            if i == len(margins):
+                margins.append(np.tile(self.init_, (len(target), 1)))
+            if units:
+                self._add_units(margins[i], [self._unit_output(u[0], X_b) for u in units], units)
+            total += self._loss_sum(margins[i], target)
+            n += len(target)
+        return total / max(n, 1)
+
+    @instrument("boosting.fit")
+    def fit(self, X, y, validation=None, patience: int = None, tol: float = 1e-4, batch_size: int = 65536):
+        """
+        Fit the stages one after another. The training margins are a running sum
+        (residuals, gradients and AdaBoost errors come from it, never from
+        re-predicting earlier stages), and so are the margins of the validation
+        rows, which are streamed from `validation` once per stage.
+
+        With a validation source training stops once the validation loss has not
+        improved by more than tol for `patience` stages, and the model is cut back
+        to the best stage (best_iteration_).
+
+        :param X: Feature matrix
+        :param y: Target labels or values
+        :param validation: Held-out (X, y) tuple or chunked source, see
+                           models.streaming.batch_source
+        :param patience: Stages without improvement before stopping (None = never stop early)
+        :param tol: Minimum validation loss improvement that resets patience
+        :param batch_size: Rows per validation batch for sources sliced here
+        :return: self
+        """
+        if not self.models:
+            raise ValueError("No models in the ensemble. Add models before fitting.")
+        _, self.loss_ = self._task()
+        self._check_members()
+
+        X = np.asarray(X)
+        y = np.asarray(y)
+        n_samples = len(y)
+        self.n_features_in_ = X.shape[1]
+        if self.is_classifier:
+            self.classes_ = np.unique(y)
+            if len(self.classes_) < 2:
+                raise ValueError("Boosting a classifier needs at least two classes.")
+        target = self._target(y)
+        self.init_ = self._initial_margin(target)
+        F = np.tile(self.init_, (n_samples, 1))
+        n_outputs = F.shape[1]
+        n_classes = len(self.classes_) if self.is_classifier else 0
+        n_rows = sampling.resolve_count(self.subsample, n_samples, "subsample")
+        rng = np.random.default_rng(sampling.member_seeds(self.random_state, ["boosting"])[0])
+        sample_weight = np.full(n_samples, 1.0 / n_samples)
+
+        val_source = None if validation is None else streaming.batch_source(validation, batch_size)
+        val_margins = []
+        self.train_loss_ = []
+        self.validation_loss_ = []
+        if val_source is not None:
+            best_loss, best_stages = self._validation_loss(val_source, val_margins, []), 0
+            self.validation_loss_.append(best_loss)
+        units = []
+        n_stages = 0
+
+        pool, kind, owned = get_executor(self.executor, self.n_jobs)
+        X_ref = share(X, kind)
+        try:
+            for stage in range(self.n_estimators):
+                candidates = [stage % len(self.models)] if self.member_selection == "cycle" \
+                    else list(range(len(self.models)))
+                rows = None if n_rows == n_samples else np.sort(rng.choice(n_samples, n_rows, replace=False))
+
+                if self.algorithm == "adaboost":
+                    # Members without sample_weight see a weighted resample instead
+                    resample = None
+                    futures = []
+                    for i in candidates:
+                        model = self._clone_stage(i, stage)
+                        if sampling.supports_sample_weight(model):
+                            futures.append(pool.submit(_fit_stage, model, X_ref, y, sample_weight, rows))
+                            continue
+                        if resample is None:
+                            pool_rows = np.arange(n_samples) if rows is None else rows
+                            p = sample_weight[pool_rows] / sample_weight[pool_rows].sum()
+                            resample = rng.choice(pool_rows, len(pool_rows), p=p)
+                        futures.append(pool.submit(_fit_stage, model, X_ref, y, None, resample))
+                    fitted = [future.result() for future in futures]
+                    codes = [self._unit_output(model, X) for model in fitted]
+                    errors = [sample_weight[code != target].sum() / sample_weight.sum() for code in codes]
+                    best = int(np.argmin(errors))
+                    error, code = errors[best], codes[best]
+
+                    if error >= 1.0 - 1.0 / n_classes:
+                        if not units:
+                            raise ValueError("The first boosting stage is no better than chance; "
+                                             "AdaBoost needs members that beat random guessing.")
+                        warnings.warn(f"Stopped at stage {stage}: weighted error {error:.3f} is no better than chance.")
+                        break
+                    if error <= 0:
+                        # A perfect stage decides every row on its own
+                        alpha = 1.0
+                    else:
+                        alpha = self.learning_rate * (np.log((1.0 - error) / error) + np.log(n_classes - 1))
+                    stage_units = [(fitted[best], stage, -1, alpha)]
+                    stage_outputs = [code]
+                    incorrect = code != target
+                    sample_weight[incorrect] *= np.exp(alpha)
+                    sample_weight /= sample_weight.sum()
+                else:
+                    gradient = self._negative_gradient(F, target)
+                    futures = [[pool.submit(_fit_stage, self._clone_stage(i, stage), X_ref,
+                                            np.ascontiguousarray(gradient[:, k]), None, rows)
+                                for k in range(n_outputs)] for i in candidates]
+                    fitted = [[future.result() for future in group] for group in futures]
+                    outputs = [np.stack([self._unit_output(model, X) for model in group]) for group in fitted]
+                    residual_sums = [float(np.sum((gradient.T - output) ** 2)) for output in outputs]
+                    best = int(np.argmin(residual_sums))
+                    step = self.learning_rate
+                    if self.loss_ == "absolute_error":
+                        step *= self._line_search(target - F[:, 0], outputs[best][0])
+                    stage_units = [(model, stage, k, step) for k, model in enumerate(fitted[best])]
+                    stage_outputs = list(outputs[best])
+                    error = None
+
+                names = [self.names[candidates[best]]] * len(stage_units)
+                self._add_units(F, stage_outputs, stage_units)
+                units.extend(zip(stage_units, names))
+                n_stages = stage + 1
+                self.train_loss_.append(self._loss_sum(F, target) / n_samples)
+
+                if val_source is not None:
+                    val_loss = self._validation_loss(val_source, val_margins, stage_units)
+                    self.validation_loss_.append(val_loss)
+                    if val_loss < best_loss - tol:
+                        best_loss, best_stages = val_loss, n_stages
+                    elif patience is not None and n_stages - best_stages >= patience:
+                        break
+                if error is not None and error <= 0:
+                    break
+        finally:
+            if X_ref is not X:
+                X_ref.release()
+            if owned:
+                pool.shutdown()
+
+        self.best_iteration_ = best_stages if val_source is not None else n_stages
+        units = [unit for unit in units if unit[0][1] < self.best_iteration_]
+        self.n_estimators_ = self.best_iteration_
+        self.estimators_ = [unit[0] for unit, _ in units]
+        self.estimator_stages_ = np.array([unit[1] for unit, _ in units], dtype=np.intp)
+        self.estimator_outputs_ = np.array([unit[2] for unit, _ in units], dtype=np.intp)
+        self.estimator_weights_ = np.array([unit[3] for unit, _ in units], dtype=np.float64)
+        self.estimator_names_ = [f"{name}/{unit[1]}" + (f"[{unit[2]}]" if n_outputs > 1 and unit[2] >= 0 else "")
+                                 for unit, name in units]
+        self.n_outputs_ = n_outputs
+        return self.compile()
+
+    def compile(self):
+        """
+        Groups the fitted units for batched scoring: linear members are stacked
+        into one weight matrix (models.fused.FusedLinearEnsemble) and decision
+        trees into flat node arrays (PackedTrees); anything else keeps its own
+        predict. fit() compiles automatically.
+
+        :return: self
+        """
+        strategy = "hard_voting" if self.algorithm == "adaboost" else "averaging"
+        classes = self.classes_ if self.algorithm == "adaboost" else None
+        self.compiled_ = []
+        grouped = set()
+        linear = [i for i, model in enumerate(self.estimators_) if fusable(model, strategy)]
+        if linear:
+            self.compiled_.append((linear, FusedLinearEnsemble(
+                [self.estimators_[i] for i in linear], [None] * len(linear), self.n_features_in_,
+                strategy, classes)))
+            grouped.update(linear)
+        trees = [i for i, model in enumerate(self.estimators_) if i not in grouped and packable(model)]
+        if trees:
+            self.compiled_.append((trees, PackedTrees([self.estimators_[i] for i in trees],
+                                                      [None] * len(trees), classes)))
+            grouped.update(trees)
+        self.loose_index_ = [i for i in range(len(self.estimators_)) if i not in grouped]
+        return self
+
+    def _unit_outputs(self, X):
+        """Every unit's output for X, shape (n_units, n_samples); codes for AdaBoost."""
+        X = np.asarray(X)
+        adaboost = self.algorithm == "adaboost"
+        outputs = np.empty((len(self.estimators_), X.shape[0]), dtype=np.intp if adaboost else np.float64)
+        for index, group in self.compiled_:
+            if isinstance(group, FusedLinearEnsemble):
+                outputs[index] = group.vote_codes(X) if adaboost else group.predict_values(X)
+            else:
+                outputs[index] = group.predict_values(X)
+        for i in self.loose_index_:
+            outputs[i] = self._unit_output(self.estimators_[i], X)
+        return outputs
+
+    def decision_function(self, X):
+        """
+        Final margins: init_ plus every stage's contribution, combined with one
+        matrix product (gradient) or one bincount (AdaBoost votes).
+
+        :param X: Feature matrix
+        :return: Array of shape (n_samples, n_outputs_)
+        """
+        outputs = self._unit_outputs(X)
+        n_samples = outputs.shape[1]
+        F = np.tile(self.init_, (n_samples, 1))
+        if self.algorithm == "adaboost":
+            n_classes = F.shape[1]
+            flat = (np.arange(n_samples) * n_classes + outputs).ravel()
+            F += np.bincount(flat, weights=np.repeat(self.estimator_weights_, n_samples),
+                             minlength=n_samples * n_classes).reshape(n_samples, n_classes)
+        else:
+            scatter = np.zeros((len(self.estimators_), F.shape[1]))
+            scatter[np.arange(len(self.estimators_)), self.estimator_outputs_] = self.estimator_weights_
+            F += outputs.T @ scatter
+        return F
+
+    def staged_decision_function(self, X):
+        """
+        Margins after every stage, computed from one scoring pass over all units
+        and a cumulative sum over stages.
+
+        :param X: Feature matrix
+        :return: Array of shape (n_estimators_, n_samples, n_outputs_)
+        """
+        outputs = self._unit_outputs(X)
+        n_samples = outputs.shape[1]
+        staged = np.zeros((self.n_estimators_, n_samples, len(self.init_)))
+        if self.algorithm == "adaboost":
+            staged[self.estimator_stages_[:, None], np.arange(n_samples)[None, :], outputs] = \
+                self.estimator_weights_[:, None]
+        else:
+            staged[self.estimator_stages_, :, self.estimator_outputs_] = outputs * self.estimator_weights_[:, None]
+        np.cumsum(staged, axis=0, out=staged)
+        staged += self.init_
+        return staged
+
+    def _margins_to_predictions(self, F):
+        """Labels or values from margins of shape (..., n_outputs_)."""
+        if not self.is_classifier:
+            return F[..., 0]
+        if F.shape[-1] == 1:
+            return self.classes_[(F[..., 0] > 0).astype(np.intp)]
+        return self.classes_[np.argmax(F, axis=-1)]
+
+    def _margins_to_proba(self, F):
+        if not self.is_classifier:
+            raise ValueError("predict_proba is only available for classification.")
+        if self.algorithm == "adaboost":
+            return _softmax(F / max(F.shape[-1] - 1, 1))
+        if F.shape[-1] == 1:
+            from scipy.special import expit
+
+            positive = expit(F[..., 0])
+            return np.stack([1.0 - positive, positive], axis=-1)
+        return _softmax(F)
+
+    @instrument("boosting.predict")
+    def predict(self, X):
+        """
+        :param X: Feature matrix
+        :return: Predicted labels (classification) or values (regression)
+        """
+        return self._margins_to_predictions(self.decision_function(X))
+
+    def predict_proba(self, X):
+        """
+        :param X: Feature matrix
+        :return: Array of shape (n_samples, n_classes)
+        """
+        return self._margins_to_proba(self.decision_function(X))
+
+    def predict_iter(self, X, batch_size: int = 65536, method: str = "predict"):
+        """
+        Stream predictions over X in row chunks (same contract as
+        EnsembleModel.predict_iter, e.g. for utils.evaluation.evaluate_regression_stream).
+
+        :param X: Feature matrix
+        :param batch_size: Rows per chunk
+        :param method: 'predict' or 'predict_proba'
+        :return: Generator of (row_slice, chunk_predictions)
+        """
+        if method not in ("predict", "predict_proba"):
+            raise ValueError(f"Unknown method '{method}'. Options: ('predict', 'predict_proba')")
+        predict = self.predict if method == "predict" else self.predict_proba
+        n_samples = np.shape(X)[0]
+        for start in range(0, n_samples, batch_size):
+            rows = slice(start, min(start + batch_size, n_samples))
+            yield rows, predict(sampling.take(X, rows))
+
+    @instrument("boosting.staged_predict")
+    def staged_predict(self, X):
+        """
+        Predictions after every stage, e.g. for test-error curves.
+
+        :param X: Feature matrix
+        :return: Array of shape (n_estimators_, n_samples)
+        """
+        return self._margins_to_predictions(self.staged_decision_function(X))
+
+    def staged_predict_proba(self, X):
+        """
+        :param X: Feature matrix
+        :return: Array of shape (n_estimators_, n_samples, n_classes)
+        """
+        return self._margins_to_proba(self.staged_decision_function(X))
@@ -0,0 +1,141 @@
+# models/cache.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Content-addressed cache of fitted estimators. Entries are keyed by
+#              estimator class and params, a fingerprint of the training data and
+#              the member seed, held in an LRU in memory and optionally on disk.
+
+import copy
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+
+def fingerprint_data(*arrays):
+    """
+    Hashes the content, shape and dtype of the given arrays/DataFrames.
+
+    :return: Hex digest identifying the training data
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        if hasattr(array, "columns"):
+            digest.update(repr(list(array.columns)).encode())
+        array = np.ascontiguousarray(np.asarray(array))
+        digest.update(f"{array.shape}|{array.dtype.str}".encode())
+        if array.dtype.hasobject:
+            digest.update(pickle.dumps(array, protocol=pickle.HIGHEST_PROTOCOL))
+        else:
+            digest.update(memoryview(array).cast("B"))
+    return digest.hexdigest()
+
+
+def estimator_key(model, data_fingerprint, seed=None, extra=None):
+    """
+    Builds the cache key for one fitted estimator.
+
+    :param model: Unfitted estimator (class and get_params() are hashed)
+    :param data_fingerprint: Output of fingerprint_data for the training data
+    :param seed: Member SeedSequence or int seed, if the fit depends on one
+    :param extra: Any other fit-affecting settings (e.g. bagging parameters)
+    :return: Hex digest
+    """
+    params = model.get_params(deep=False) if hasattr(model, "get_params") else {}
+    if isinstance(seed, np.random.SeedSequence):
+        seed = (seed.entropy, seed.spawn_key)
+    parts = [
+        f"{type(model).__module__}.{type(model).__qualname__}",
+        repr(sorted(params.items())),
+        data_fingerprint,
+        repr(seed),
+        repr(sorted(extra.items()) if isinstance(extra, dict) else extra),
+    ]
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+
+
+class FittedModelCache:
+    """
+    LRU cache of fitted estimators with an optional on-disk second level.
+
+    Stored estimators are deep copies, so later refits of the original object do
+    not change the cached entry. Returned estimators are shared between callers
+    and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 64, cache_dir: str = None):
+        """
+        :param max_entries: Maximum number of fitted estimators kept in memory
+        :param cache_dir: Optional directory for pickled entries that survive the process
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        Returns the fitted estimator for `key`, or None on a miss.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        if self.cache_dir and os.path.exists(self._disk_path(key)):
+            with open(self._disk_path(key), "rb") as f:
+                model = pickle.load(f)
+            self._remember(key, model)
+            self.hits += 1
+            return model
+
+        self.misses += 1
+        return None
+
+    def put(self, key, model):
+        """
+        Stores a copy of a fitted estimator under `key`.
+        """
+        model = copy.deepcopy(model)
+        self._remember(key, model)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        return model
+
+    def _remember(self, key, model):
+        self._entries[key] = model
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self, disk: bool = False):
+        """
+        Drops in-memory entries, and pickled entries too when disk=True.
+        """
+        self._entries.clear()
+        if disk and self.cache_dir:
+            for fname in os.listdir(self.cache_dir):
+                if fname.endswith(".pkl"):
+                    os.remove(os.path.join(self.cache_dir, fname))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or bool(
+            self.cache_dir and os.path.exists(self._disk_path(key)))
+
+    def stats(self):
+        """Hit/miss counters for logging."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
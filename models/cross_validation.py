@@ -0,0 +1,280 @@
+# models/cross_validation.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Cross-validated ensemble evaluation from a shared out-of-fold (OOF) matrix.
+#              Every member is fit once per fold (member x fold jobs run in parallel) and
+#              its held-out predictions/probabilities are stored. Voting strategies,
+#              weight settings, member subsets and stacking are then all scored from
+#              that matrix without refitting, with metrics reported per fold.
+
+import copy
+
+import numpy as np
+
+from models.executors import get_executor, materialize, share, worker_task
+from models.voting import encode_labels, vote_counts, align_proba
+from models import sampling
+from utils.instrumentation import instrument, span
+
+
+def _clone(model):
+    """Unfitted copy of a member (sklearn clone when available)."""
+    try:
+        from sklearn.base import clone
+
+        return clone(model)
+    except (ImportError, TypeError):
+        return copy.deepcopy(model)
+
+
+@worker_task
+def _fit_predict_fold(model, X_ref, y_ref, train_idx, test_idx):
+    """
+    Fits a fresh copy of one member on a fold's training rows and predicts its
+    held-out rows. Module level so process pools can pickle it.
+
+    :return: (predictions, probabilities or None, member classes or None)
+    """
+    X = materialize(X_ref)
+    y = materialize(y_ref)
+    with span("cv.fit_member_fold", model=type(model).__name__):
+        model = _clone(model)
+        model.fit(sampling.take(X, train_idx), sampling.take(y, train_idx))
+        X_test = sampling.take(X, test_idx)
+        pred = model.predict(X_test)
+        if hasattr(model, "predict_proba"):
+            try:
+                return pred, model.predict_proba(X_test), model.classes_
+            except (AttributeError, NotImplementedError):
+                pass
+        return pred, None, None
+
+
+def make_folds(y, n_splits=5, random_state=None, stratified=True):
+    """
+    Assigns every row to a fold.
+
+    :return: Integer array of shape (n_samples,) with fold ids 0..n_splits-1
+    """
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    splitter_cls = StratifiedKFold if stratified else KFold
+    splitter = splitter_cls(n_splits=n_splits, shuffle=True, random_state=random_state)
+    folds = np.empty(len(y), dtype=np.intp)
+    for fold, (_, test_idx) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        folds[test_idx] = fold
+    return folds
+
+
+class OutOfFoldPredictions:
+    """
+    Held-out outputs of every member for every row.
+
+    codes_:   (n_members, n_samples) predicted labels encoded against classes_
+    probas_:  (n_members, n_samples, n_classes) aligned probabilities; rows of
+              members without predict_proba are NaN (see has_proba_)
+    folds_:   (n_samples,) fold id of each row
+    """
+
+    def __init__(self, names, classes, y, folds, codes, probas, has_proba):
+        self.names = list(names)
+        self.classes_ = np.asarray(classes)
+        self.y = np.asarray(y)
+        self.folds_ = folds
+        self.codes_ = codes
+        self.probas_ = probas
+        self.has_proba_ = has_proba
+        self.n_splits = int(folds.max()) + 1
+
+    def _indices(self, members):
+        if members is None:
+            return list(range(len(self.names)))
+        lookup = {name: i for i, name in enumerate(self.names)}
+        return [lookup[name] for name in members]
+
+    def _weights(self, weights, indices):
+        if weights is None:
+            return None
+        if isinstance(weights, dict):
+            return np.asarray([weights.get(self.names[i], 0.0) for i in indices], dtype=np.float64)
+        return np.asarray(weights, dtype=np.float64)
+
+    def scores(self, strategy="hard_voting", weights=None, members=None):
+        """
+        Combined class scores of a member subset for every row, without refitting.
+
+        :param strategy: 'hard_voting' (vote shares) or 'soft_voting' (mean probabilities)
+        :param weights: Per-member weights as a list (subset order) or {name: weight}
+        :param members: Member names to combine (default: all)
+        :return: Array of shape (n_samples, n_classes)
+        """
+        indices = self._indices(members)
+        w = self._weights(weights, indices)
+        if strategy == "hard_voting":
+            counts = vote_counts(self.codes_[indices], len(self.classes_), w)
+            return counts / (len(indices) if w is None else w.sum())
+        if strategy == "soft_voting":
+            missing = [self.names[i] for i in indices if not self.has_proba_[i]]
+            if missing:
+                raise ValueError(f"Members without predict_proba cannot soft-vote: {missing}")
+            w = np.ones(len(indices)) if w is None else w
+            return np.tensordot(w, self.probas_[indices], axes=1) / w.sum()
+        raise NotImplementedError(f"Strategy '{strategy}' is not supported for CV scoring.")
+
+    def predict(self, strategy="hard_voting", weights=None, members=None):
+        """Combined out-of-fold predictions of a member subset."""
+        return self.classes_[np.argmax(self.scores(strategy, weights, members), axis=1)]
+
+    def stacking_predict(self, meta_model=None, members=None):
+        """
+        Out-of-fold predictions of a stacked meta-learner. For each fold the meta
+        model is trained on the other folds' OOF member outputs (probabilities,
+        or one-hot votes for members without predict_proba) and predicts the
+        held-out fold; the members themselves are never refit.
+        """
+        if meta_model is None:
+            from sklearn.linear_model import LogisticRegression
+
+            meta_model = LogisticRegression(max_iter=1000)
+        features = self.meta_features(members)
+        pred = np.empty(len(self.y), dtype=self.classes_.dtype)
+        for fold in range(self.n_splits):
+            test = self.folds_ == fold
+            meta = _clone(meta_model).fit(features[~test], self.y[~test])
+            pred[test] = meta.predict(features[test])
+        return pred
+
+    def meta_features(self, members=None):
+        """(n_samples, n_members * n_classes) stacking features."""
+        blocks = []
+        for i in self._indices(members):
+            if self.has_proba_[i]:
+                blocks.append(self.probas_[i])
+            else:
+                blocks.append(np.eye(len(self.classes_))[self.codes_[i]])
+        return np.hstack(blocks)
+
+    def fold_metrics(self, y_pred, report=True):
+        """
+        Per-fold and pooled metrics of a set of OOF predictions.
+
+        :return: dict with accuracy_mean/std, fold_accuracy, the summed
+                 confusion_matrix and the pooled classification report
+        """
+        return self.fold_metrics_many([y_pred], report)[0]
+
+    def fold_metrics_many(self, predictions, report=True):
+        """
+        fold_metrics for many OOF prediction vectors, counted in one batched pass.
+
+        :param predictions: Sequence of (n_samples,) prediction vectors
+        :param report: Format the text report (None otherwise)
+        :return: List of fold_metrics dicts, in order
+        """
+        from utils.evaluation import evaluate_many
+
+        batch = evaluate_many(self.y, np.asarray(predictions), folds=self.folds_, labels=self.classes_)
+        fold_accuracy = batch.fold_accuracy()
+        results = []
+        for i, accuracies in enumerate(fold_accuracy):
+            results.append({
+                "accuracy_mean": float(np.mean(accuracies)),
+                "accuracy_std": float(np.std(accuracies, ddof=1)) if len(accuracies) > 1 else 0.0,
+                "fold_accuracy": [float(a) for a in accuracies],
+                "confusion_matrix": batch.confusion_matrices[i].sum(axis=0),
+                "report": batch.metrics(i).report() if report else None,
+            })
+        return results
+
+
+@instrument("cv.cross_val_predictions")
+def cross_val_predictions(models, X, y, n_splits=5, random_state=None, stratified=True,
+                          executor=None, n_jobs=None):
+    """
+    Fits every member once per fold, in parallel, and collects the out-of-fold
+    prediction/probability matrix.
+
+    :param models: Dict of name -> unfitted estimator (or an EnsembleModel)
+    :param X: Feature matrix
+    :param y: Labels
+    :param n_splits: Number of folds
+    :param random_state: Seed for the fold shuffle and the members' random_state
+    :param stratified: Use stratified folds
+    :param executor: 'serial', 'thread', 'process' or an Executor (see models.executors)
+    :param n_jobs: Worker count
+    :return: OutOfFoldPredictions
+    """
+    if hasattr(models, "models") and hasattr(models, "names"):
+        models = dict(zip(models.names, models.models))
+    names, members = list(models.keys()), list(models.values())
+    y = np.asarray(y)
+    classes = np.unique(y)
+    folds = make_folds(y, n_splits, random_state, stratified)
+
+    if random_state is not None:
+        for model, seed in zip(members, sampling.member_seeds(random_state, names)):
+            params = model.get_params() if hasattr(model, "get_params") else {}
+            if "random_state" in params and params["random_state"] is None:
+                model.set_params(random_state=sampling.estimator_seed(seed))
+
+    n_samples = len(y)
+    codes = np.empty((len(members), n_samples), dtype=np.intp)
+    probas = np.full((len(members), n_samples, len(classes)), np.nan)
+    has_proba = np.ones(len(members), dtype=bool)
+
+    pool, kind, owned = get_executor(executor, n_jobs)
+    X_ref, y_ref = share(X, kind), share(y, kind)
+    try:
+        jobs = []
+        for fold in range(n_splits):
+            train_idx, test_idx = np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+            for m, model in enumerate(members):
+                jobs.append((m, test_idx, pool.submit(_fit_predict_fold, model, X_ref, y_ref,
+                                                      train_idx, test_idx)))
+        for m, test_idx, future in jobs:
+            pred, proba, member_classes = future.result()
+            codes[m, test_idx] = encode_labels(np.asarray(pred)[None, :], classes)[0]
+            if proba is None:
+                has_proba[m] = False
+            else:
+                probas[m, test_idx] = align_proba(np.asarray(proba, dtype=np.float64),
+                                                  member_classes, classes)
+    finally:
+        for ref, original in ((X_ref, X), (y_ref, y)):
+            if ref is not original:
+                ref.release()
+        if owned:
+            pool.shutdown()
+    return OutOfFoldPredictions(names, classes, y, folds, codes, probas, has_proba)
+
+
+def evaluate_cv(oof, strategies=("hard_voting", "soft_voting"), weight_settings=None,
+                stacking=True, report=True):
+    """
+    Scores every strategy x weight setting (plus stacking) from one OOF matrix.
+    Soft voting only uses members with predict_proba.
+
+    :param oof: OutOfFoldPredictions
+    :param strategies: Voting strategies to score
+    :param weight_settings: Dict of label -> weights ({name: weight}); None = uniform only
+    :param stacking: Also score a logistic-regression meta-learner
+    :param report: Format a text report per setting (skip for large sweeps)
+    :return: List of result dicts (strategy, weights, members + fold_metrics output)
+    """
+    weight_settings = {"uniform": None, **(weight_settings or {})}
+    proba_members = [name for name, ok in zip(oof.names, oof.has_proba_) if ok]
+    settings, predictions = [], []
+    for strategy in strategies:
+        members = proba_members if strategy == "soft_voting" else oof.names
+        if not members:
+            continue
+        for label, weights in weight_settings.items():
+            settings.append({"strategy": strategy, "weights": label, "members": members})
+            predictions.append(oof.predict(strategy, weights, members))
+    if stacking:
+        settings.append({"strategy": "stacking", "weights": "meta_learner", "members": oof.names})
+        predictions.append(oof.stacking_predict())
+    if not predictions:
+        return []
+    # Every setting is scored in one batched count over the shared labels/folds
+    return [{**setting, **metrics}
+            for setting, metrics in zip(settings, oof.fold_metrics_many(predictions, report))]
@@ -4,9 +4,76 @@
 # This file defines an object-oriented interface to add, train, and predict using multiple models.
 
 
+import copy
+from concurrent.futures import Future
+from contextlib import contextmanager
 from typing import List, Union
+import warnings
 import numpy as np
 
+from models.cache import estimator_key, fingerprint_data
+from models.executors import get_executor, materialize, resolve_n_jobs, share, worker_task
+from models.voting import (soft_vote, encode_labels, vote_counts, align_proba, check_trim, combine_values,
+                           REGRESSION_STRATEGIES)
+from models.fused import FusedLinearEnsemble, fusable
+from models import sampling, streaming
+from utils.evaluation import RegressionAccumulator
+from utils.instrumentation import instrument, span
+
+TASKS = ("classification", "regression")
+CLASSIFICATION_STRATEGIES = ("hard_voting", "soft_voting")
+
+
+def default_task(strategy):
+    """Task implied by a combination strategy."""
+    return "regression" if strategy in REGRESSION_STRATEGIES else "classification"
+
+
+@worker_task
+def _fit_member(model, X_ref, y_ref, seed=None, bagging=None):
+    """
+    Fits a single member. Runs inside the executor, so it must stay at module
+    level to be picklable for process pools.
+
+    With bagging enabled the member's rows/columns are regenerated here from its
+    seed. Bootstrap rows are passed as sample-weight counts when the estimator
+    supports it, so only a feature subset (if any) is ever materialized.
+    """
+    X = materialize(X_ref)
+    y = materialize(y_ref)
+    with span("ensemble.fit_member", model=type(model).__name__):
+        if bagging is None:
+            model.fit(X, y)
+            return model
+
+        samples, features = sampling.draw_indices(seed, X.shape[0], X.shape[1], **bagging)
+        if samples is not None and sampling.supports_sample_weight(model):
+            weights = np.bincount(samples, minlength=X.shape[0]).astype(np.float64)
+            model.fit(sampling.take(X, features=features), y, sample_weight=weights)
+        else:
+            model.fit(sampling.take(X, samples, features), sampling.take(y, samples))
+        return model
+
+
+def _partial_fit_member(model, X, y, features=None, classes=None, sample_weight=None):
+    """Feeds one mini-batch to an incremental member (runs in a thread)."""
+    kwargs = {}
+    if classes is not None:
+        kwargs["classes"] = classes
+    if sample_weight is not None:
+        kwargs["sample_weight"] = sample_weight
+    with span("ensemble.partial_fit_member", model=type(model).__name__):
+        model.partial_fit(sampling.take(X, features=features), y, **kwargs)
+    return model
+
+
+@worker_task
+def _call_member(model, method, X_ref, features=None):
+    """Calls predict/predict_proba on a single member inside the executor."""
+    with span(f"ensemble.{method}_member", model=type(model).__name__):
+        return getattr(model, method)(sampling.take(materialize(X_ref), features=features))
+
+
 class EnsembleModel:
     '''
     def __init__(self, strategy: str = "hard_voting"):
@@ -21,60 +88,727 @@ class EnsembleModel:
         self.is_classifier = True  # Will adjust after first fit
     '''
     
-    def __init__(self, strategy: str = "hard_voting", models: dict = None):
+    def __init__(self, strategy: str = "hard_voting", models: dict = None,
+                 n_jobs: int = None, executor=None, weights: List[float] = None,
+                 bootstrap: bool = False, max_samples: Union[int, float] = 1.0,
+                 max_features: Union[int, float] = 1.0, bootstrap_features: bool = False,
+                 oob_score: bool = False, random_state=None, cache=None, task: str = None,
+                 trim: float = 0.1):
+        """
+        :param strategy: Combination strategy: 'hard_voting' or 'soft_voting' for
+                         classification; 'averaging' (weighted mean), 'median' or
+                         'trimmed_mean' for regression
+        :param models: Optional dict of name -> estimator to add up front
+        :param n_jobs: Number of workers used to fit/predict members (-1 = all cores)
+        :param executor: 'serial', 'thread', 'process' or a concurrent.futures.Executor
+        :param weights: Optional per-member weights for voting/averaging
+        :param bootstrap: Draw each member's training rows with replacement
+        :param max_samples: Rows per member (int count or fraction of n_samples)
+        :param max_features: Columns per member (int count or fraction of n_features)
+        :param bootstrap_features: Draw columns with replacement
+        :param oob_score: Score the ensemble on out-of-bag rows after fit
+        :param random_state: Seed for the per-member RNG streams
+        :param cache: Optional FittedModelCache; members already fitted on the same
+                      data, params and seed are reused instead of refit
+        :param task: 'classification' or 'regression' (default: implied by the strategy)
+        :param trim: Fraction of members (by weight) dropped at each end for 'trimmed_mean'.
+                     Unweighted, int(trim * n_members) members are cut per end, so the
+                     default needs 10+ members; fit warns once if the trim is degenerate
+        """
         self.models: List = []
+        self.names: List[str] = []
         self.strategy = strategy
-        self.is_classifier = True  # Will adjust after first fit
+        self.task = task
+        self.trim = trim
+        self.is_classifier = (task or default_task(strategy)) == "classification"
+        self.n_jobs = n_jobs
+        self.executor = executor
+        self.weights = weights
+        self.bootstrap = bootstrap
+        self.max_samples = max_samples
+        self.max_features = max_features
+        self.bootstrap_features = bootstrap_features
+        self.oob_score = oob_score
+        self.random_state = random_state
+        self.cache = cache
 
         if models:
-            for model in models.values():
-                self.add_model(model)
+            for name, model in models.items():
+                self.add_model(model, name=name)
         
-    def add_model(self, model):
+    def add_model(self, model, name: str = None):
         """
         Add a model to the ensemble.
 
         :param model: Any sklearn-compatible estimator (must implement fit/predict)
+        :param name: Optional display name, defaults to the estimator class name
         """
         self.models.append(model)
+        self.names.append(name or f"{type(model).__name__}_{len(self.models) - 1}")
+
+    def _task(self):
+        """Validated task for the current strategy; also sets is_classifier."""
+        task = self.task or default_task(self.strategy)
+        if task not in TASKS:
+            raise ValueError(f"Unknown task '{task}'. Options: {TASKS}")
+        strategies = CLASSIFICATION_STRATEGIES if task == "classification" else REGRESSION_STRATEGIES
+        if self.strategy not in strategies:
+            raise ValueError(f"Strategy '{self.strategy}' does not apply to {task}. Options: {strategies}")
+        if self.strategy == "trimmed_mean" and not 0 <= self.trim < 0.5:
+            raise ValueError(f"trim must be in [0, 0.5), got {self.trim}")
+        self.is_classifier = task == "classification"
+        return task
+
+    def _members(self):
+        """Fitted members when available, otherwise the models as added."""
+        return getattr(self, "estimators_", self.models)
+
+    def _member_features(self):
+        """Feature subset of each member (None means all columns)."""
+        features = getattr(self, "estimators_features_", None)
+        if features is None:
+            return [None] * len(self._members())
+        return features
+
+    def _bagging_params(self):
+        """Sampling settings passed to workers, or None when bagging is off."""
+        params = dict(max_samples=self.max_samples, max_features=self.max_features,
+                      bootstrap=self.bootstrap, bootstrap_features=self.bootstrap_features)
+        if not self.bootstrap and not self.bootstrap_features \
+                and self.max_samples == 1.0 and self.max_features == 1.0:
+            return None
+        return params
+
+    @property
+    def estimators_samples_(self):
+        """
+        Row indices drawn for each fitted member, regenerated from the member
+        seeds on access (None for members trained on every row).
+        """
+        if getattr(self, "streamed_", False):
+            raise ValueError("Streaming fits use online (Poisson) bagging; sample indices are not stored.")
+        bagging = self._bagging_params()
+        if bagging is None:
+            return [None] * len(self.estimators_)
+        return [sampling.draw_indices(seed, self.n_samples_, self.n_features_in_, **bagging)[0]
+                for seed in self.estimators_seeds_]
+
+    def _map_members(self, method, X, indices=None):
+        """
+        Runs `method` (predict/predict_proba) on the selected members (all by
+        default) through the configured executor and returns the results in
+        member order.
+        """
+        members = self._members()
+        features = self._member_features()
+        indices = range(len(members)) if indices is None else indices
+        if not len(indices):
+            return []
+        scoped = getattr(self, "_scoped_pool", None)
+        if scoped is not None:
+            (pool, kind), owned = scoped, False
+        else:
+            pool, kind, owned = get_executor(self.executor, self.n_jobs)
+        X_ref = share(X, kind)
+        try:
+            futures = [pool.submit(_call_member, members[i], method, X_ref, features[i])
+                       for i in indices]
+            return [future.result() for future in futures]
+        finally:
+            if X_ref is not X:
+                X_ref.release()
+            if owned:
+                pool.shutdown()
+
+    @contextmanager
+    def _executor_scope(self):
+        """Keeps one executor alive across many _map_members calls (e.g. per chunk)."""
+        if getattr(self, "_scoped_pool", None) is not None:
+            yield
+            return
+        pool, kind, owned = get_executor(self.executor, self.n_jobs)
+        self._scoped_pool = (pool, kind)
+        try:
+            yield
+        finally:
+            self._scoped_pool = None
+            if owned:
+                pool.shutdown()
 
+    @instrument("ensemble.fit")
     def fit(self, X, y):
         """
-        Fit all models on the same training data.
+        Fit all models, optionally in parallel. Without bagging every member
+        sees the full training data; with bagging each member trains on its own
+        bootstrap/feature subsample drawn from a seeded per-member RNG stream.
+
+        When a cache is configured, members whose (params, data, seed) key is
+        already cached are taken from it and only the misses are trained.
+
+        Members that raise during fit are dropped from the fitted ensemble and
+        reported in `fit_errors_` (name -> error message) instead of aborting
+        the whole fit. A RuntimeError is raised only if every member fails.
 
         :param X: Feature matrix
         :param y: Target labels
         """
-        for model in self.models:
-            model.fit(X, y)
+        if not self.models:
+            raise ValueError("No models in the ensemble. Add models before fitting.")
+        # Checked before any member is trained: without subsampling no row is out-of-bag
+        if self.oob_score and not self.bootstrap and self.max_samples == 1.0:
+            raise ValueError("Out-of-bag scoring requires bootstrap=True or max_samples < 1.0.")
+
+        self._task()
+        self.n_samples_, self.n_features_in_ = np.shape(X)
+        self.streamed_ = False
+        bagging = self._bagging_params()
+        seeds = sampling.member_seeds(self.random_state, self.names)
+        self._seed_members(seeds)
+
+        keys = [None] * len(self.models)
+        if self.cache is not None:
+            fingerprint = fingerprint_data(X, y)
+            seeded = bagging is not None or self.random_state is not None
+            keys = [estimator_key(model, fingerprint, seed if seeded else None, bagging)
+                    for model, seed in zip(self.models, seeds)]
+        cached = [self.cache.get(key) if key else None for key in keys]
+
+        pool, kind, owned = get_executor(self.executor, self.n_jobs)
+        pending = any(model is None for model in cached)
+        X_ref = share(X, kind) if pending else X
+        y_ref = share(y, kind) if pending else y
+        try:
+            futures = []
+            for model, seed, hit in zip(self.models, seeds, cached):
+                if hit is None:
+                    futures.append(pool.submit(_fit_member, model, X_ref, y_ref, seed, bagging))
+                else:
+                    futures.append(Future())
+                    futures[-1].set_result(hit)
+
+            self.estimators_ = []
+            self.estimator_names_ = []
+            self.estimators_seeds_ = []
+            self.estimators_features_ = []
+            self.fit_errors_ = {}
+            for name, seed, future, key, hit in zip(self.names, seeds, futures, keys, cached):
+                try:
+                    fitted = future.result()
+                    if key and hit is None:
+                        self.cache.put(key, fitted)
+                    self.estimators_.append(fitted)
+                    self.estimator_names_.append(name)
+                    self.estimators_seeds_.append(seed)
+                    self.estimators_features_.append(
+                        None if bagging is None else
+                        sampling.draw_indices(seed, self.n_samples_, self.n_features_in_, **bagging)[1])
+                except Exception as exc:
+                    self.fit_errors_[name] = f"{type(exc).__name__}: {exc}"
+        finally:
+            for ref, original in ((X_ref, X), (y_ref, y)):
+                if ref is not original:
+                    ref.release()
+            if owned:
+                pool.shutdown()
 
-        # Try to infer whether it's classification or regression based on first model
-        sample_pred = self.models[0].predict(X[:5])
-        self.is_classifier = len(np.unique(sample_pred)) <= len(np.unique(y))
+        if self.fit_errors_:
+            if not self.estimators_:
+                del self.estimators_
+                raise RuntimeError(f"All ensemble members failed to fit: {self.fit_errors_}")
+            warnings.warn(f"Ensemble members failed to fit and were skipped: {self.fit_errors_}")
 
-    def predict(self, X):
+        self.fused_ = None
+        if self.is_classifier:
+            self.classes_ = np.unique(y)
+        self._check_trim()
+
+        if self.oob_score:
+            self._compute_oob_score(X, y)
+        return self
+
+    def _seed_members(self, seeds):
+        """Gives members without their own random_state one derived from the ensemble seed."""
+        if self.random_state is None:
+            return
+        for model, seed in zip(self.models, seeds):
+            params = model.get_params() if hasattr(model, "get_params") else {}
+            if "random_state" in params and params["random_state"] is None:
+                model.set_params(random_state=sampling.estimator_seed(seed))
+
+    def _check_trim(self):
+        """Checks the trimmed-mean cut once against the fitted member count (see check_trim)."""
+        if self.strategy == "trimmed_mean" and self.weights is None:
+            check_trim(self.trim, len(self.estimators_))
+
+    def _set_fitted(self, indices, seeds, features):
+        """Publishes the given members as the fitted ensemble (in add order)."""
+        indices = sorted(indices)
+        self.estimators_ = [self.models[i] for i in indices]
+        self.estimator_names_ = [self.names[i] for i in indices]
+        self.estimators_seeds_ = [seeds[i] for i in indices]
+        self.estimators_features_ = [features[i] for i in indices]
+        self.fused_ = None
+
+    def _stream_score(self, source):
+        """Accuracy (classification) or R^2 of the current fitted members over a batch source."""
+        correct = n = 0
+        accumulator = RegressionAccumulator()
+        for X_b, y_b in source():
+            y_b = np.asarray(y_b)
+            pred = self._predict_batch(np.asarray(X_b))
+            if self.is_classifier:
+                correct += int(np.sum(pred == y_b))
+                n += len(y_b)
+            else:
+                accumulator.update(y_b, pred)
+        if self.is_classifier:
+            return correct / max(n, 1)
+        return accumulator.result()["r2"]
+
+    @instrument("ensemble.fit_stream")
+    def fit_stream(self, data, classes=None, batch_size: int = 65536, epochs: int = 1,
+                   validation=None, patience: int = None, tol: float = 1e-4,
+                   reservoir_size: int = 100_000, non_incremental: str = "reservoir"):
         """
-        Predict using the ensemble strategy selected at initialization.
+        Out-of-core fit. Mini-batches are pulled from a chunked source once per
+        epoch and each batch is fed to every member with partial_fit in the same
+        pass (members run in parallel threads when n_jobs > 1). With bootstrap=True
+        each member sees every row Poisson(1) times (online bagging); feature
+        subsampling works as in fit().
 
-        :param X: Feature matrix
-        :return: Combined predictions from the ensemble
+        Members without partial_fit are trained after the first pass on a
+        uniform reservoir sample of the stream ('reservoir'), on the whole stream
+        collected in memory ('full'), or left out ('skip').
+
+        With a validation source the ensemble of incremental members is scored
+        after every epoch; training stops once the score has not improved by
+        more than tol for `patience` epochs, and the best epoch's members are kept.
+        NaN scores never count as an improvement; if no epoch scores, best_epoch_
+        stays None and the last epoch's members are kept.
+
+        :param data: Chunked training source, see models.streaming.batch_source
+                     (e.g. a registry Dataset, (X_memmap, y), or a batch callable)
+        :param classes: Every class label; scanned from the stream when omitted
+        :param batch_size: Rows per batch for sources sliced here
+        :param epochs: Maximum passes over the stream
+        :param validation: Held-out source for early stopping
+        :param patience: Epochs without improvement before stopping (None = never stop early)
+        :param tol: Minimum score improvement that resets patience
+        :param reservoir_size: Rows kept for members without partial_fit
+        :param non_incremental: 'reservoir', 'full' or 'skip'
+        :return: self
         """
         if not self.models:
-            raise ValueError("No models in the ensemble. Add models before predicting.")
+            raise ValueError("No models in the ensemble. Add models before fitting.")
+        if non_incremental not in ("reservoir", "full", "skip"):
+            raise ValueError(f"Unknown non_incremental '{non_incremental}'. Options: ('reservoir', 'full', 'skip')")
+        if self.oob_score:
+            raise ValueError("Out-of-bag scoring is not available for streaming fits.")
+        if self.max_samples != 1.0:
+            raise ValueError("max_samples is not supported for streaming fits; use bootstrap=True.")
+
+        source = streaming.batch_source(data, batch_size)
+        val_source = None if validation is None else streaming.batch_source(validation, batch_size)
+        if self._task() == "classification":
+            if classes is None and hasattr(data, "y"):
+                classes = np.unique(np.asarray(data.y))
+            elif classes is None:
+                classes = np.unique(np.concatenate([np.unique(np.asarray(y_b)) for _, y_b in source()]))
+            self.classes_ = np.asarray(classes)
+
+        seeds = sampling.member_seeds(self.random_state, self.names)
+        self._seed_members(seeds)
+        rngs = [np.random.default_rng(seed) for seed in seeds]
+        incremental = [i for i, m in enumerate(self.models) if streaming.is_incremental(m)]
+        static = [i for i in range(len(self.models)) if i not in set(incremental)]
+        accepts = {i: streaming.partial_fit_kwargs(self.models[i]) for i in incremental}
+        keep_rows = static and non_incremental != "skip"
+        reservoir = streaming.Reservoir(reservoir_size, sampling.member_seeds(self.random_state, ["reservoir"])[0])
+        collected = []
+        features = [None] * len(self.models)
+        self.fit_errors_ = {}
+        self.streamed_ = True
+        self.validation_scores_ = []
+        best_score, best_members, self.best_epoch_ = -np.inf, None, None
+
+        workers = resolve_n_jobs(self.n_jobs)
+        # partial_fit updates members in place, so parallelism is thread-based
+        pool, _, owned = get_executor("thread" if workers > 1 else "serial", workers)
+        try:
+            for epoch in range(epochs):
+                n_rows = 0
+                for X_b, y_b in source():
+                    X_b, y_b = np.asarray(X_b), np.asarray(y_b)
+                    if epoch == 0 and n_rows == 0:
+                        self.n_features_in_ = X_b.shape[1]
+                        features = [sampling.draw_indices(
+                            seed, 1, self.n_features_in_, max_features=self.max_features,
+                            bootstrap_features=self.bootstrap_features)[1] for seed in seeds]
+                    n_rows += len(y_b)
+                    if epoch == 0 and keep_rows:
+                        if non_incremental == "reservoir":
+                            reservoir.update(X_b, y_b)
+                        else:
+                            collected.append((X_b, y_b))
+
+                    futures = []
+                    for i in incremental:
+                        if self.names[i] in self.fit_errors_:
+                            continue
+                        X_m, y_m, weights = X_b, y_b, None
+                        if self.bootstrap:
+                            weights = streaming.poisson_weights(rngs[i], len(y_b))
+                            if "sample_weight" not in accepts[i]:
+                                rows = np.repeat(np.arange(len(y_b)), weights.astype(np.intp))
+                                X_m, y_m, weights = X_b[rows], y_b[rows], None
+                        member_classes = classes if "classes" in accepts[i] and self.is_classifier else None
+                        futures.append((i, pool.submit(_partial_fit_member, self.models[i], X_m, y_m,
+                                                       features[i], member_classes, weights)))
+                    for i, future in futures:
+                        try:
+                            future.result()
+                        except Exception as exc:
+                            self.fit_errors_[self.names[i]] = f"{type(exc).__name__}: {exc}"
+                if epoch == 0:
+                    self.n_samples_ = n_rows
+                self.n_epochs_ = epoch + 1
+
+                alive = [i for i in incremental if self.names[i] not in self.fit_errors_]
+                if val_source is None or not alive:
+                    continue
+                self._set_fitted(alive, seeds, features)
+                score = self._stream_score(val_source)
+                self.validation_scores_.append(score)
+                # A NaN score (e.g. diverged members) never counts as an improvement
+                if not np.isnan(score) and score > best_score + tol:
+                    best_score, self.best_epoch_ = score, epoch
+                    best_members = {i: copy.deepcopy(self.models[i]) for i in alive}
+                elif patience is not None:
+                    # Without any valid score yet, patience counts from before the first epoch
+                    last_best = -1 if self.best_epoch_ is None else self.best_epoch_
+                    if epoch - last_best >= patience:
+                        break
+        finally:
+            if owned:
+                pool.shutdown()
+
+        if best_members is not None and self.best_epoch_ != self.n_epochs_ - 1:
+            for i, model in best_members.items():
+                self.models[i] = model
+
+        bagging = self._bagging_params()
+        if static and non_incremental == "skip":
+            for i in static:
+                self.fit_errors_[self.names[i]] = "skipped: no partial_fit"
+        elif static:
+            if non_incremental == "reservoir":
+                X_s, y_s = reservoir.data()
+            else:
+                X_s = np.concatenate([X_b for X_b, _ in collected])
+                y_s = np.concatenate([y_b for _, y_b in collected])
+            for i in static:
+                try:
+                    _fit_member(self.models[i], X_s, y_s, seeds[i], bagging)
+                    if bagging is not None:
+                        features[i] = sampling.draw_indices(seeds[i], X_s.shape[0], X_s.shape[1], **bagging)[1]
+                except Exception as exc:
+                    self.fit_errors_[self.names[i]] = f"{type(exc).__name__}: {exc}"
+
+        fitted = [i for i in range(len(self.models)) if self.names[i] not in self.fit_errors_]
+        if not fitted:
+            raise RuntimeError(f"All ensemble members failed to fit: {self.fit_errors_}")
+        if self.fit_errors_:
+            warnings.warn(f"Ensemble members failed to fit and were skipped: {self.fit_errors_}")
+        self._set_fitted(fitted, seeds, features)
+        self._check_trim()
+        return self
+
+    def _compute_oob_score(self, X, y):
+        """
+        Scores every row using only the members that did not train on it.
+        Sets oob_score_ (accuracy or R^2) and oob_prediction_/oob_decision_function_.
+        """
+        y = np.asarray(y)
+        n_samples = self.n_samples_
+        weights = self._member_weights()
+        is_classifier = self.is_classifier
+        use_proba = self.strategy == "soft_voting"
+        if is_classifier:
+            totals = np.zeros((n_samples, len(self.classes_)))
+        else:
+            totals = np.zeros(n_samples)
+        norms = np.zeros(n_samples)
+
+        for m, (model, samples, features) in enumerate(zip(
+                self.estimators_, self.estimators_samples_, self.estimators_features_)):
+            mask = sampling.oob_mask(samples, n_samples)
+            if not mask.any():
+                continue
+            rows = np.flatnonzero(mask)
+            X_oob = sampling.take(X, rows, features)
+            w = 1.0 if weights is None else weights[m]
+            if use_proba:
+                totals[rows] += w * align_proba(model.predict_proba(X_oob), model.classes_, self.classes_)
+            elif is_classifier:
+                codes = encode_labels(model.predict(X_oob)[None, :], self.classes_)
+                totals[rows] += w * vote_counts(codes, len(self.classes_))
+            else:
+                totals[rows] += w * model.predict(X_oob)
+            norms[rows] += w
+
+        scored = norms > 0
+        if not scored.all():
+            warnings.warn(f"{int((~scored).sum())} rows were in-bag for every member; "
+                          "they are excluded from the OOB score.")
+        if is_classifier:
+            self.oob_decision_function_ = totals / np.where(norms > 0, norms, 1.0)[:, None]
+            oob_pred = self.classes_[np.argmax(self.oob_decision_function_, axis=1)]
+            self.oob_score_ = float(np.mean(oob_pred[scored] == y[scored]))
+        else:
+            self.oob_prediction_ = totals / np.where(norms > 0, norms, 1.0)
+            residual = np.sum((y[scored] - self.oob_prediction_[scored]) ** 2)
+            total = np.sum((y[scored] - y[scored].mean()) ** 2)
+            self.oob_score_ = float(1.0 - residual / total) if total > 0 else 0.0
+
+    def _member_weights(self):
+        """Weights of the fitted members (failed members are dropped)."""
+        if self.weights is None:
+            return None
+        names = getattr(self, "estimator_names_", self.names)
+        lookup = dict(zip(self.names, self.weights))
+        return np.asarray([lookup[name] for name in names], dtype=np.float64)
+
+    def _classes(self, members):
+        """Ensemble class order; falls back to the union of member classes."""
+        if hasattr(self, "classes_"):
+            return self.classes_
+        return np.unique(np.concatenate([np.asarray(m.classes_) for m in members]))
+
+    def compile(self):
+        """
+        Stack the weights of every linear member that supports the current
+        strategy into one matrix, so prediction runs a single matrix multiply
+        over X for all of them. Members that cannot be fused keep using their
+        own predict/predict_proba. Refitting the ensemble discards the compiled
+        weights.
+
+        :return: self
+        """
+        members = self._members()
+        features = self._member_features()
+        if self.strategy not in CLASSIFICATION_STRATEGIES + REGRESSION_STRATEGIES:
+            raise NotImplementedError(f"Strategy '{self.strategy}' is not supported.")
+
+        # Regression strategies all combine the same per-member values
+        fuse_as = self.strategy if self.is_classifier else "averaging"
+        classes = self._classes(members) if self.is_classifier else None
+        self.fused_index_ = [i for i, model in enumerate(members) if fusable(model, fuse_as)]
+        self.fused_ = None
+        if self.fused_index_:
+            self.fused_ = FusedLinearEnsemble(
+                [members[i] for i in self.fused_index_],
+                [features[i] for i in self.fused_index_],
+                getattr(self, "n_features_in_", np.shape(members[self.fused_index_[0]].coef_)[-1]),
+                fuse_as, classes)
+        return self
+
+    def subset(self, names, weights=None):
+        """
+        Smaller ensemble made of some of the fitted members (e.g. the result of
+        models.selection), sharing their fitted estimators without refitting.
+        Out-of-bag results are dropped; compiled weights are rebuilt.
+
+        :param names: Member names to keep, in order
+        :param weights: Optional weights, as a list aligned with names or {name: weight}
+        :return: New EnsembleModel
+        """
+        names = list(names)
+        fitted_names = list(getattr(self, "estimator_names_", self.names))
+        missing = [name for name in names if name not in fitted_names]
+        if missing:
+            raise ValueError(f"Unknown ensemble members: {missing}")
+        if isinstance(weights, dict):
+            weights = [weights[name] for name in names]
+
+        ensemble = copy.copy(self)
+        ensemble.models = [self.models[self.names.index(name)] for name in names]
+        ensemble.names = names
+        ensemble.weights = None if weights is None else list(weights)
+        ensemble._scoped_pool = None
+        if hasattr(self, "estimators_"):
+            index = [fitted_names.index(name) for name in names]
+            ensemble.estimators_ = [self.estimators_[i] for i in index]
+            ensemble.estimator_names_ = names
+            ensemble.estimators_seeds_ = [self.estimators_seeds_[i] for i in index]
+            ensemble.estimators_features_ = [self.estimators_features_[i] for i in index]
+            ensemble.fit_errors_ = {}
+        for attr in ("oob_score_", "oob_decision_function_", "oob_prediction_", "fused_index_"):
+            ensemble.__dict__.pop(attr, None)
+        ensemble.fused_ = None
+        if getattr(self, "fused_", None) is not None:
+            ensemble.compile()
+        return ensemble
 
-        predictions = [model.predict(X) for model in self.models]
-        predictions = np.array(predictions)  # shape: (n_models, n_samples)
+    def _split_members(self):
+        """(fused member indices, remaining member indices)."""
+        n_members = len(self._members())
+        if getattr(self, "fused_", None) is None:
+            return [], list(range(n_members))
+        fused = set(self.fused_index_)
+        return self.fused_index_, [i for i in range(n_members) if i not in fused]
+
+    def _member_codes(self, X, classes):
+        """Every member's prediction encoded against `classes`, (n_models, n_samples)."""
+        fused, rest = self._split_members()
+        codes = np.empty((len(fused) + len(rest), np.shape(X)[0]), dtype=np.intp)
+        if fused:
+            codes[fused] = self.fused_.vote_codes(X)
+        if rest:
+            codes[rest] = encode_labels(np.asarray(self._map_members("predict", X, rest)), classes)
+        return codes
+
+    def _member_probas(self, X, classes):
+        """Every member's predict_proba aligned to `classes`, in member order."""
+        members = self._members()
+        fused, rest = self._split_members()
+        probas = [None] * (len(fused) + len(rest))
+        if fused:
+            for i, proba in zip(fused, self.fused_.predict_proba(X)):
+                probas[i] = proba
+        for i, proba in zip(rest, self._map_members("predict_proba", X, rest)):
+            probas[i] = align_proba(proba, members[i].classes_, classes)
+        return probas
+
+    def _member_values(self, X, out=None):
+        """
+        Every member's regression output, (n_models, n_samples), written into
+        `out` when given (a reusable buffer, see predict_iter).
+        """
+        fused, rest = self._split_members()
+        shape = (len(fused) + len(rest), np.shape(X)[0])
+        values = np.empty(shape, dtype=np.float64) if out is None else out[:, :shape[1]]
+        if fused:
+            values[fused] = self.fused_.predict_values(X)
+        for i, member_values in zip(rest, self._map_members("predict", X, rest)):
+            values[i] = member_values
+        return values
+
+    def _predict_batch(self, X, buffer=None):
+        """
+        Combined predictions for one in-memory batch of rows. Regression
+        strategies combine in place on `buffer` (n_models x >= n_rows) when given.
+        """
+        members = self._members()
+        weights = self._member_weights()
 
         if self.strategy == "hard_voting":
-            # Majority vote for classification
-            return np.apply_along_axis(lambda x: np.bincount(x).argmax(), axis=0, arr=predictions.astype(int))
+            # Majority vote on label-encoded predictions
+            classes = self._classes(members)
+            counts = vote_counts(self._member_codes(X, classes), len(classes), weights)
+            return classes[np.argmax(counts, axis=1)]
         elif self.strategy == "soft_voting":
-            # Average predicted probabilities
-            probas = [model.predict_proba(X) for model in self.models]
-            avg_proba = np.mean(probas, axis=0)
-            return np.argmax(avg_proba, axis=1)
-        elif self.strategy == "averaging":
-            # Mean for regression
-            return np.mean(predictions, axis=0)
+            # Average predicted probabilities (predict_proba only, no predict pass)
+            classes = self._classes(members)
+            return classes[np.argmax(self._predict_proba_batch(X), axis=1)]
+        elif self.strategy in REGRESSION_STRATEGIES:
+            # Weighted mean / median / trimmed mean over the member values buffer
+            return combine_values(self._member_values(X, buffer), self.strategy, weights, self.trim)
         else:
             raise NotImplementedError(f"Strategy '{self.strategy}' is not supported.")
+
+    def _predict_proba_batch(self, X):
+        """Averaged, class-aligned probabilities for one in-memory batch of rows."""
+        classes = self._classes(self._members())
+        probas = self._member_probas(X, classes)
+        return soft_vote(probas, [classes] * len(probas), classes, self._member_weights())
+
+    def predict_iter(self, X, batch_size: int = 65536, method: str = "predict"):
+        """
+        Stream predictions over X in row chunks. Member outputs only ever exist
+        for one chunk, so peak memory is bounded by batch_size, not len(X).
+        X may be an array, a DataFrame or a read-only np.memmap.
+
+        :param X: Feature matrix
+        :param batch_size: Rows per chunk
+        :param method: 'predict' or 'predict_proba'
+        :return: Generator of (row_slice, chunk_predictions)
+        """
+        if not self.models:
+            raise ValueError("No models in the ensemble. Add models before predicting.")
+        if method not in ("predict", "predict_proba"):
+            raise ValueError(f"Unknown method '{method}'. Options: ('predict', 'predict_proba')")
+        batch_fn = self._predict_batch if method == "predict" else self._predict_proba_batch
+        n_samples = np.shape(X)[0]
+        if method == "predict" and not self.is_classifier:
+            # One member-values buffer reused by every chunk
+            buffer = np.empty((len(self._members()), min(batch_size, n_samples)))
+            batch_fn = lambda X_chunk: self._predict_batch(X_chunk, buffer)
+
+        with self._executor_scope():
+            for start in range(0, n_samples, batch_size):
+                rows = slice(start, min(start + batch_size, n_samples))
+                yield rows, batch_fn(sampling.take(X, rows))
+
+    def _output_buffer(self, out, shape, dtype):
+        """
+        Resolves the `out` argument of predict/predict_proba: None allocates in
+        memory, a str path creates a .npy memmap, an array is used as given.
+        """
+        if out is None:
+            return np.empty(shape, dtype=dtype)
+        if isinstance(out, str):
+            return np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=shape)
+        if out.shape != shape:
+            raise ValueError(f"Output buffer has shape {out.shape}, expected {shape}")
+        return out
+
+    def _predict_into(self, X, method, batch_size, out, shape, dtype):
+        """Fills an output buffer chunk by chunk through predict_iter."""
+        buffer = self._output_buffer(out, shape, dtype)
+        for rows, values in self.predict_iter(X, batch_size or 65536, method):
+            buffer[rows] = values
+        if hasattr(buffer, "flush"):
+            buffer.flush()
+        return buffer
+
+    @instrument("ensemble.predict")
+    def predict(self, X, batch_size: int = None, out=None):
+        """
+        Predict using the ensemble strategy selected at initialization.
+
+        :param X: Feature matrix
+        :param batch_size: If set, predict in chunks of this many rows
+        :param out: Optional output array (e.g. np.memmap) or .npy path to write
+                    predictions into; implies chunked prediction
+        :return: Combined predictions from the ensemble
+        """
+        if not self.models:
+            raise ValueError("No models in the ensemble. Add models before predicting.")
+        if batch_size is None and out is None:
+            return self._predict_batch(X)
+
+        if not self.is_classifier:
+            dtype = np.float64
+        else:
+            dtype = np.asarray(self._classes(self._members())).dtype
+        return self._predict_into(X, "predict", batch_size, out, (np.shape(X)[0],), dtype)
+
+    @instrument("ensemble.predict_proba")
+    def predict_proba(self, X, batch_size: int = None, out=None):
+        """
+        Average predicted class probabilities across members, with each member's
+        columns aligned to the ensemble class order.
+
+        :param X: Feature matrix
+        :param batch_size: If set, predict in chunks of this many rows
+        :param out: Optional (n_samples, n_classes) output array or .npy path
+        :return: Array of shape (n_samples, n_classes)
+        """
+        if not self.models:
+            raise ValueError("No models in the ensemble. Add models before predicting.")
+        if batch_size is None and out is None:
+            return self._predict_proba_batch(X)
+
+        n_classes = len(self._classes(self._members()))
+        return self._predict_into(X, "predict_proba", batch_size, out,
+                                  (np.shape(X)[0], n_classes), np.float64)
@@ -0,0 +1,187 @@
+# models/executors.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Executor helpers used by EnsembleModel to fan member work out
+#              across threads or processes. Arrays sent to process workers are
+#              placed in shared memory once instead of being pickled per task.
+
+import functools
+import os
+import sys
+import weakref
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+import numpy as np
+
+EXECUTOR_KINDS = ("serial", "thread", "process")
+
+
+class SerialExecutor(Executor):
+    """
+    Minimal executor that runs every task immediately in the calling thread.
+    Keeps the serial path on the same code path as the pooled executors.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+def resolve_n_jobs(n_jobs):
+    """
+    Converts an sklearn-style n_jobs value into a positive worker count.
+
+    :param n_jobs: None or 1 for serial, -1 for all cores, -k for all but k-1 cores
+    :return: Number of workers (>= 1)
+    """
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    cpu_count = os.cpu_count() or 1
+    if n_jobs < 0:
+        return max(1, cpu_count + 1 + n_jobs)
+    return int(n_jobs)
+
+
+def get_executor(executor=None, n_jobs=None):
+    """
+    Builds (or passes through) the executor used for member-level work.
+
+    :param executor: 'serial', 'thread', 'process', an Executor instance, or None.
+                     None picks 'serial' for one job and 'thread' otherwise.
+    :param n_jobs: Worker count, see resolve_n_jobs
+    :return: (executor, kind, owned) where owned means the caller must shut it down
+    """
+    if isinstance(executor, Executor):
+        kind = "process" if _is_process_pool(executor) else "thread"
+        if isinstance(executor, SerialExecutor):
+            kind = "serial"
+        return executor, kind, False
+
+    workers = resolve_n_jobs(n_jobs)
+    if executor is None:
+        executor = "serial" if workers == 1 else "thread"
+    if executor not in EXECUTOR_KINDS:
+        raise ValueError(f"Unknown executor '{executor}'. Options: {EXECUTOR_KINDS}")
+
+    if executor == "serial":
+        return SerialExecutor(), "serial", True
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=workers), "thread", True
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers), "process", True
+
+
+def _is_process_pool(executor):
+    # multiprocessing is only imported once a process pool is actually used,
+    # so a ProcessPoolExecutor instance implies its module is already loaded
+    module = sys.modules.get("concurrent.futures.process")
+    return module is not None and isinstance(executor, module.ProcessPoolExecutor)
+
+
+class SharedArray:
+    """
+    Picklable handle to a NumPy array living in a shared memory block.
+    Only the name, shape and dtype travel to worker processes.
+    """
+
+    def __init__(self, array):
+        from multiprocessing import shared_memory
+
+        array = np.ascontiguousarray(array)
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.name = self._shm.name
+        np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)[...] = array
+
+    def __getstate__(self):
+        return {"name": self.name, "shape": self.shape, "dtype": self.dtype}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = None
+
+    def release(self):
+        """Frees the shared block. Only the creating process should call this."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+# Blocks attached inside a worker process: name -> (SharedMemory, weak references to
+# the arrays handed out over it). Closed once those arrays are gone (see detach_all)
+_ATTACHED = {}
+
+
+def _attach(handle):
+    entry = _ATTACHED.get(handle.name)
+    if entry is None:
+        from multiprocessing import shared_memory
+
+        try:
+            shm = shared_memory.SharedMemory(name=handle.name, track=False)
+        except TypeError:  # Python < 3.13 has no track argument
+            shm = shared_memory.SharedMemory(name=handle.name)
+        entry = _ATTACHED[handle.name] = (shm, [])
+    shm, arrays = entry
+    array = np.ndarray(handle.shape, dtype=handle.dtype, buffer=shm.buf)
+    array.flags.writeable = False
+    # Views keep `array` as their base, so a live weak reference means the mapping is in use
+    arrays.append(weakref.ref(array))
+    return array
+
+
+def detach_all():
+    """
+    Closes the shared blocks attached in this process whose arrays (and views of
+    them) have all been freed. SharedMemory.close() does not refuse while NumPy
+    views exist, so a block still referenced (e.g. a returned model holding a view
+    of X until it has been pickled back) stays open and is retried on the next call.
+    """
+    for name, (shm, arrays) in list(_ATTACHED.items()):
+        if any(ref() is not None for ref in arrays):
+            continue
+        shm.close()
+        del _ATTACHED[name]
+
+
+def worker_task(fn):
+    """
+    Decorates a module-level executor task so the shared blocks it attached are
+    closed when it returns. Without this a long-lived worker keeps a mapping of
+    every block it ever saw (one per chunked predict call), long after the parent
+    released them.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            detach_all()
+
+    return wrapper
+
+
+def materialize(ref):
+    """
+    Returns the array behind a reference: SharedArray handles are attached
+    zero-copy, anything else is returned unchanged.
+    """
+    if isinstance(ref, SharedArray):
+        return _attach(ref)
+    return ref
+
+
+def share(array, kind):
+    """
+    Prepares an array for the given executor kind. Process executors get a
+    SharedArray handle; serial and thread executors share the object directly.
+    """
+    if kind == "process" and array is not None:
+        return SharedArray(np.asarray(array))
+    return array
@@ -0,0 +1,246 @@
+# models/fused.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Fused inference for linear ensemble members. The coef_/intercept_
+#              of every compatible member are stacked into one weight matrix so
+#              the ensemble scans X with a single matrix multiply, followed by a
+#              vectorized decision (argmax / sign) or probability link per member.
+#              PackedTrees does the same for single-output decision trees: all
+#              trees' nodes live in flat arrays and every (tree, row) pair descends
+#              one level per step, so cost in Python steps is the tree depth, not
+#              the number of trees.
+
+import numpy as np
+
+from models.voting import encode_labels
+
+
+def probability_link(model):
+    """
+    Returns how a linear classifier turns decision scores into probabilities:
+    'softmax' (multinomial logistic), 'ovr' (normalized sigmoids) or None when
+    the member has no predict_proba that can be reproduced from its scores.
+    """
+    # sklearn is imported on first use so importing the ensemble stays cheap
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+    if isinstance(model, LogisticRegression):
+        multi_class = getattr(model, "multi_class", "auto")
+        ovr = multi_class in ("ovr", "warn") or (
+            multi_class in ("auto", "deprecated")
+            and (len(model.classes_) <= 2 or model.solver == "liblinear"))
+        return "ovr" if ovr else "softmax"
+    if isinstance(model, SGDClassifier) and model.loss == "log_loss":
+        return "ovr"
+    return None
+
+
+def fusable(model, strategy):
+    """
+    True if a fitted member can be served from the stacked weight matrix for the
+    given combination strategy.
+    """
+    from sklearn.linear_model import SGDRegressor
+    from sklearn.linear_model._base import LinearClassifierMixin, LinearModel
+
+    if not (hasattr(model, "coef_") and hasattr(model, "intercept_")):
+        return False
+    if strategy in ("hard_voting", "soft_voting"):
+        if not isinstance(model, LinearClassifierMixin) or np.ndim(model.classes_) != 1:
+            return False
+        binarizer = getattr(model, "_label_binarizer", None)
+        if binarizer is not None and getattr(binarizer, "y_type_", "").startswith("multilabel"):
+            return False
+        return strategy == "hard_voting" or probability_link(model) is not None
+    if strategy == "averaging":
+        return isinstance(model, (LinearModel, SGDRegressor)) \
+            and not isinstance(model, LinearClassifierMixin) and np.ndim(model.coef_) == 1
+    return False
+
+
+class FusedLinearEnsemble:
+    """
+    Stacked weights of the fusable members of a fitted EnsembleModel.
+
+    Row blocks of `coef_` belong to one member each; members trained on a
+    feature subset have their weights scattered into the full feature width
+    (zeros elsewhere), so every member reads the same X.
+    """
+
+    def __init__(self, members, features, n_features, strategy, classes=None):
+        """
+        :param members: Fitted, fusable estimators
+        :param features: Feature subset per member (None = all columns)
+        :param n_features: Width of the ensemble input
+        :param strategy: 'hard_voting', 'soft_voting' or 'averaging'
+        :param classes: Ensemble class order (classification only)
+        """
+        self.strategy = strategy
+        self.classes = classes
+        self.blocks = []
+        self.links = []
+        self.code_maps = []
+
+        rows, intercepts = [], []
+        offset = 0
+        for model, feats in zip(members, features):
+            coef = np.atleast_2d(np.asarray(model.coef_, dtype=np.float64))
+            full = np.zeros((coef.shape[0], n_features))
+            full[:, slice(None) if feats is None else feats] = coef
+            rows.append(full)
+            intercepts.append(np.broadcast_to(np.asarray(model.intercept_, dtype=np.float64),
+                                              (coef.shape[0],)))
+            self.blocks.append(slice(offset, offset + coef.shape[0]))
+            offset += coef.shape[0]
+            if classes is not None:
+                self.code_maps.append(encode_labels(np.asarray(model.classes_), classes))
+                self.links.append(probability_link(model))
+
+        self.coef_ = np.ascontiguousarray(np.vstack(rows))  # (n_rows, n_features)
+        self.intercept_ = np.concatenate(intercepts)[:, None]
+
+    @property
+    def n_members(self):
+        return len(self.blocks)
+
+    def decision_function(self, X):
+        """
+        All members' decision scores from one GEMM, shape (n_rows, n_samples).
+        Scores are kept row-major per member so the per-member links below work
+        on contiguous (n_member_rows, n_samples) blocks.
+        """
+        scores = self.coef_ @ np.asarray(X, dtype=np.float64).T
+        scores += self.intercept_
+        return scores
+
+    def vote_codes(self, X):
+        """
+        Each member's predicted class, encoded against the ensemble classes.
+
+        :return: Integer array of shape (n_members, n_samples)
+        """
+        scores = self.decision_function(X)
+        codes = np.empty((self.n_members, scores.shape[1]), dtype=np.intp)
+        for m, block in enumerate(self.blocks):
+            member_scores = scores[block]
+            if member_scores.shape[0] == 1:
+                idx = (member_scores[0] > 0).astype(np.intp)
+            else:
+                idx = np.argmax(member_scores, axis=0)
+            codes[m] = self.code_maps[m][idx]
+        return codes
+
+    def predict_proba(self, X):
+        """
+        Each member's class probabilities aligned to the ensemble classes.
+
+        :return: List of (n_samples, n_classes) arrays, one per member
+        """
+        from scipy.special import expit
+
+        scores = self.decision_function(X)
+        probas = []
+        for m, block in enumerate(self.blocks):
+            member_scores = scores[block]
+            if self.links[m] == "softmax":
+                if member_scores.shape[0] == 1:
+                    member_scores = np.vstack([-member_scores, member_scores])
+                proba = member_scores - member_scores.max(axis=0)
+                np.exp(proba, out=proba)
+                proba /= proba.sum(axis=0)
+            else:
+                proba = expit(member_scores)
+                if proba.shape[0] == 1:
+                    proba = np.vstack([1 - proba, proba])
+                else:
+                    proba /= proba.sum(axis=0)
+            aligned = np.zeros((len(self.classes), proba.shape[1]))
+            aligned[self.code_maps[m]] = proba
+            probas.append(aligned.T)
+        return probas
+
+    def predict_values(self, X):
+        """
+        Regression outputs of every member.
+
+        :return: Array of shape (n_members, n_samples)
+        """
+        return self.decision_function(X)
+
+
+def packable(model):
+    """True if a fitted member is a single-output sklearn decision tree."""
+    tree = getattr(model, "tree_", None)
+    return tree is not None and hasattr(tree, "children_left") and getattr(model, "n_outputs_", 1) == 1
+
+
+class PackedTrees:
+    """
+    Flat node arrays of many fitted decision trees. Leaves point to themselves,
+    so after max_depth steps every (tree, row) pair sits on its leaf.
+    """
+
+    def __init__(self, trees, features, classes=None):
+        """
+        :param trees: Fitted single-output DecisionTreeRegressor/Classifier members
+        :param features: Feature subset per tree (None = all columns)
+        :param classes: Ensemble class order; leaves of classifier trees then hold
+                        the encoded predicted class instead of a value
+        """
+        feature, threshold, left, right, leaf_value, roots = [], [], [], [], [], []
+        offset = 0
+        self.max_depth = 0
+        for model, feats in zip(trees, features):
+            tree = model.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n_nodes)
+            tree_feature = np.where(is_leaf, 0, tree.feature)
+            if feats is not None:
+                tree_feature = np.asarray(feats)[tree_feature]
+            feature.append(tree_feature)
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            if classes is None:
+                leaf_value.append(tree.value[:, 0, 0].astype(np.float64))
+            else:
+                labels = np.asarray(model.classes_)[np.argmax(tree.value[:, 0, :], axis=1)]
+                leaf_value.append(encode_labels(labels[None, :], classes)[0].astype(np.float64))
+            roots.append(offset)
+            offset += n_nodes
+            self.max_depth = max(self.max_depth, tree.max_depth)
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold)
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.stack([np.concatenate(left), np.concatenate(right)], axis=1).ravel().astype(np.intp)
+        self.leaf_value = np.concatenate(leaf_value)
+        self.roots = np.asarray(roots, dtype=np.intp)
+
+    @property
+    def n_members(self):
+        return len(self.roots)
+
+    def predict_values(self, X, max_cells=1 << 20):
+        """
+        Every tree's output (leaf value, or encoded class for classifiers).
+
+        :param X: Feature matrix
+        :param max_cells: Upper bound on trees x rows descended at once
+        :return: Array of shape (n_trees, n_samples)
+        """
+        # sklearn trees split on float32 features
+        X = np.asarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        out = np.empty((self.n_members, n_samples))
+        step = max(1, max_cells // max(self.n_members, 1))
+        for start in range(0, n_samples, step):
+            X_flat = X[start:start + step].ravel()
+            n_rows = X_flat.size // n_features if n_features else 0
+            row_base = (np.arange(n_rows) * n_features)[None, :]
+            node = np.repeat(self.roots[:, None], n_rows, axis=1)
+            for _ in range(self.max_depth):
+                go_right = X_flat.take(row_base + self.feature.take(node)) > self.threshold.take(node)
+                node = self.children.take(2 * node + go_right)
+            out[:, start:start + n_rows] = self.leaf_value.take(node)
+        return out
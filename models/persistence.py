@@ -0,0 +1,291 @@
+# models/persistence.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Versioned on-disk artifacts for a fitted scoring pipeline (optional
+#              DimensionalityReducer + EnsembleModel + strategy and class mapping).
+#              Large numpy arrays (coefficients, components, fused weights) are written
+#              as separate .npy files and loaded memory-mapped read-only, so every
+#              process that loads the same artifact shares one copy in the page cache.
+#              The manifest records fingerprints of the training data and of the
+#              pipeline params so stale artifacts can be detected before scoring.
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import platform
+import shutil
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from models.cache import fingerprint_data
+from models import sampling
+
+FORMAT_NAME = "ensemble-pipeline"
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+OBJECTS_FILE = "objects.pkl"
+ARRAYS_DIR = "arrays"
+ON_STALE = ("warn", "raise", "ignore")
+
+
+class StaleArtifactError(ValueError):
+    """Raised when an artifact no longer matches the training data or params."""
+
+
+class _ArrayPickler(pickle.Pickler):
+    """Pickler that writes numeric arrays of at least min_bytes to their own .npy file."""
+
+    def __init__(self, file, array_dir, min_bytes):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.array_dir = array_dir
+        self.min_bytes = min_bytes
+        self.arrays = []
+        self._written = {}
+        self._keep = []  # holds written arrays so their ids are not reused
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject or obj.nbytes < self.min_bytes:
+            return None
+        name = self._written.get(id(obj))
+        if name is None:
+            name = f"a{len(self._written):04d}.npy"
+            np.save(os.path.join(self.array_dir, name), np.asarray(obj), allow_pickle=False)
+            self._written[id(obj)] = name
+            self._keep.append(obj)
+            self.arrays.append({"file": name, "shape": list(obj.shape), "dtype": obj.dtype.str})
+        return ("ndarray", name)
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    def __init__(self, file, array_dir, mmap):
+        super().__init__(file)
+        self.array_dir = array_dir
+        self.mmap_mode = "r" if mmap else None
+
+    def persistent_load(self, pid):
+        kind, name = pid
+        if kind != "ndarray":
+            raise pickle.UnpicklingError(f"Unknown persistent id '{kind}'")
+        return np.load(os.path.join(self.array_dir, name), mmap_mode=self.mmap_mode, allow_pickle=False)
+
+
+def _library_versions():
+    versions = {"python": platform.python_version(), "numpy": np.__version__}
+    try:
+        import sklearn
+
+        versions["sklearn"] = sklearn.__version__
+    except ImportError:
+        pass
+    return versions
+
+
+def _estimator_signature(model, seed=None):
+    params = model.get_params(deep=False) if hasattr(model, "get_params") else {}
+    if seed is not None and params.get("random_state") == sampling.estimator_seed(seed):
+        # Seeded by the ensemble during fit; the unfitted definition had None
+        params["random_state"] = None
+    return f"{type(model).__module__}.{type(model).__qualname__}{sorted(params.items())!r}"
+
+
+def params_fingerprint(ensemble, reducer=None):
+    """
+    Hashes everything that changes what the pipeline learns: ensemble settings,
+    each member's class and params, and the reducer settings.
+
+    :return: Hex digest
+    """
+    parts = [repr((ensemble.strategy, ensemble.weights, ensemble.bootstrap, ensemble.max_samples,
+                   ensemble.max_features, ensemble.bootstrap_features, ensemble.random_state,
+                   getattr(ensemble, "task", None), getattr(ensemble, "trim", None)))]
+    seeds = sampling.member_seeds(ensemble.random_state, ensemble.names) \
+        if ensemble.random_state is not None else [None] * len(ensemble.names)
+    parts += [f"{name}={_estimator_signature(model, seed)}"
+              for name, model, seed in zip(ensemble.names, ensemble.models, seeds)]
+    if reducer is not None:
+        parts.append(repr((reducer.method, reducer.n_components, getattr(reducer, "random_state", None))))
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _portable_ensemble(ensemble):
+    """Shallow copy without the fitted-model cache and live executors."""
+    portable = copy.copy(ensemble)
+    portable.cache = None
+    portable._scoped_pool = None
+    if not (portable.executor is None or isinstance(portable.executor, str)):
+        portable.executor = None
+    return portable
+
+
+class FittedPipeline:
+    """
+    A fitted reducer (optional) and EnsembleModel that score raw feature rows.
+
+    Save once after training, then load in every scoring process:
+
+        FittedPipeline(ensemble, reducer).save("results/models/iris", X_train, y_train)
+        pipeline = FittedPipeline.load("results/models/iris", X_train=X_train, y_train=y_train)
+        y_pred = pipeline.predict(X_new)
+
+    Worker processes should each call load() (e.g. in a pool initializer) rather
+    than receive a pickled pipeline, so they map the same array files.
+    """
+
+    def __init__(self, ensemble, reducer=None, feature_names=None, manifest=None):
+        """
+        :param ensemble: Fitted EnsembleModel
+        :param reducer: Optional fitted DimensionalityReducer applied before the ensemble
+        :param feature_names: Raw input column names (defaults to the reducer's)
+        :param manifest: Manifest of a loaded artifact (set by load())
+        """
+        if not hasattr(ensemble, "estimators_"):
+            raise ValueError("Ensemble is not fitted. Call fit() first.")
+        self.ensemble = ensemble
+        self.reducer = reducer
+        if feature_names is None and reducer is not None:
+            feature_names = reducer.feature_names
+        self.feature_names = None if feature_names is None else [str(c) for c in feature_names]
+        self.manifest = manifest
+
+    @property
+    def strategy(self):
+        return self.ensemble.strategy
+
+    @property
+    def classes_(self):
+        return getattr(self.ensemble, "classes_", None)
+
+    def transform(self, X):
+        """Applies the reducer (if any) to raw features."""
+        if self.reducer is None:
+            return X
+        return self.reducer.transform(X)
+
+    def predict(self, X, batch_size=None):
+        return self.ensemble.predict(self.transform(X), batch_size=batch_size)
+
+    def predict_proba(self, X, batch_size=None):
+        return self.ensemble.predict_proba(self.transform(X), batch_size=batch_size)
+
+    def save(self, path, X_train=None, y_train=None, metadata=None, mmap_threshold=64 * 1024):
+        """
+        Writes the artifact directory (replacing an existing one atomically).
+
+        :param path: Artifact directory
+        :param X_train: Raw training features, fingerprinted for stale detection
+        :param y_train: Training labels, fingerprinted with X_train
+        :param metadata: Optional JSON-serializable dict stored in the manifest
+        :param mmap_threshold: Arrays of at least this many bytes get their own .npy file
+        :return: path
+        """
+        path = os.path.abspath(path)
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+        staging = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        array_dir = os.path.join(staging, ARRAYS_DIR)
+        os.makedirs(array_dir)
+
+        ensemble = _portable_ensemble(self.ensemble)
+        with open(os.path.join(staging, OBJECTS_FILE), "wb") as f:
+            pickler = _ArrayPickler(f, array_dir, mmap_threshold)
+            pickler.dump({"ensemble": ensemble, "reducer": self.reducer})
+
+        classes = self.classes_
+        manifest = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "libraries": _library_versions(),
+            "strategy": ensemble.strategy,
+            "is_classifier": bool(ensemble.is_classifier),
+            "classes": None if classes is None else np.asarray(classes).tolist(),
+            "members": list(ensemble.estimator_names_),
+            "weights": ensemble.weights,
+            "feature_names": self.feature_names,
+            "n_features_in": int(self.reducer.model.n_features_in_) if self.reducer is not None
+            else getattr(ensemble, "n_features_in_", None),
+            "reducer": None if self.reducer is None else
+            {"method": self.reducer.method, "n_components": int(self.reducer.n_components_)},
+            "compiled": getattr(ensemble, "fused_", None) is not None,
+            "data_fingerprint": None if X_train is None else
+            fingerprint_data(*[a for a in (X_train, y_train) if a is not None]),
+            "params_fingerprint": params_fingerprint(ensemble, self.reducer),
+            "arrays": pickler.arrays,
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+
+        # Swap the finished directory into place so readers never see a partial artifact
+        previous = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.rename(path, previous)
+        os.rename(staging, path)
+        shutil.rmtree(previous, ignore_errors=True)
+        self.manifest = manifest
+        return path
+
+    @staticmethod
+    def read_manifest(path):
+        """Reads and validates an artifact's manifest without loading any objects."""
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT_NAME:
+            raise ValueError(f"{path} is not an {FORMAT_NAME} artifact")
+        if manifest.get("format_version", 0) > FORMAT_VERSION:
+            raise ValueError(f"Artifact format version {manifest['format_version']} is newer than "
+                             f"supported version {FORMAT_VERSION}; upgrade to load it")
+        return manifest
+
+    @classmethod
+    def load(cls, path, mmap=True, X_train=None, y_train=None, ensemble=None, on_stale="warn"):
+        """
+        Loads an artifact. With mmap=True large arrays are read-only memory maps.
+
+        :param path: Artifact directory
+        :param mmap: Memory-map the array files instead of reading them
+        :param X_train: Current training features; compared to the stored fingerprint
+        :param y_train: Current training labels
+        :param ensemble: Current (unfitted) EnsembleModel definition; its params are compared
+        :param on_stale: 'warn', 'raise' (StaleArtifactError) or 'ignore'
+        :return: FittedPipeline
+        """
+        if on_stale not in ON_STALE:
+            raise ValueError(f"Unknown on_stale '{on_stale}'. Options: {ON_STALE}")
+        manifest = cls.read_manifest(path)
+        with open(os.path.join(path, OBJECTS_FILE), "rb") as f:
+            objects = _ArrayUnpickler(f, os.path.join(path, ARRAYS_DIR), mmap).load()
+
+        pipeline = cls(objects["ensemble"], objects["reducer"], manifest["feature_names"], manifest)
+        reasons = pipeline.stale_reasons(X_train, y_train, ensemble)
+        if reasons and on_stale == "raise":
+            raise StaleArtifactError(f"Stale artifact {path}: " + "; ".join(reasons))
+        if reasons and on_stale == "warn":
+            warnings.warn(f"Stale artifact {path}: " + "; ".join(reasons))
+        return pipeline
+
+    def stale_reasons(self, X_train=None, y_train=None, ensemble=None):
+        """
+        Why the loaded artifact may not match the current training setup.
+
+        :return: List of human-readable reasons (empty when nothing changed)
+        """
+        manifest = self.manifest or {}
+        reasons = []
+        if X_train is not None:
+            current = fingerprint_data(*[a for a in (X_train, y_train) if a is not None])
+            if manifest.get("data_fingerprint") is None:
+                reasons.append("no training data fingerprint was recorded")
+            elif current != manifest["data_fingerprint"]:
+                reasons.append("training data changed")
+        if ensemble is not None and params_fingerprint(ensemble, self.reducer) != manifest.get("params_fingerprint"):
+            reasons.append("ensemble params changed")
+        saved_sklearn = manifest.get("libraries", {}).get("sklearn")
+        current_sklearn = _library_versions().get("sklearn")
+        if saved_sklearn and current_sklearn and saved_sklearn != current_sklearn:
+            reasons.append(f"saved with scikit-learn {saved_sklearn}, running {current_sklearn}")
+        return reasons
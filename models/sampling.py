@@ -0,0 +1,108 @@
+# models/sampling.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Bootstrap and feature subsampling helpers for bagging in EnsembleModel.
+#              Samples are represented as index arrays (or sample-weight counts)
+#              regenerated from a per-member seed, never as stored copies of X.
+
+import inspect
+import numbers
+import zlib
+
+import numpy as np
+
+
+def resolve_count(value, total, name):
+    """
+    Turns a max_samples/max_features setting (int count or float fraction)
+    into an absolute count in [1, total].
+    """
+    if isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        count = int(value)
+    elif isinstance(value, numbers.Real) and 0.0 < value <= 1.0:
+        count = int(round(value * total))
+    else:
+        raise ValueError(f"{name} must be an int or a float in (0, 1], got {value!r}")
+    if not 1 <= count <= total:
+        raise ValueError(f"{name}={value!r} resolves to {count}, expected 1..{total}")
+    return count
+
+
+def member_seeds(random_state, names):
+    """
+    Derives one independent SeedSequence per member from the ensemble seed and
+    the member's name, so a member draws the same samples no matter which
+    worker runs it, in what order, or which other members share the ensemble.
+    """
+    if isinstance(random_state, np.random.SeedSequence):
+        entropy = random_state.entropy
+    else:
+        entropy = np.random.SeedSequence(random_state).entropy
+    return [np.random.SeedSequence(entropy, spawn_key=(zlib.crc32(name.encode()),))
+            for name in names]
+
+
+def draw_indices(seed, n_samples, n_features, max_samples=1.0, max_features=1.0,
+                 bootstrap=False, bootstrap_features=False):
+    """
+    Draws the row and column indices a member is trained on.
+
+    :param seed: The member's SeedSequence
+    :return: (sample_indices, feature_indices); either is None when the member
+             uses every row / column unchanged
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = resolve_count(max_samples, n_samples, "max_samples")
+    n_cols = resolve_count(max_features, n_features, "max_features")
+
+    if bootstrap_features:
+        features = np.sort(rng.integers(0, n_features, n_cols))
+    elif n_cols < n_features:
+        features = np.sort(rng.choice(n_features, n_cols, replace=False))
+    else:
+        features = None
+
+    if bootstrap:
+        samples = rng.integers(0, n_samples, n_rows)
+    elif n_rows < n_samples:
+        samples = rng.choice(n_samples, n_rows, replace=False)
+    else:
+        samples = None
+    return samples, features
+
+
+def estimator_seed(seed):
+    """Derives an int random_state for the estimator itself from the member seed."""
+    return int(seed.generate_state(2)[1] & 0x7FFFFFFF)
+
+
+def supports_sample_weight(model):
+    """True if model.fit accepts a sample_weight argument."""
+    try:
+        return "sample_weight" in inspect.signature(model.fit).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def take(X, rows=None, features=None):
+    """
+    Selects rows/columns from an array or DataFrame. Returns X itself (no copy)
+    when both selections are None.
+    """
+    if rows is None and features is None:
+        return X
+    if hasattr(X, "iloc"):
+        rows = slice(None) if rows is None else rows
+        features = slice(None) if features is None else features
+        return X.iloc[rows, features]
+    if rows is not None:
+        X = X[rows]
+    if features is not None:
+        X = X[:, features]
+    return X
+
+
+def oob_mask(samples, n_samples):
+    """Boolean mask of rows that were not drawn for a member."""
+    mask = np.ones(n_samples, dtype=bool)
+    mask[samples] = False
+    return mask
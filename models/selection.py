@@ -0,0 +1,211 @@
+# models/selection.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Ensemble selection and pruning on cached validation predictions.
+#              Caruana-style greedy forward selection (with replacement, so repeats
+#              become integer weights) and backward pruning by marginal contribution
+#              both run on stored member outputs only - no refits, no re-predicts.
+#              Each candidate subset is reported with its accuracy and estimated
+#              scoring latency, and EnsembleModel.subset() builds the chosen ensemble.
+
+import time
+
+import numpy as np
+
+from models.cross_validation import OutOfFoldPredictions
+from models.voting import encode_labels, align_proba
+from models import sampling
+
+
+def validation_predictions(ensemble, X_val, y_val):
+    """
+    Caches a fitted EnsembleModel's member outputs on a validation set in the
+    same form as cross-validated predictions (a single 'fold').
+
+    :return: OutOfFoldPredictions
+    """
+    members = ensemble._members()
+    features = ensemble._member_features()
+    classes = ensemble._classes(members)
+    y_val = np.asarray(y_val)
+    codes = ensemble._member_codes(X_val, classes)
+    probas = np.full((len(members), len(y_val), len(classes)), np.nan)
+    has_proba = np.zeros(len(members), dtype=bool)
+    for m, (model, cols) in enumerate(zip(members, features)):
+        if hasattr(model, "predict_proba"):
+            try:
+                proba = model.predict_proba(sampling.take(X_val, features=cols))
+            except (AttributeError, NotImplementedError):
+                continue
+            probas[m] = align_proba(np.asarray(proba, dtype=np.float64), model.classes_, classes)
+            has_proba[m] = True
+    names = getattr(ensemble, "estimator_names_", ensemble.names)
+    return OutOfFoldPredictions(names, classes, y_val, np.zeros(len(y_val), dtype=np.intp),
+                                codes, probas, has_proba)
+
+
+def member_latency(ensemble, X, strategy=None, repeats=3):
+    """
+    Median wall time (seconds) of each fitted member's predict (or predict_proba
+    for soft voting) on X, keyed by member name.
+    """
+    strategy = strategy or ensemble.strategy
+    method = "predict_proba" if strategy == "soft_voting" else "predict"
+    names = getattr(ensemble, "estimator_names_", ensemble.names)
+    latency = {}
+    for name, model, cols in zip(names, ensemble._members(), ensemble._member_features()):
+        X_member = sampling.take(X, features=cols)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            getattr(model, method)(X_member)
+            times.append(time.perf_counter() - start)
+        latency[name] = float(np.median(times))
+    return latency
+
+
+def _contributions(preds, strategy, candidates):
+    """(n_candidates, n_samples, n_classes) per-member additions to the combined score."""
+    if strategy == "hard_voting":
+        return np.eye(len(preds.classes_))[preds.codes_[candidates]]
+    if strategy == "soft_voting":
+        return preds.probas_[candidates]
+    raise NotImplementedError(f"Strategy '{strategy}' is not supported for selection.")
+
+
+def _candidates(preds, strategy):
+    if strategy == "soft_voting":
+        return [i for i, ok in enumerate(preds.has_proba_) if ok]
+    return list(range(len(preds.names)))
+
+
+def _subset_entry(preds, counts, accuracy, latency):
+    weights = {preds.names[i]: int(c) for i, c in enumerate(counts) if c}
+    entry = {"members": list(weights), "weights": weights, "size": len(weights),
+             "accuracy": float(accuracy)}
+    if latency is not None:
+        entry["latency_s"] = float(sum(latency[name] for name in weights))
+    return entry
+
+
+def _cheapest_within(history, tolerance):
+    """Lowest-latency (then smallest) subset within `tolerance` of the best accuracy."""
+    top = max(entry["accuracy"] for entry in history)
+    eligible = [entry for entry in history if entry["accuracy"] >= top - tolerance]
+    return min(eligible, key=lambda e: (e.get("latency_s", 0.0), e["size"], -e["accuracy"]))
+
+
+def greedy_selection(preds, strategy="hard_voting", max_steps=None, with_replacement=True,
+                     n_init=1, latency=None, tolerance=0.0):
+    """
+    Caruana et al. forward selection: start from the n_init best single members,
+    then repeatedly add the member that most improves validation accuracy of the
+    combined ensemble. Picking a member again raises its weight.
+
+    Ties on accuracy go to the cheaper member when latency is given.
+
+    :param preds: OutOfFoldPredictions (cross-validated or validation_predictions())
+    :param strategy: 'hard_voting' or 'soft_voting'
+    :param max_steps: Number of additions (default: 2 x number of members)
+    :param with_replacement: Allow a member to be picked more than once
+    :param n_init: Best single members to start from
+    :param latency: Optional {name: seconds} from member_latency()
+    :param tolerance: Accuracy the chosen subset may give up for lower latency/size
+    :return: dict with 'best' (the cheapest subset within tolerance of the top
+             accuracy) and 'history' (one subset entry per step)
+    """
+    candidates = np.asarray(_candidates(preds, strategy))
+    if not len(candidates):
+        raise ValueError(f"No members usable for '{strategy}'")
+    contributions = _contributions(preds, strategy, candidates)
+    y_codes = encode_labels(preds.y[None, :], preds.classes_)[0]
+    cost = np.zeros(len(candidates)) if latency is None else \
+        np.asarray([latency[preds.names[i]] for i in candidates])
+
+    def accuracy_of(totals):
+        # totals: (..., n_samples, n_classes)
+        return (np.argmax(totals, axis=-1) == y_codes).mean(axis=-1)
+
+    single = accuracy_of(contributions)
+    counts = np.zeros(len(preds.names), dtype=np.int64)
+    totals = np.zeros(contributions.shape[1:])
+    for c in np.lexsort((cost, -single))[:n_init]:
+        counts[candidates[c]] += 1
+        totals += contributions[c]
+
+    history = [_subset_entry(preds, counts, accuracy_of(totals), latency)]
+    max_steps = 2 * len(candidates) if max_steps is None else max_steps
+    for _ in range(max_steps):
+        allowed = np.ones(len(candidates), dtype=bool) if with_replacement \
+            else counts[candidates] == 0
+        if not allowed.any():
+            break
+        scores = accuracy_of(totals[None] + contributions)
+        scores[~allowed] = -np.inf
+        best = np.lexsort((cost, -scores))[0]
+        counts[candidates[best]] += 1
+        totals += contributions[best]
+        history.append(_subset_entry(preds, counts, scores[best], latency))
+
+    return {"best": _cheapest_within(history, tolerance), "history": history}
+
+
+def prune_by_contribution(preds, strategy="hard_voting", tolerance=0.0, latency=None):
+    """
+    Backward elimination: repeatedly drop the member whose removal costs the
+    least accuracy (the most expensive one on ties) down to a single member,
+    then keep the cheapest subset within `tolerance` of the full ensemble's
+    accuracy.
+
+    :return: dict with 'best' (the cheapest subset within tolerance) and
+             'history' (full ensemble first, one entry per removal)
+    """
+    candidates = _candidates(preds, strategy)
+    if not candidates:
+        raise ValueError(f"No members usable for '{strategy}'")
+    contributions = _contributions(preds, strategy, candidates)
+    y_codes = encode_labels(preds.y[None, :], preds.classes_)[0]
+    cost = np.zeros(len(candidates)) if latency is None else \
+        np.asarray([latency[preds.names[i]] for i in candidates])
+
+    active = np.ones(len(candidates), dtype=bool)
+    totals = contributions.sum(axis=0)
+    counts = np.zeros(len(preds.names), dtype=np.int64)
+    counts[candidates] = 1
+    baseline = float((np.argmax(totals, axis=-1) == y_codes).mean())
+    history = [_subset_entry(preds, counts, baseline, latency)]
+
+    while active.sum() > 1:
+        remaining = np.flatnonzero(active)
+        scores = (np.argmax(totals[None] - contributions[remaining], axis=-1) == y_codes).mean(axis=-1)
+        drop = remaining[np.lexsort((-cost[remaining], -scores))[0]]
+        active[drop] = False
+        totals -= contributions[drop]
+        counts[candidates[drop]] = 0
+        history.append(_subset_entry(preds, counts, scores[remaining == drop][0], latency))
+    # Measured against the full ensemble, not the best subset found on the way
+    eligible = [entry for entry in history if entry["accuracy"] >= baseline - tolerance]
+    best = min(eligible, key=lambda e: (e.get("latency_s", 0.0), e["size"], -e["accuracy"]))
+    return {"best": best, "history": history}
+
+
+def measure_subset_latency(ensemble, X, names, weights=None, repeats=3):
+    """Median wall time (seconds) of predict for an actual subset ensemble."""
+    subset = ensemble.subset(names, weights)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subset.predict(X)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def print_selection_report(result):
+    """Prints accuracy / latency / size of each candidate subset."""
+    print("\nEnsemble Selection")
+    print("-" * 60)
+    for step, entry in enumerate(result["history"]):
+        latency = f"{entry['latency_s'] * 1e3:9.2f} ms" if "latency_s" in entry else ""
+        marker = " <- best" if entry is result["best"] else ""
+        print(f"{step:3d} | size {entry['size']:3d} | accuracy {entry['accuracy']:.4f} | {latency}"
+              f" | {entry['weights']}{marker}")
+    print("-" * 60)
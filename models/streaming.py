@@ -0,0 +1,97 @@
+# models/streaming.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Helpers for EnsembleModel.fit_stream: re-iterable mini-batch sources,
+#              a vectorized reservoir sample for members without partial_fit, and
+#              Poisson(1) row weights for online bagging (Oza & Russell).
+
+import inspect
+
+import numpy as np
+
+
+def batch_source(data, batch_size=65536):
+    """
+    Normalizes a chunked data source into a callable returning a fresh iterator
+    of (X_batch, y_batch) per epoch.
+
+    :param data: Object with iter_batches(batch_size) (e.g. datasets.registry.Dataset),
+                 a callable returning an iterator, an (X, y) tuple of arrays/memmaps,
+                 or a list of (X_batch, y_batch)
+    :param batch_size: Rows per batch where the source is sliced here
+    :return: Callable with no arguments returning an iterator
+    """
+    if hasattr(data, "iter_batches"):
+        return lambda: data.iter_batches(batch_size)
+    if callable(data):
+        return data
+    if isinstance(data, tuple) and len(data) == 2 and hasattr(data[0], "shape"):
+        X, y = data
+
+        def slices():
+            for start in range(0, X.shape[0], batch_size):
+                yield np.asarray(X[start:start + batch_size]), np.asarray(y[start:start + batch_size])
+        return slices
+    if isinstance(data, (list, tuple)):
+        return lambda: iter(data)
+    raise TypeError("Streaming sources must be re-iterable: pass a Dataset, a callable, "
+                    "an (X, y) tuple or a list of batches, not a one-shot iterator")
+
+
+def is_incremental(model):
+    return hasattr(model, "partial_fit")
+
+
+def partial_fit_kwargs(model):
+    """Which optional partial_fit arguments (classes, sample_weight) the model accepts."""
+    try:
+        params = inspect.signature(model.partial_fit).parameters
+    except (TypeError, ValueError):
+        return set()
+    return {name for name in ("classes", "sample_weight") if name in params}
+
+
+class Reservoir:
+    """
+    Uniform sample of at most `capacity` rows from a stream (algorithm R),
+    updated one batch at a time with vectorized replacement draws.
+    """
+
+    def __init__(self, capacity, random_state=None):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(random_state)
+        self.X = None
+        self.y = None
+        self.size = 0
+        self.seen = 0
+
+    def update(self, X, y):
+        X, y = np.asarray(X), np.asarray(y)
+        if self.X is None:
+            self.X = np.empty((self.capacity,) + X.shape[1:], dtype=X.dtype)
+            self.y = np.empty((self.capacity,) + y.shape[1:], dtype=y.dtype)
+
+        # Fill free slots first
+        take = min(self.capacity - self.size, len(X))
+        if take:
+            self.X[self.size:self.size + take] = X[:take]
+            self.y[self.size:self.size + take] = y[:take]
+            self.size += take
+
+        # Row j of the stream (0-based) replaces a random slot with probability capacity / (j + 1)
+        rest = np.arange(take, len(X))
+        if len(rest):
+            positions = self.seen + rest
+            slots = (self.rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            keep = slots < self.capacity
+            self.X[slots[keep]] = X[rest[keep]]
+            self.y[slots[keep]] = y[rest[keep]]
+        self.seen += len(X)
+        return self
+
+    def data(self):
+        return self.X[:self.size], self.y[:self.size]
+
+
+def poisson_weights(rng, n_rows):
+    """Online-bagging row weights: each row is seen Poisson(1) times by a member."""
+    return rng.poisson(1.0, n_rows).astype(np.float64)
@@ -0,0 +1,360 @@
+# models/tuning.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Successive-halving and Hyperband tuning of ensemble members. Every
+#              member's candidates start on a small budget (training rows or an
+#              iteration parameter such as max_iter / n_estimators); after each rung
+#              only the best 1/factor of them get factor x more budget. Survivors are
+#              warm-started from their previous fit where the estimator supports it.
+#              All fits of a rung, across members and Hyperband brackets, run through
+#              one executor. The winners are handed to EnsembleModel as unfitted
+#              estimators with the selected parameters.
+
+import itertools
+import math
+import warnings
+
+import numpy as np
+
+from models.cross_validation import _clone
+from models.executors import get_executor, materialize, share, worker_task
+from models import sampling
+from utils.instrumentation import instrument, span
+
+METHODS = ("halving", "hyperband")
+# Resources whose value is the total budget even under warm_start (new trees are
+# added up to it); other iteration parameters count iterations per fit call
+CUMULATIVE_RESOURCES = ("n_estimators",)
+ITERATION_RESOURCES = ("n_estimators", "max_iter")
+
+
+@worker_task
+def _fit_candidate(model, X_ref, y_ref, rows, val_rows, params):
+    """
+    Fits one candidate on its rung's rows and scores it on the validation rows.
+    Module level so process pools can pickle it.
+
+    :return: (fitted model, validation score)
+    """
+    from sklearn.exceptions import ConvergenceWarning
+
+    X = materialize(X_ref)
+    y = materialize(y_ref)
+    model.set_params(**params)
+    with span("tuning.fit_candidate", model=type(model).__name__), warnings.catch_warnings():
+        # Small budgets stop before convergence by design
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        model.fit(sampling.take(X, rows), sampling.take(y, rows))
+        score = model.score(sampling.take(X, val_rows), sampling.take(y, val_rows))
+    return model, float(score)
+
+
+def parameter_grid(space):
+    """Every combination of a search space whose values are all lists."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def sample_candidates(space, n_candidates, rng):
+    """
+    Draws parameter settings from a search space. Values are lists (sampled
+    uniformly) or scipy.stats distributions (anything with rvs). A space of
+    lists small enough is enumerated instead (no duplicates).
+
+    :param space: Dict of parameter name -> list or distribution
+    :param n_candidates: Number of settings wanted (None = the whole grid)
+    :param rng: np.random.Generator
+    :return: List of parameter dicts
+    """
+    finite = all(isinstance(values, (list, tuple)) for values in space.values())
+    if finite:
+        grid = parameter_grid(space)
+        if n_candidates is None or n_candidates >= len(grid):
+            return grid
+        return [grid[i] for i in np.sort(rng.choice(len(grid), n_candidates, replace=False))]
+    if n_candidates is None:
+        raise ValueError("Search spaces with distributions need n_candidates.")
+    candidates = []
+    for _ in range(n_candidates):
+        params = {}
+        for name, values in space.items():
+            if hasattr(values, "rvs"):
+                params[name] = values.rvs(random_state=rng)
+            else:
+                params[name] = values[rng.integers(len(values))]
+        candidates.append(params)
+    return candidates
+
+
+def stratified_order(y, rng):
+    """
+    Row order in which every prefix keeps roughly the class proportions, so
+    growing row budgets are nested and never miss a class.
+    """
+    y = np.asarray(y)
+    _, codes, counts = np.unique(y, return_inverse=True, return_counts=True)
+    rank = np.empty(len(y))
+    for code, count in enumerate(counts):
+        rows = np.flatnonzero(codes == code)
+        rank[rows] = (rng.permutation(count) + rng.random(count)) / count
+    return np.argsort(rank, kind="stable")
+
+
+class _Ladder:
+    """One successive-halving run: a member's candidates climbing a resource schedule."""
+
+    def __init__(self, name, bracket, candidates, models, budgets):
+        self.name = name
+        self.bracket = bracket
+        self.candidates = candidates
+        self.models = models
+        self.budgets = budgets
+        self.alive = list(range(len(candidates)))
+        self.spent = [0] * len(candidates)
+        self.scores = [None] * len(candidates)
+
+
+class MemberTuner:
+    """
+    Tunes each ensemble member over its own search space with successive halving
+    (or Hyperband: several halving brackets trading candidates for starting budget).
+
+        tuner = MemberTuner({"SGDClassifier": {"alpha": [1e-5, 1e-4, 1e-3]}}, random_state=42)
+        tuner.fit(models, X_train, y_train)
+        ensemble = tuner.build_ensemble(strategy="hard_voting")
+
+    Candidates are scored with the estimator's own score() on a held-out slice of
+    the training rows. Members without a search space are passed through as is.
+    """
+
+    def __init__(self, search_spaces: dict, method: str = "halving", factor: int = 3,
+                 resource: str = "auto", max_resources: int = None, min_resources: int = None,
+                 n_candidates: int = None, validation_size: float = 0.2, random_state=None,
+                 n_jobs: int = None, executor=None):
+        """
+        :param search_spaces: Dict of member name -> {parameter: list or distribution}
+        :param method: 'halving' or 'hyperband'
+        :param factor: Budget multiplier between rungs; 1/factor of the candidates survive
+        :param resource: 'n_samples', an iteration parameter ('max_iter', 'n_estimators')
+                         or 'auto' (n_estimators or max_iter when the member can be
+                         warm-started, otherwise n_samples)
+        :param max_resources: Full budget (default: all tuning rows, or the member's
+                              current value of the iteration parameter)
+        :param min_resources: Smallest budget a candidate gets (default: per resource)
+        :param n_candidates: Candidates per member for 'halving' (None = the whole grid)
+        :param validation_size: Fraction of the training rows used to score candidates
+        :param random_state: Seed for candidate sampling, row order and member seeds
+        :param n_jobs: Workers used to fit the candidates of a rung
+        :param executor: 'serial', 'thread', 'process' or a concurrent.futures.Executor
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}'. Options: {METHODS}")
+        if factor < 2:
+            raise ValueError(f"factor must be at least 2, got {factor}")
+        self.search_spaces = search_spaces
+        self.method = method
+        self.factor = factor
+        self.resource = resource
+        self.max_resources = max_resources
+        self.min_resources = min_resources
+        self.n_candidates = n_candidates
+        self.validation_size = validation_size
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.executor = executor
+
+    def _resource(self, model):
+        """Budget kind for a member and whether survivors can be warm-started."""
+        params = model.get_params()
+        warm = "warm_start" in params
+        resource = self.resource
+        if resource == "auto":
+            resource = next((name for name in ITERATION_RESOURCES if warm and name in params), "n_samples")
+        if resource != "n_samples" and resource not in params:
+            raise ValueError(f"{type(model).__name__} has no parameter '{resource}' to use as the budget.")
+        # Growing the rows of an ensemble of trees would not refit it under warm_start
+        if resource == "n_samples" and "n_estimators" in params:
+            warm = False
+        return resource, warm
+
+    def _budget_range(self, model, resource, n_rows, n_classes):
+        """(min_resources, max_resources) for a member."""
+        if resource == "n_samples":
+            max_r = min(self.max_resources or n_rows, n_rows)
+            # Enough rows for every class to show up in the first rung
+            floor = 10 * n_classes if n_classes else 20
+        else:
+            max_r = self.max_resources or model.get_params()[resource]
+            floor = 1
+        min_r = self.min_resources or max(floor, int(math.ceil(max_r / self.factor ** 3)))
+        return min(min_r, max_r), max_r
+
+    def _schedule(self, n_candidates, min_r, max_r):
+        """Budgets of one halving run ending at max_r, starting no lower than min_r."""
+        n_rungs = 1 + int(math.floor(math.log(max(n_candidates, 1), self.factor) + 1e-9))
+        n_rungs = min(n_rungs, 1 + int(math.floor(math.log(max_r / min_r, self.factor) + 1e-9)))
+        return [int(math.ceil(max_r / self.factor ** (n_rungs - 1 - k))) for k in range(n_rungs)]
+
+    def _ladders(self, name, model, space, min_r, max_r, rng, seeds):
+        """The halving runs for one member: one ladder, or one per Hyperband bracket."""
+        s_max = int(math.floor(math.log(max_r / min_r, self.factor) + 1e-9))
+        if self.method == "halving" or s_max == 0:
+            # Without room for a second rung Hyperband would sample a single candidate
+            plans = [(0, sample_candidates(space, self.n_candidates, rng), None)]
+        else:
+            plans = []
+            for s in range(s_max, -1, -1):
+                n = int(math.ceil((s_max + 1) / (s + 1) * self.factor ** s))
+                plans.append((s_max - s, sample_candidates(space, n, rng), s + 1))
+
+        ladders = []
+        for bracket, candidates, n_rungs in plans:
+            if n_rungs is None:
+                budgets = self._schedule(len(candidates), min_r, max_r)
+            else:
+                budgets = [int(math.ceil(max_r / self.factor ** (n_rungs - 1 - k))) for k in range(n_rungs)]
+            models = [_clone(model) for _ in candidates]
+            if self.random_state is not None and model.get_params().get("random_state", 0) is None:
+                for candidate, seed in zip(models, seeds.spawn(len(models))):
+                    candidate.set_params(random_state=sampling.estimator_seed(seed))
+            ladders.append(_Ladder(name, bracket, candidates, models, budgets))
+        return ladders
+
+    @instrument("tuning.fit")
+    def fit(self, models, X, y, stratify: bool = None):
+        """
+        Runs the search for every member with a search space.
+
+        :param models: Dict of name -> estimator (or an EnsembleModel)
+        :param X: Training features
+        :param y: Training targets
+        :param stratify: Keep class proportions in the validation split and row
+                         budgets (default: True for classifiers)
+        :return: self
+        """
+        from sklearn.base import is_classifier
+        from sklearn.model_selection import train_test_split
+
+        if hasattr(models, "models") and hasattr(models, "names"):
+            self.ensemble_params_ = {"strategy": models.strategy, "task": models.task}
+            models = dict(zip(models.names, models.models))
+        unknown = [name for name in self.search_spaces if name not in models]
+        if unknown:
+            raise ValueError(f"Search spaces for unknown members: {unknown}")
+        self.models = dict(models)
+        y = np.asarray(y)
+        if stratify is None:
+            stratify = any(is_classifier(models[name]) for name in self.search_spaces)
+        n_classes = len(np.unique(y)) if stratify else 0
+
+        rng = np.random.default_rng(sampling.member_seeds(self.random_state, ["tuning"])[0])
+        fit_rows, val_rows = train_test_split(
+            np.arange(len(y)), test_size=self.validation_size, stratify=y if stratify else None,
+            random_state=int(rng.integers(2 ** 31)))
+        order = fit_rows[stratified_order(y[fit_rows], rng)] if stratify else rng.permutation(fit_rows)
+
+        ladders, self.resources_ = [], {}
+        seeds = sampling.member_seeds(self.random_state, list(self.search_spaces))
+        for (name, space), seed in zip(self.search_spaces.items(), seeds):
+            resource, warm = self._resource(models[name])
+            min_r, max_r = self._budget_range(models[name], resource, len(order), n_classes)
+            self.resources_[name] = {"resource": resource, "warm_start": warm,
+                                     "min_resources": min_r, "max_resources": max_r}
+            ladders += self._ladders(name, models[name], space, min_r, max_r,
+                                     np.random.default_rng(seed), seed)
+
+        self.history_ = []
+        pool, kind, owned = get_executor(self.executor, self.n_jobs)
+        X_ref, y_ref = share(X, kind), share(y, kind)
+        try:
+            for rung in range(max(len(ladder.budgets) for ladder in ladders)):
+                jobs = []
+                for ladder in ladders:
+                    if rung >= len(ladder.budgets):
+                        continue
+                    for i in ladder.alive:
+                        jobs.append((ladder, i, pool.submit(
+                            _fit_candidate, ladder.models[i], X_ref, y_ref,
+                            *self._rung_inputs(ladder, i, rung, order, val_rows))))
+                for ladder, i, future in jobs:
+                    ladder.models[i], ladder.scores[i] = future.result()
+                    ladder.spent[i] = ladder.budgets[rung]
+                    self.history_.append({"member": ladder.name, "bracket": ladder.bracket, "rung": rung,
+                                          "resource": ladder.budgets[rung], "params": ladder.candidates[i],
+                                          "score": ladder.scores[i]})
+                for ladder in ladders:
+                    if rung < len(ladder.budgets) - 1:
+                        ranked = sorted(ladder.alive, key=lambda i: -ladder.scores[i])
+                        ladder.alive = ranked[:max(1, int(math.ceil(len(ranked) / self.factor)))]
+        finally:
+            for ref, original in ((X_ref, X), (y_ref, y)):
+                if ref is not original:
+                    ref.release()
+            if owned:
+                pool.shutdown()
+
+        # Every ladder ends at the full budget, so final-rung scores are comparable
+        self.best_params_, self.best_score_, self.best_estimators_ = {}, {}, {}
+        for ladder in ladders:
+            i = max(ladder.alive, key=lambda i: ladder.scores[i])
+            if ladder.name not in self.best_score_ or ladder.scores[i] > self.best_score_[ladder.name]:
+                self.best_params_[ladder.name] = ladder.candidates[i]
+                self.best_score_[ladder.name] = ladder.scores[i]
+                self.best_estimators_[ladder.name] = ladder.models[i]
+        self.n_fits_ = len(self.history_)
+        return self
+
+    def _rung_inputs(self, ladder, i, rung, order, val_rows):
+        """(training rows, validation rows, parameters) for one candidate at one rung."""
+        resource, warm = self.resources_[ladder.name]["resource"], self.resources_[ladder.name]["warm_start"]
+        budget = ladder.budgets[rung]
+        params = dict(ladder.candidates[i])
+        resumed = warm and ladder.spent[i] > 0
+        if warm:
+            params["warm_start"] = resumed
+        if resource == "n_samples":
+            return np.sort(order[:budget]), val_rows, params
+        if resumed and resource not in CUMULATIVE_RESOURCES:
+            # warm_start continues from the last fit: only the extra iterations are run
+            budget -= ladder.spent[i]
+        params[resource] = budget
+        return order, val_rows, params
+
+    def tuned_models(self):
+        """
+        Members with their selected parameters, unfitted and at the full budget,
+        in the original member order.
+
+        :return: Dict of name -> estimator
+        """
+        tuned = {}
+        for name, model in self.models.items():
+            if name not in self.best_params_:
+                tuned[name] = model
+                continue
+            tuned[name] = _clone(model).set_params(**self.best_params_[name])
+            resource = self.resources_[name]["resource"]
+            if resource != "n_samples":
+                tuned[name].set_params(**{resource: self.resources_[name]["max_resources"]})
+        return tuned
+
+    def build_ensemble(self, **params):
+        """
+        EnsembleModel over the tuned members (strategy/task carry over when the
+        tuner was fit on an EnsembleModel).
+
+        :param params: Any EnsembleModel argument
+        :return: Unfitted EnsembleModel
+        """
+        from models.ensemble_models import EnsembleModel
+
+        for key, value in getattr(self, "ensemble_params_", {}).items():
+            params.setdefault(key, value)
+        return EnsembleModel(models=self.tuned_models(), **params)
+
+    def summary(self):
+        """One row per member: selected parameters, score, budget and fits used."""
+        fits = {}
+        for record in self.history_:
+            fits[record["member"]] = fits.get(record["member"], 0) + 1
+        return [{"member": name, "params": self.best_params_[name], "score": self.best_score_[name],
+                 "fits": fits.get(name, 0), **self.resources_[name]} for name in self.best_params_]
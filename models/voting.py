@@ -0,0 +1,221 @@
+# models/voting.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Vectorized combination engine for EnsembleModel. Member outputs are
+#              label-encoded against the ensemble's class order and combined with
+#              NumPy count matrices / probability averages, with no per-sample Python.
+
+import warnings
+
+import numpy as np
+
+
+def encode_labels(predictions, classes):
+    """
+    Maps raw member predictions onto integer codes 0..n_classes-1.
+
+    :param predictions: Array of shape (n_models, n_samples) with class labels
+    :param classes: Sorted array of ensemble class labels
+    :return: Integer array of shape (n_models, n_samples)
+    """
+    predictions = np.asarray(predictions)
+    classes = np.asarray(classes)
+
+    # Small non-negative integer labels: a lookup table beats a binary search
+    if (np.issubdtype(classes.dtype, np.integer) and np.issubdtype(predictions.dtype, np.integer)
+            and classes.size and classes[0] >= 0 and classes[-1] < 1 << 16):
+        lookup = np.full(int(classes[-1]) + 1, -1, dtype=np.intp)
+        lookup[classes] = np.arange(len(classes))
+        if predictions.size and (predictions.min() < 0 or predictions.max() > classes[-1]):
+            codes = np.full(predictions.shape, -1)
+        else:
+            codes = lookup[predictions]
+        if (codes < 0).any():
+            unknown = np.setdiff1d(np.unique(predictions), classes)
+            raise ValueError(f"Members predicted labels not seen during fit: {unknown}")
+        return codes
+
+    codes = np.searchsorted(classes, predictions)
+    codes = np.clip(codes, 0, len(classes) - 1)
+    if not np.array_equal(classes[codes], predictions):
+        unknown = np.setdiff1d(np.unique(predictions), classes)
+        raise ValueError(f"Members predicted labels not seen during fit: {unknown}")
+    return codes
+
+
+def vote_counts(codes, n_classes, weights=None):
+    """
+    Builds the (n_samples, n_classes) vote matrix from encoded predictions.
+
+    Each member contributes one vectorized scatter-add; a member votes for exactly
+    one class per row, so fancy-index accumulation never collides within a member.
+
+    :param codes: Integer array of shape (n_models, n_samples)
+    :param n_classes: Number of classes
+    :param weights: Optional per-member vote weights
+    :return: Array of shape (n_samples, n_classes)
+    """
+    n_models, n_samples = codes.shape
+    dtype = np.float64 if weights is not None else np.int32
+    counts = np.zeros((n_samples, n_classes), dtype=dtype)
+    rows = np.arange(n_samples)
+    for m in range(n_models):
+        counts[rows, codes[m]] += 1 if weights is None else weights[m]
+    return counts
+
+
+def hard_vote(predictions, classes, weights=None):
+    """
+    Majority (optionally weighted) vote. Ties go to the first class in `classes`,
+    matching np.bincount(...).argmax().
+
+    :param predictions: Array of shape (n_models, n_samples) with class labels
+    :param classes: Sorted array of ensemble class labels
+    :param weights: Optional per-member vote weights
+    :return: Array of shape (n_samples,) with winning labels
+    """
+    classes = np.asarray(classes)
+    codes = encode_labels(predictions, classes)
+    counts = vote_counts(codes, len(classes), weights)
+    return classes[np.argmax(counts, axis=1)]
+
+
+def align_proba(proba, member_classes, classes):
+    """
+    Reorders/expands a member's predict_proba columns to the ensemble class order.
+    Classes the member never saw get probability 0.
+
+    :param proba: Array of shape (n_samples, n_member_classes)
+    :param member_classes: The member's classes_ attribute
+    :param classes: Sorted array of ensemble class labels
+    :return: Array of shape (n_samples, n_classes)
+    """
+    member_classes = np.asarray(member_classes)
+    if member_classes.shape == np.shape(classes) and np.array_equal(member_classes, classes):
+        return proba
+    aligned = np.zeros((proba.shape[0], len(classes)), dtype=proba.dtype)
+    aligned[:, encode_labels(member_classes, classes)] = proba
+    return aligned
+
+
+def soft_vote(probas, member_classes, classes, weights=None):
+    """
+    Averages member probabilities after aligning their class order.
+
+    :param probas: List of (n_samples, n_member_classes) arrays
+    :param member_classes: List of each member's classes_
+    :param classes: Sorted array of ensemble class labels
+    :param weights: Optional per-member weights
+    :return: Array of shape (n_samples, n_classes)
+    """
+    total = None
+    for m, (proba, member_cls) in enumerate(zip(probas, member_classes)):
+        aligned = align_proba(np.asarray(proba, dtype=np.float64), member_cls, classes)
+        w = 1.0 if weights is None else weights[m]
+        if total is None:
+            total = aligned * w
+        else:
+            total += aligned * w
+    norm = len(probas) if weights is None else float(np.sum(weights))
+    total /= norm
+    return total
+
+
+REGRESSION_STRATEGIES = ("averaging", "median", "trimmed_mean")
+
+
+def _weighted_quantile_mass(values, weights, lower, upper):
+    """
+    Per-column weight each sorted member keeps inside the cumulative-weight window
+    [lower, upper]; values are sorted along axis 0 in place.
+
+    :return: (sorted values, kept weight) both of shape (n_models, n_samples)
+    """
+    order = np.argsort(values, axis=0)
+    values[...] = np.take_along_axis(values, order, axis=0)
+    w = np.asarray(weights, dtype=np.float64)[order]
+    cum = np.cumsum(w, axis=0)
+    kept = np.minimum(cum, upper) - np.maximum(cum - w, lower)
+    np.clip(kept, 0.0, None, out=kept)
+    return values, kept
+
+
+def check_trim(trim, n_models):
+    """
+    Validates an unweighted trimmed-mean setting for `n_models` members and warns
+    when it is degenerate: cutting int(trim * n_models) members from each end
+    removes nothing (= averaging) or keeps only the middle (= median). Called
+    once when an ensemble is fit, not per combined batch.
+
+    :return: Members cut from each end
+    """
+    if not 0 <= trim < 0.5:
+        raise ValueError(f"trim must be in [0, 0.5), got {trim}")
+    cut = int(trim * n_models)
+    if n_models >= 3:
+        if cut == 0 and trim > 0:
+            warnings.warn(f"trim={trim} removes no member out of {n_models}; trimmed_mean equals averaging.",
+                          stacklevel=3)
+        elif n_models - 2 * cut <= 2:
+            warnings.warn(f"trim={trim} keeps only the middle member(s) out of {n_models}; "
+                          "trimmed_mean equals the median.", stacklevel=3)
+    return cut
+
+
+def combine_values(values, strategy="averaging", weights=None, trim=0.1, out=None):
+    """
+    Combines member regression outputs column-wise. `values` is used as scratch
+    space (sorted in place for median/trimmed_mean), so pass a buffer that can
+    be overwritten.
+
+    :param values: Float array of shape (n_models, n_samples)
+    :param strategy: 'averaging' (weighted mean), 'median' (weighted median) or
+                     'trimmed_mean' (drops `trim` of the members - by weight - at each end)
+    :param weights: Optional per-member weights
+    :param trim: Fraction trimmed from each end for 'trimmed_mean' (0 <= trim < 0.5)
+    :param out: Optional (n_samples,) output array
+    :return: Array of shape (n_samples,)
+    """
+    n_models, n_samples = values.shape
+    if out is None:
+        out = np.empty(n_samples, dtype=np.float64)
+
+    if strategy == "averaging":
+        if weights is None:
+            np.mean(values, axis=0, out=out)
+        else:
+            w = np.asarray(weights, dtype=np.float64)
+            np.matmul(w, values, out=out)
+            out /= w.sum()
+        return out
+
+    if strategy == "median":
+        if weights is None:
+            return np.median(values, axis=0, overwrite_input=True, out=out)
+        # First sorted member whose cumulative weight reaches half the total; when it
+        # lands exactly on half, average with the next one (np.median for equal weights)
+        order = np.argsort(values, axis=0)
+        values[...] = np.take_along_axis(values, order, axis=0)
+        cum = np.cumsum(np.asarray(weights, dtype=np.float64)[order], axis=0)
+        half = 0.5 * cum[-1]
+        pick = np.argmax(cum >= half * (1 - 1e-12), axis=0)
+        cols = np.arange(n_samples)
+        upper = np.minimum(pick + 1, n_models - 1)
+        tie = np.isclose(cum[pick, cols], half)
+        out[:] = np.where(tie, 0.5 * (values[pick, cols] + values[upper, cols]), values[pick, cols])
+        return out
+
+    if strategy == "trimmed_mean":
+        if not 0 <= trim < 0.5:
+            raise ValueError(f"trim must be in [0, 0.5), got {trim}")
+        if weights is None:
+            # Same cut as scipy.stats.trim_mean: int(trim * n) members from each end
+            cut = int(trim * n_models)
+            values.sort(axis=0)
+            return np.mean(values[cut:n_models - cut], axis=0, out=out)
+        total = float(np.sum(weights))
+        values, kept = _weighted_quantile_mass(values, weights, trim * total, (1 - trim) * total)
+        np.einsum("ij,ij->j", values, kept, out=out)
+        out /= kept.sum(axis=0)
+        return out
+
+    raise NotImplementedError(f"Strategy '{strategy}' is not supported for regression.")
@@ -0,0 +1 @@
+# Auto-generated Python module
@@ -0,0 +1,232 @@
+# serving/batcher.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Asyncio micro-batcher for a fitted scoring pipeline. Concurrent small
+#              requests are queued and merged into one batch (up to max_batch_size rows
+#              or max_wait_ms after the first request), scored with a single vectorized
+#              predict in a thread or process worker pool, and split back per request.
+#              LatencyStats keeps the request latencies for p50/p99 and throughput.
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+METHODS = ("predict", "predict_proba")
+WORKER_KINDS = ("thread", "process")
+
+# Pipeline loaded once per worker process by _init_worker
+_WORKER_PIPELINE = None
+
+
+def _init_worker(artifact_path):
+    """Process-pool initializer: maps the artifact's arrays (shared read-only)."""
+    global _WORKER_PIPELINE
+    from models.persistence import FittedPipeline
+
+    _WORKER_PIPELINE = FittedPipeline.load(artifact_path, on_stale="ignore")
+
+
+def _worker_ready():
+    return _WORKER_PIPELINE is not None
+
+
+def _score_in_worker(method, X):
+    return np.asarray(getattr(_WORKER_PIPELINE, method)(X))
+
+
+class LatencyStats:
+    """Rolling request latencies plus request/row/batch counters."""
+
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.batch_rows = deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def record_request(self, latency_s, n_rows):
+        self.latencies.append(latency_s)
+        self.requests += 1
+        self.rows += n_rows
+
+    def record_batch(self, n_rows):
+        self.batch_rows.append(n_rows)
+        self.batches += 1
+
+    def snapshot(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        latencies = np.asarray(self.latencies) * 1e3
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "errors": self.errors,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "mean_batch_rows": float(np.mean(self.batch_rows)) if self.batch_rows else 0.0,
+            "requests_per_s": self.requests / elapsed,
+            "rows_per_s": self.rows / elapsed,
+            "uptime_s": elapsed,
+        }
+
+
+class MicroBatcher:
+    """
+    Merges concurrent scoring calls into micro-batches.
+
+        batcher = MicroBatcher(pipeline, max_batch_size=256, max_wait_ms=2)
+        await batcher.start()
+        y = await batcher.submit(X_rows)
+
+    Up to `workers` batches are scored at the same time, so the next batch fills
+    while the previous one runs.
+    """
+
+    def __init__(self, pipeline=None, artifact_path=None, max_batch_size=256, max_wait_ms=2.0,
+                 workers=1, worker_kind="thread"):
+        """
+        :param pipeline: Loaded FittedPipeline (or anything with predict/predict_proba)
+        :param artifact_path: Artifact directory; required for worker_kind='process'
+        :param max_batch_size: Rows that close a batch immediately
+        :param max_wait_ms: Longest a request waits for others to join its batch
+        :param workers: Batches scored concurrently
+        :param worker_kind: 'thread' (NumPy releases the GIL) or 'process'
+        """
+        if worker_kind not in WORKER_KINDS:
+            raise ValueError(f"Unknown worker_kind '{worker_kind}'. Options: {WORKER_KINDS}")
+        if pipeline is None and artifact_path is None:
+            raise ValueError("Pass a loaded pipeline or an artifact_path.")
+        if worker_kind == "process" and artifact_path is None:
+            raise ValueError("worker_kind='process' needs artifact_path so workers can map it.")
+        self.pipeline = pipeline
+        self.artifact_path = artifact_path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1e3
+        self.workers = workers
+        self.worker_kind = worker_kind
+        self.stats = LatencyStats()
+        self._queue = None
+        self._pool = None
+        self._slots = None
+        self._task = None
+        # Scoring tasks in flight; the loop only keeps weak references to tasks
+        self._running = set()
+
+    async def start(self):
+        if self.worker_kind == "process":
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker, initargs=(self.artifact_path,))
+            # Spawn and load the workers now, not on the first request
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[loop.run_in_executor(self._pool, _worker_ready)
+                                   for _ in range(self.workers)])
+        else:
+            if self.pipeline is None:
+                from models.persistence import FittedPipeline
+
+                self.pipeline = FittedPipeline.load(self.artifact_path, on_stale="ignore")
+            self._pool = ThreadPoolExecutor(self.workers)
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._task = asyncio.create_task(self._collect())
+        return self
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def submit(self, X, method="predict"):
+        """
+        Queues rows for scoring and waits for their results.
+
+        :param X: 2-D array of feature rows
+        :param method: 'predict' or 'predict_proba'
+        :return: Array of predictions (or probabilities) for these rows
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}'. Options: {METHODS}")
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((method, X, future))
+        try:
+            return await future
+        finally:
+            self.stats.record_request(time.perf_counter() - start, len(X))
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][1])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                batch.append(item)
+                rows += len(item[1])
+
+            # Wait for a free worker, then top the batch up with whatever queued meanwhile
+            await self._slots.acquire()
+            while rows < self.max_batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                batch.append(item)
+                rows += len(item[1])
+            groups = [(method, [item for item in batch if item[0] == method]) for method in METHODS]
+            for n, (method, group) in enumerate([g for g in groups if g[1]]):
+                # The slot acquired above goes to the first group; a second method needs its own
+                if n:
+                    await self._slots.acquire()
+                task = asyncio.create_task(self._run(method, group))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _run(self, method, group):
+        """Scores one group on a worker slot the collector already acquired, then frees it."""
+        try:
+            X = group[0][1] if len(group) == 1 else np.concatenate([item[1] for item in group])
+            self.stats.record_batch(len(X))
+            loop = asyncio.get_running_loop()
+            try:
+                if self.worker_kind == "process":
+                    out = await loop.run_in_executor(self._pool, _score_in_worker, method, X)
+                else:
+                    out = await loop.run_in_executor(self._pool, getattr(self.pipeline, method), X)
+            except Exception as exc:
+                self.stats.errors += len(group)
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+            offset = 0
+            for _, rows, future in group:
+                if not future.done():
+                    future.set_result(out[offset:offset + len(rows)])
+                offset += len(rows)
+        finally:
+            self._slots.release()
@@ -0,0 +1,211 @@
+# serving/server.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Local scoring service for a saved FittedPipeline (see models.persistence).
+#              A small asyncio HTTP/1.1 front end (TCP or Unix socket, keep-alive) hands
+#              every request to the MicroBatcher, so concurrent small requests are scored
+#              together instead of each paying the per-member Python overhead.
+#
+# Endpoints:
+#   POST /predict        {"instances": [[f1, f2, ...], ...]}  -> {"predictions": [...]}
+#   POST /predict_proba  {"instances": [...]}                  -> {"probabilities": [[...]], "classes": [...]}
+#   GET  /stats          latency p50/p99, throughput and batch sizes
+#   GET  /health
+#
+# Run from the repository root:
+#   python -m serving.server --artifact results/models/iris_hard_voting --port 8080
+#   python -m serving.server --artifact results/models/iris_hard_voting --unix /tmp/ensemble.sock
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+
+import numpy as np
+
+from config import logger
+from serving.batcher import MicroBatcher, WORKER_KINDS
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _response(status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+async def _read_request(reader):
+    """Parses one HTTP/1.1 request; returns None when the client closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Malformed Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Malformed Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Body larger than {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    return method, target.split("?", 1)[0], body, keep_alive
+
+
+class ScoringServer:
+    """HTTP front end around a MicroBatcher."""
+
+    def __init__(self, batcher, n_features=None, classes=None):
+        """
+        :param batcher: MicroBatcher (not yet started)
+        :param n_features: Expected columns per row (checked before queueing)
+        :param classes: Class labels returned with probabilities
+        """
+        self.batcher = batcher
+        self.n_features = n_features
+        self.classes = classes
+        self._server = None
+
+    def _rows(self, body):
+        try:
+            payload = json.loads(body or b"{}")
+            X = np.asarray(payload["instances"], dtype=np.float64)
+        except (ValueError, KeyError, TypeError) as exc:
+            raise HTTPError(400, f"Expected JSON {{\"instances\": [[...], ...]}}: {exc}")
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.ndim != 2 or not X.size:
+            raise HTTPError(400, "instances must be a non-empty list of feature rows")
+        if self.n_features is not None and X.shape[1] != self.n_features:
+            raise HTTPError(400, f"Expected {self.n_features} features per row, got {X.shape[1]}")
+        return X
+
+    async def _dispatch(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok", "n_features": self.n_features, "classes": self.classes}
+        if path == "/stats":
+            return 200, self.batcher.stats.snapshot()
+        if path not in ("/predict", "/predict_proba"):
+            raise HTTPError(404, f"Unknown endpoint {path}")
+        if method != "POST":
+            raise HTTPError(405, f"{path} expects POST")
+        X = self._rows(body)
+        out = await self.batcher.submit(X, method=path.lstrip("/"))
+        if path == "/predict":
+            return 200, {"predictions": out.tolist()}
+        return 200, {"probabilities": out.tolist(), "classes": self.classes}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                # A request that fails to parse may leave its body unread: close after answering
+                keep_alive = False
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, payload = await self._dispatch(method, path, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as exc:
+                    logger.error(f"Scoring request failed: {exc}")
+                    status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080, unix_path=None):
+        await self.batcher.start()
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            self._server = await asyncio.start_unix_server(self.handle, path=unix_path)
+        else:
+            self._server = await asyncio.start_server(self.handle, host, port)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.close()
+        logger.info(f"Scoring server stats: {self.batcher.stats.snapshot()}")
+
+
+async def serve(artifact, host="127.0.0.1", port=8080, unix_path=None, max_batch_size=256,
+                max_wait_ms=2.0, workers=1, worker_kind="thread"):
+    """Loads the artifact and serves it until SIGINT/SIGTERM."""
+    from models.persistence import FittedPipeline
+
+    manifest = FittedPipeline.read_manifest(artifact)
+    batcher = MicroBatcher(artifact_path=artifact, max_batch_size=max_batch_size,
+                           max_wait_ms=max_wait_ms, workers=workers, worker_kind=worker_kind)
+    server = ScoringServer(batcher, n_features=manifest.get("n_features_in"), classes=manifest.get("classes"))
+    await server.start(host, port, unix_path)
+    address = unix_path or f"http://{host}:{port}"
+    logger.info(f"Serving {artifact} on {address} (max_batch_size={max_batch_size}, "
+                f"max_wait_ms={max_wait_ms}, {workers} {worker_kind} worker(s))")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
+        if unix_path and os.path.exists(unix_path):
+            os.remove(unix_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a saved ensemble pipeline with micro-batching.")
+    parser.add_argument("--artifact", required=True, help="FittedPipeline artifact directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--worker-kind", default="thread", choices=WORKER_KINDS)
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.artifact, args.host, args.port, args.unix, args.max_batch_size,
+                      args.max_wait_ms, args.workers, args.worker_kind))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# tests/conftest.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Shared pytest setup. Puts the repository root on sys.path so tests can
+#              import the top-level packages (models, utils, ...) from any working directory,
+#              and provides the plot_mode fixture for tests that switch the global plot pool.
+
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+
+@pytest.fixture
+def plot_mode(tmp_path):
+    """
+    set_plot_mode() for a single test. Jobs spool under tmp_path unless the test passes
+    its own spool_dir; afterwards the test's pool is closed, the previous process-wide
+    pool is restored and the spool is removed.
+    """
+    from utils import plot_pool
+
+    previous = plot_pool._ACTIVE
+    spool_dir = str(tmp_path / "spool")
+
+    def set_mode(mode, **kwargs):
+        kwargs.setdefault("spool_dir", spool_dir)
+        return plot_pool.set_plot_mode(mode, **kwargs)
+
+    yield set_mode
+    if plot_pool._ACTIVE is not previous:
+        plot_pool._ACTIVE.close()
+    plot_pool._ACTIVE = previous
+    shutil.rmtree(spool_dir, ignore_errors=True)
@@ -0,0 +1,71 @@
+# tests/test_batcher.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: MicroBatcher: merged batches are split back per request, scoring never
+#              runs on more than `workers` slots, and every slot is returned.
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from serving.batcher import MicroBatcher
+
+
+class CountingPipeline:
+    """Row-sum 'model' that records how many batches it scores at once."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def _score(self, X):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.005)
+        with self._lock:
+            self.active -= 1
+        return X.sum(axis=1)
+
+    def predict(self, X):
+        return self._score(X)
+
+    def predict_proba(self, X):
+        return np.column_stack([self._score(X), -X.sum(axis=1)])
+
+
+def _serve(pipeline, requests, workers):
+    async def main():
+        batcher = await MicroBatcher(pipeline, max_batch_size=8, max_wait_ms=1.0, workers=workers).start()
+        try:
+            results = await asyncio.gather(*[batcher.submit(X, method) for X, method in requests])
+        finally:
+            await batcher.close()
+        return batcher, results
+
+    return asyncio.run(main())
+
+
+def test_mixed_requests_are_split_back_per_request():
+    rng = np.random.default_rng(0)
+    requests = [(rng.normal(size=(n % 3 + 1, 4)), "predict" if n % 2 else "predict_proba")
+                for n in range(40)]
+    batcher, results = _serve(CountingPipeline(), requests, workers=2)
+
+    for (X, method), out in zip(requests, results):
+        expected = X.sum(axis=1)
+        if method == "predict_proba":
+            expected = np.column_stack([expected, -expected])
+        np.testing.assert_allclose(out, expected)
+    assert batcher._running == set()
+    assert batcher._slots._value == 2
+
+
+def test_scoring_is_bounded_by_workers():
+    pipeline = CountingPipeline()
+    requests = [(np.ones((2, 3)), "predict" if n % 2 else "predict_proba") for n in range(60)]
+    _serve(pipeline, requests, workers=1)
+
+    assert pipeline.max_active == 1
@@ -0,0 +1,131 @@
+# tests/test_boosting.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: BoostedEnsemble against the scikit-learn references (SAMME AdaBoost and
+#              squared-error gradient boosting reproduce them exactly), compiled versus
+#              per-estimator scoring, staged prediction, early stopping, and the
+#              absolute-error and log-loss variants.
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_breast_cancer, load_diabetes, load_iris
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, GradientBoostingRegressor
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from models.boosting import BoostedEnsemble
+
+SEED = 0
+
+
+def _tree(depth=3):
+    return DecisionTreeRegressor(max_depth=depth, criterion="friedman_mse")
+
+
+def _uncompiled(model):
+    """Scores every fitted unit with its own predict."""
+    model.compiled_ = []
+    model.loose_index_ = list(range(len(model.estimators_)))
+    return model
+
+
+# SAMME is the only algorithm from scikit-learn 1.6 on, where the parameter is deprecated
+@pytest.mark.filterwarnings("ignore:The parameter 'algorithm' is deprecated")
+def test_adaboost_matches_sklearn_samme():
+    X, y = load_iris(return_X_y=True)
+    ours = BoostedEnsemble({"stump": DecisionTreeClassifier(max_depth=1)}, algorithm="adaboost",
+                           n_estimators=10, random_state=SEED).fit(X, y)
+    reference = AdaBoostClassifier(DecisionTreeClassifier(max_depth=1), n_estimators=10,
+                                   algorithm="SAMME", random_state=SEED).fit(X, y)
+
+    np.testing.assert_allclose(ours.estimator_weights_, reference.estimator_weights_)
+    np.testing.assert_array_equal(ours.predict(X), reference.predict(X))
+
+
+def test_squared_error_matches_sklearn_gradient_boosting():
+    X, y = load_diabetes(return_X_y=True)
+    ours = BoostedEnsemble({"tree": _tree()}, algorithm="gradient", n_estimators=20,
+                           learning_rate=0.1, random_state=SEED).fit(X, y)
+    reference = GradientBoostingRegressor(n_estimators=20, learning_rate=0.1, max_depth=3,
+                                          random_state=SEED).fit(X, y)
+
+    np.testing.assert_allclose(ours.predict(X), reference.predict(X))
+
+
+@pytest.mark.parametrize("loader", [load_breast_cancer, load_iris], ids=["binary", "multiclass"])
+def test_log_loss_classification(loader):
+    X, y = loader(return_X_y=True)
+    ours = BoostedEnsemble({"tree": _tree()}, algorithm="gradient", loss="log_loss", n_estimators=30,
+                           learning_rate=0.1, random_state=SEED).fit(X, y)
+    reference = GradientBoostingClassifier(n_estimators=30, learning_rate=0.1, max_depth=3,
+                                           random_state=SEED).fit(X, y)
+
+    # sklearn takes a Newton step per leaf, so only the decisions are compared
+    assert accuracy_score(y, ours.predict(X)) >= accuracy_score(y, reference.predict(X)) - 0.02
+    assert np.all(np.diff(ours.train_loss_) < 0)
+    proba = ours.predict_proba(X)
+    assert proba.shape == (len(y), len(np.unique(y)))
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    assert log_loss(y, proba) == pytest.approx(ours.train_loss_[-1])
+
+
+def test_absolute_error_reduces_the_training_loss():
+    X, y = load_diabetes(return_X_y=True)
+    ours = BoostedEnsemble({"tree": _tree()}, algorithm="gradient", loss="absolute_error",
+                           n_estimators=50, learning_rate=0.1, random_state=SEED).fit(X, y)
+    reference = GradientBoostingRegressor(loss="absolute_error", n_estimators=50, learning_rate=0.1,
+                                          max_depth=3, random_state=SEED).fit(X, y)
+
+    mae = np.abs(ours.predict(X) - y).mean()
+    # The line search never increases the loss
+    assert np.all(np.diff(ours.train_loss_) <= 1e-9)
+    assert mae == pytest.approx(ours.train_loss_[-1])
+    assert mae < 0.6 * np.abs(y - np.median(y)).mean()
+    assert mae <= 1.05 * np.abs(reference.predict(X) - y).mean()
+
+
+@pytest.mark.parametrize("algorithm, members, loader", [
+    ("adaboost", {"stump": DecisionTreeClassifier(max_depth=1), "lr": LogisticRegression(max_iter=1000)},
+     load_iris),
+    ("gradient", {"tree": DecisionTreeRegressor(max_depth=3), "ridge": Ridge()}, load_diabetes),
+], ids=["adaboost", "gradient"])
+def test_compiled_scoring_matches_per_estimator_scoring(algorithm, members, loader):
+    X, y = loader(return_X_y=True)
+    model = BoostedEnsemble(members, algorithm=algorithm, n_estimators=8, learning_rate=0.5,
+                            random_state=SEED).fit(X, y)
+    # Both the linear and the tree members were packed
+    assert len(model.compiled_) == 2 and model.loose_index_ == []
+    compiled = (model.decision_function(X), model.staged_decision_function(X), model.predict(X))
+
+    _uncompiled(model)
+    np.testing.assert_allclose(model.decision_function(X), compiled[0])
+    np.testing.assert_allclose(model.staged_decision_function(X), compiled[1])
+    np.testing.assert_allclose(model.predict(X), compiled[2])
+
+
+@pytest.mark.parametrize("algorithm, loader, members", [
+    ("adaboost", load_iris, {"stump": DecisionTreeClassifier(max_depth=1)}),
+    ("gradient", load_diabetes, {"tree": _tree()}),
+], ids=["adaboost", "gradient"])
+def test_last_stage_equals_predict(algorithm, loader, members):
+    X, y = loader(return_X_y=True)
+    model = BoostedEnsemble(members, algorithm=algorithm, n_estimators=10, random_state=SEED).fit(X, y)
+    staged = model.staged_predict(X)
+
+    assert len(staged) == model.n_estimators_
+    np.testing.assert_allclose(staged[-1], model.predict(X))
+
+
+def test_early_stopping_keeps_the_best_stage():
+    X, y = load_diabetes(return_X_y=True)
+    X_train, y_train, X_val, y_val = X[:300], y[:300], X[300:], y[300:]
+    model = BoostedEnsemble({"tree": _tree(depth=6)}, algorithm="gradient", n_estimators=200,
+                            learning_rate=0.5, random_state=SEED)
+    model.fit(X_train, y_train, validation=(X_val, y_val), patience=5)
+
+    # Overfitting deep trees stop well before n_estimators, 5 stages after the best one
+    assert model.n_estimators_ < 50
+    assert len(model.validation_loss_) == model.best_iteration_ + 5 + 1
+    assert model.n_estimators_ == model.best_iteration_ == int(np.argmin(model.validation_loss_))
+    assert len(model.staged_predict(X_val)) == model.n_estimators_
+    assert np.mean((model.predict(X_val) - y_val) ** 2) == pytest.approx(min(model.validation_loss_))
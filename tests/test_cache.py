@@ -0,0 +1,89 @@
+# tests/test_cache.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Fitted-model cache: a repeated ensemble fit takes every member from the
+#              cache (the same fitted object each time), changed params or data miss,
+#              the in-memory LRU evicts the oldest entry and the disk level reloads
+#              entries into a fresh cache.
+
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from models.cache import FittedModelCache, estimator_key, fingerprint_data
+from models.ensemble_models import EnsembleModel
+
+
+def _ensemble(cache, C=1.0):
+    models = {"lr": LogisticRegression(C=C, max_iter=1000), "tree": DecisionTreeClassifier(max_depth=3)}
+    return EnsembleModel("soft_voting", models=models, random_state=0, cache=cache)
+
+
+def test_repeated_fit_returns_the_cached_estimators():
+    X, y = load_iris(return_X_y=True)
+    cache = FittedModelCache()
+    first = _ensemble(cache).fit(X, y)
+    assert cache.stats() == {"hits": 0, "misses": 2, "entries": 2}
+
+    second = _ensemble(cache).fit(X, y)
+    third = _ensemble(cache).fit(X, y)
+    assert cache.stats() == {"hits": 4, "misses": 2, "entries": 2}
+    assert all(a is b for a, b in zip(second.estimators_, third.estimators_))
+    np.testing.assert_allclose(second.predict_proba(X), first.predict_proba(X))
+
+    # Entries are copies: refitting the first ensemble's member leaves them alone
+    first.estimators_[0].fit(X[:, :2], y)
+    np.testing.assert_allclose(_ensemble(cache).fit(X, y).predict_proba(X), second.predict_proba(X))
+
+
+def test_changed_params_or_data_miss():
+    X, y = load_iris(return_X_y=True)
+    cache = FittedModelCache()
+    _ensemble(cache).fit(X, y)
+    _ensemble(cache, C=0.5).fit(X, y)
+    assert (cache.hits, cache.misses) == (1, 3)
+    _ensemble(cache).fit(X[:100], y[:100])
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+def test_fingerprint_covers_values_dtype_and_columns():
+    X = np.arange(12.0).reshape(4, 3)
+    changed = X.copy()
+    changed[0, 0] = -1.0
+    frame = pd.DataFrame(X, columns=["a", "b", "c"])
+    prints = {fingerprint_data(X), fingerprint_data(changed), fingerprint_data(X.astype(np.float32)),
+              fingerprint_data(frame), fingerprint_data(frame.rename(columns={"a": "z"}))}
+    assert len(prints) == 5
+    assert fingerprint_data(X) == fingerprint_data(X.copy())
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = FittedModelCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, {"model": key})
+    assert cache.get("a") == {"model": "a"}
+    cache.put("c", {"model": "c"})
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_disk_level_reloads_entries(tmp_path):
+    X, y = load_iris(return_X_y=True)
+    cache_dir = str(tmp_path / "models")
+    fitted = _ensemble(FittedModelCache(cache_dir=cache_dir)).fit(X, y)
+    assert len(os.listdir(cache_dir)) == 2
+
+    reloaded = FittedModelCache(max_entries=1, cache_dir=cache_dir)
+    ensemble = _ensemble(reloaded).fit(X, y)
+    assert (reloaded.hits, reloaded.misses) == (2, 0)
+    np.testing.assert_allclose(ensemble.predict_proba(X), fitted.predict_proba(X))
+
+    key = estimator_key(LogisticRegression(C=2.0), fingerprint_data(X, y))
+    assert key not in reloaded
+    reloaded.clear(disk=True)
+    assert len(reloaded) == 0 and os.listdir(cache_dir) == []
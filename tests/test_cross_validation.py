@@ -0,0 +1,74 @@
+# tests/test_cross_validation.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Out-of-fold matrix: every member's held-out predictions and probabilities
+#              equal scikit-learn's cross_val_predict on the same folds, and the combined
+#              OOF votes and fold metrics are derived from them without refitting.
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression, RidgeClassifier
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.tree import DecisionTreeClassifier
+
+from models.cross_validation import cross_val_predictions, make_folds
+
+SEED = 3
+
+
+def _data():
+    X, y = load_iris(return_X_y=True)
+    return X, np.array(["setosa", "versicolor", "virginica"])[y]
+
+
+def _members():
+    return {"lr": LogisticRegression(max_iter=1000), "tree": DecisionTreeClassifier(max_depth=3),
+            "ridge": RidgeClassifier()}
+
+
+def test_folds_match_stratified_kfold():
+    _, y = _data()
+    folds = make_folds(y, n_splits=5, random_state=SEED)
+    splitter = StratifiedKFold(n_splits=5, shuffle=True, random_state=SEED)
+    for fold, (_, test_idx) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        np.testing.assert_array_equal(np.flatnonzero(folds == fold), np.sort(test_idx))
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread"])
+def test_oof_matrix_equals_cross_val_predict(executor):
+    X, y = _data()
+    members = _members()
+    oof = cross_val_predictions(members, X, y, n_splits=5, random_state=SEED, executor=executor, n_jobs=2)
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=SEED)
+
+    np.testing.assert_array_equal(oof.classes_, np.unique(y))
+    # The members now carry the seeds cross_val_predictions gave them
+    for m, (name, model) in enumerate(members.items()):
+        np.testing.assert_array_equal(oof.classes_[oof.codes_[m]], cross_val_predict(model, X, y, cv=cv))
+        if name == "ridge":
+            assert not oof.has_proba_[m] and np.isnan(oof.probas_[m]).all()
+        else:
+            assert oof.has_proba_[m]
+            np.testing.assert_allclose(oof.probas_[m], cross_val_predict(model, X, y, cv=cv,
+                                                                         method="predict_proba"))
+
+
+def test_combined_predictions_come_from_the_oof_matrix():
+    X, y = _data()
+    members = _members()
+    oof = cross_val_predictions(members, X, y, n_splits=5, random_state=SEED)
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=SEED)
+    probas = {name: cross_val_predict(members[name], X, y, cv=cv, method="predict_proba")
+              for name in ("lr", "tree")}
+
+    soft = oof.predict("soft_voting", weights={"lr": 2.0, "tree": 1.0}, members=["lr", "tree"])
+    np.testing.assert_array_equal(soft, oof.classes_[np.argmax(2 * probas["lr"] + probas["tree"], axis=1)])
+    with pytest.raises(ValueError, match="without predict_proba"):
+        oof.scores("soft_voting")
+
+    hard = oof.predict("hard_voting")
+    metrics = oof.fold_metrics(hard, report=False)
+    folds = oof.folds_
+    expected = [np.mean(hard[folds == fold] == y[folds == fold]) for fold in range(5)]
+    np.testing.assert_allclose(metrics["fold_accuracy"], expected)
+    assert metrics["confusion_matrix"].sum() == len(y)
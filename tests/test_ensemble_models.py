@@ -0,0 +1,62 @@
+# tests/test_ensemble_models.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: EnsembleModel fitting: argument validation before any member trains and
+#              streaming early stopping when validation scores are NaN.
+
+import numpy as np
+import pytest
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.linear_model import SGDRegressor
+
+from models.ensemble_models import EnsembleModel
+
+
+class DivergedRegressor(RegressorMixin, BaseEstimator):
+    """Incremental member whose predictions are all NaN (a diverged SGD run)."""
+
+    def partial_fit(self, X, y):
+        self.n_features_in_ = np.asarray(X).shape[1]
+        return self
+
+    def predict(self, X):
+        return np.full(len(X), np.nan)
+
+
+class UnfittableRegressor(RegressorMixin, BaseEstimator):
+    """Fails the test if the ensemble trains it."""
+
+    def fit(self, X, y):
+        raise AssertionError("member was fit")
+
+
+def _regression_data(n_rows=200):
+    X = np.random.default_rng(0).normal(size=(n_rows, 3))
+    return X, X @ np.array([1.0, 2.0, 3.0])
+
+
+def test_fit_stream_stops_when_no_validation_score_is_valid():
+    X, y = _regression_data()
+    ensemble = EnsembleModel("averaging", task="regression",
+                             models={"a": DivergedRegressor(), "b": DivergedRegressor()})
+    ensemble.fit_stream((X, y), batch_size=50, epochs=10, validation=(X[:50], y[:50]), patience=3)
+
+    assert np.isnan(ensemble.validation_scores_).all()
+    assert ensemble.best_epoch_ is None
+    assert ensemble.n_epochs_ == 3
+
+
+def test_fit_stream_keeps_best_epoch_with_valid_scores():
+    X, y = _regression_data()
+    ensemble = EnsembleModel("averaging", task="regression", random_state=0,
+                             models={"a": SGDRegressor(), "b": SGDRegressor(alpha=0.01)})
+    ensemble.fit_stream((X, y), batch_size=50, epochs=5, validation=(X[:50], y[:50]), patience=2)
+
+    assert ensemble.best_epoch_ == int(np.argmax(ensemble.validation_scores_))
+
+
+def test_oob_without_subsampling_is_rejected_before_fitting():
+    X, y = _regression_data()
+    ensemble = EnsembleModel("averaging", task="regression", oob_score=True, bootstrap=False,
+                             models={"a": UnfittableRegressor()})
+    with pytest.raises(ValueError, match="Out-of-bag"):
+        ensemble.fit(X, y)
@@ -0,0 +1,93 @@
+# tests/test_evaluation.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: The bincount-based metrics in utils/evaluation.py against scikit-learn:
+#              confusion matrix, classification report (text and dict), the batched
+#              per-fold scoring of evaluate_many, and batch/streaming regression metrics.
+
+import numpy as np
+import pytest
+from sklearn.metrics import (accuracy_score, classification_report, confusion_matrix, f1_score,
+                             mean_absolute_error, mean_squared_error, r2_score)
+
+from utils.evaluation import (RegressionAccumulator, compute_confusion_matrix, evaluate, evaluate_many,
+                              evaluate_regression)
+
+
+def _labels(kind, n_samples=500, seed=0):
+    rng = np.random.default_rng(seed)
+    classes = np.array(["setosa", "versicolor", "virginica", "unseen"]) if kind == "str" else np.array([3, 1, 7, 5])
+    y_true = classes[rng.integers(0, 3, n_samples)]
+    y_pred = np.where(rng.random(n_samples) < 0.7, y_true, classes[rng.integers(0, 4, n_samples)])
+    # The last class is only ever predicted, so its recall and F1 are undefined
+    return y_true, y_pred
+
+
+@pytest.mark.parametrize("kind", ["str", "int"])
+def test_confusion_matrix_and_report_match_sklearn(kind):
+    y_true, y_pred = _labels(kind)
+    cm, labels = compute_confusion_matrix(y_true, y_pred)
+    np.testing.assert_array_equal(cm, confusion_matrix(y_true, y_pred, labels=labels))
+
+    metrics = evaluate(y_true, y_pred)
+    assert metrics.accuracy == pytest.approx(accuracy_score(y_true, y_pred))
+    for digits in (2, 4):
+        assert metrics.report(digits) == classification_report(y_true, y_pred, digits=digits, zero_division=0)
+
+    expected = classification_report(y_true, y_pred, output_dict=True, zero_division=0)
+    result = metrics.as_dict()
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value)
+
+
+def test_explicit_label_order_is_kept():
+    y_true, y_pred = _labels("str")
+    order = ["virginica", "unseen", "setosa", "versicolor"]
+    cm, labels = compute_confusion_matrix(y_true, y_pred, labels=order)
+    assert labels.tolist() == order
+    np.testing.assert_array_equal(cm, confusion_matrix(y_true, y_pred, labels=order))
+
+    with pytest.raises(ValueError, match="not in the label set"):
+        compute_confusion_matrix(y_true, y_pred, labels=order[:3])
+
+
+def test_evaluate_many_matches_per_vector_and_per_fold_sklearn():
+    y_true, _ = _labels("int")
+    predictions = {(strategy, seed): _labels("int", seed=seed)[1] if strategy == "noisy" else y_true
+                   for strategy in ("noisy", "exact") for seed in (1, 2)}
+    folds = np.arange(len(y_true)) % 3
+    batch = evaluate_many(y_true, predictions, folds=folds)
+
+    expected_accuracy = [accuracy_score(y_true, predictions[key]) for key in batch.keys]
+    np.testing.assert_allclose(batch.accuracy(), expected_accuracy)
+    np.testing.assert_allclose(batch.macro_f1(), [f1_score(y_true, predictions[key], average="macro",
+                                                            labels=batch.labels, zero_division=0)
+                                                   for key in batch.keys])
+    for i, key in enumerate(batch.keys):
+        for fold in range(3):
+            rows = folds == fold
+            assert batch.fold_accuracy()[i, fold] == pytest.approx(
+                accuracy_score(y_true[rows], predictions[key][rows]))
+            np.testing.assert_array_equal(
+                batch.metrics(key, fold).confusion_matrix,
+                confusion_matrix(y_true[rows], predictions[key][rows], labels=batch.labels))
+
+
+def test_regression_metrics_match_sklearn_in_batch_and_stream():
+    rng = np.random.default_rng(0)
+    # A large offset checks the streamed variance stays stable
+    y_true = 1e6 + rng.normal(size=1000)
+    y_pred = y_true + rng.normal(scale=0.5, size=1000)
+    expected = {"mse": mean_squared_error(y_true, y_pred), "mae": mean_absolute_error(y_true, y_pred),
+                "r2": r2_score(y_true, y_pred)}
+    expected["rmse"] = np.sqrt(expected["mse"])
+
+    assert evaluate_regression(y_true, y_pred) == pytest.approx(expected)
+
+    first, second = RegressionAccumulator(), RegressionAccumulator()
+    for start in range(0, 600, 128):
+        first.update(y_true[start:min(start + 128, 600)], y_pred[start:min(start + 128, 600)])
+    second.update(y_true[600:], y_pred[600:])
+    result = first.merge(second).result()
+    assert result.pop("n") == 1000
+    assert result == pytest.approx(expected)
@@ -0,0 +1,86 @@
+# tests/test_executors.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Executor helpers and parallel member training: serial, thread and process
+#              fits give the same ensemble, and shared-memory handles attached by a
+#              worker task are closed when the task returns.
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+import models.executors as executors
+from models.ensemble_models import EnsembleModel
+from models.executors import SharedArray, get_executor, materialize, resolve_n_jobs, worker_task
+
+
+def test_resolve_n_jobs(monkeypatch):
+    monkeypatch.setattr(executors.os, "cpu_count", lambda: 8)
+    assert [resolve_n_jobs(n) for n in (None, 0, 1, 3, -1, -2)] == [1, 1, 1, 3, 8, 7]
+
+
+@pytest.mark.parametrize("executor, n_jobs, kind", [
+    (None, 1, "serial"), (None, 2, "thread"), ("thread", 2, "thread"), ("process", 2, "process")])
+def test_get_executor_kinds(executor, n_jobs, kind):
+    pool, resolved, owned = get_executor(executor, n_jobs)
+    try:
+        assert (resolved, owned) == (kind, True)
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.parametrize("strategy", ["hard_voting", "soft_voting"])
+def test_parallel_fit_matches_serial(strategy):
+    X, y = load_iris(return_X_y=True)
+
+    def fitted(executor):
+        models = {"lr": LogisticRegression(max_iter=1000), "tree": DecisionTreeClassifier(random_state=0),
+                  "knn": KNeighborsClassifier()}
+        return EnsembleModel(strategy, models=models, executor=executor, n_jobs=2).fit(X, y)
+
+    serial = fitted("serial")
+    for executor in ("thread", "process"):
+        parallel = fitted(executor)
+        np.testing.assert_array_equal(parallel.predict(X), serial.predict(X))
+        if strategy == "soft_voting":
+            np.testing.assert_allclose(parallel.predict_proba(X), serial.predict_proba(X))
+
+
+@worker_task
+def _column_sums(ref):
+    return materialize(ref).sum(axis=0)
+
+
+@worker_task
+def _first_rows(ref):
+    return materialize(ref)[:2]
+
+
+def test_worker_task_closes_attached_blocks():
+    data = np.arange(12.0).reshape(4, 3)
+    refs = [SharedArray(data) for _ in range(3)]
+    try:
+        for ref in refs:
+            np.testing.assert_array_equal(_column_sums(ref), data.sum(axis=0))
+            assert executors._ATTACHED == {}
+    finally:
+        for ref in refs:
+            ref.release()
+
+
+def test_block_still_referenced_is_closed_on_a_later_task():
+    data = np.arange(12.0).reshape(4, 3)
+    ref, other = SharedArray(data), SharedArray(data)
+    try:
+        view = _first_rows(ref)
+        # The returned view keeps the mapping alive, so the handle stays open
+        assert list(executors._ATTACHED) == [ref.name]
+        np.testing.assert_array_equal(view, data[:2])
+        del view
+        _column_sums(other)
+        assert executors._ATTACHED == {}
+    finally:
+        ref.release()
+        other.release()
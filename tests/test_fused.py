@@ -0,0 +1,95 @@
+# tests/test_fused.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Compiled scoring: after EnsembleModel.compile() hard voting, soft voting
+#              and regression give the same output as the members' own predict and
+#              predict_proba, with string labels, binary and multi-class targets and
+#              bagged feature subsets; PackedTrees reproduces every packed tree.
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_diabetes, load_iris
+from sklearn.linear_model import (Lasso, LinearRegression, LogisticRegression, Ridge, RidgeClassifier,
+                                  SGDClassifier, SGDRegressor)
+from sklearn.svm import LinearSVC
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from models.ensemble_models import EnsembleModel
+from models.fused import PackedTrees
+
+# A few bagged rows are in-bag for every member; that warning is not under test here
+pytestmark = pytest.mark.filterwarnings("ignore:.*in-bag for every member")
+
+
+def _probabilistic():
+    return {"softmax": LogisticRegression(max_iter=1000),
+            "ovr": LogisticRegression(solver="liblinear"),
+            "sgd": SGDClassifier(loss="log_loss", random_state=0),
+            "tree": DecisionTreeClassifier(max_depth=3, random_state=0)}
+
+
+def _classifiers():
+    return {**_probabilistic(), "ridge": RidgeClassifier(), "svc": LinearSVC()}
+
+
+def _regressors():
+    return {"ridge": Ridge(), "ols": LinearRegression(), "lasso": Lasso(alpha=0.01),
+            "sgd": SGDRegressor(random_state=0), "tree": DecisionTreeRegressor(max_depth=4, random_state=0)}
+
+
+def _string_labels(n_classes):
+    X, y = load_iris(return_X_y=True)
+    keep = y < n_classes
+    X = (X[keep] - X[keep].mean(axis=0)) / X[keep].std(axis=0)
+    return X, np.array(["setosa", "versicolor", "virginica"])[y[keep]]
+
+
+def _compiled_matches(ensemble, X, proba):
+    plain = ensemble.predict(X)
+    plain_proba = ensemble.predict_proba(X) if proba else None
+    ensemble.compile()
+    assert ensemble.fused_ is not None and len(ensemble.fused_index_) < len(ensemble.estimators_)
+    if ensemble.is_classifier:
+        np.testing.assert_array_equal(ensemble.predict(X), plain)
+    else:
+        np.testing.assert_allclose(ensemble.predict(X), plain)
+    if proba:
+        np.testing.assert_allclose(ensemble.predict_proba(X), plain_proba, atol=1e-12)
+
+
+@pytest.mark.parametrize("bagged", [False, True], ids=["full", "bagged"])
+@pytest.mark.parametrize("n_classes", [2, 3], ids=["binary", "multiclass"])
+@pytest.mark.parametrize("strategy", ["hard_voting", "soft_voting"])
+def test_compiled_classification_matches(strategy, n_classes, bagged):
+    X, y = _string_labels(n_classes)
+    members = _classifiers() if strategy == "hard_voting" else _probabilistic()
+    ensemble = EnsembleModel(strategy, models=members, bootstrap=bagged, max_features=0.5 if bagged else 1.0,
+                             random_state=0).fit(X, y)
+    _compiled_matches(ensemble, X, proba=strategy == "soft_voting")
+
+
+@pytest.mark.parametrize("bagged", [False, True], ids=["full", "bagged"])
+@pytest.mark.parametrize("strategy", ["averaging", "median", "trimmed_mean"])
+def test_compiled_regression_matches(strategy, bagged):
+    X, y = load_diabetes(return_X_y=True)
+    # Standardized so SGDRegressor converges within its default max_iter
+    y = (y - y.mean()) / y.std()
+    ensemble = EnsembleModel(strategy, models=_regressors(), bootstrap=bagged, trim=0.2,
+                             max_features=0.5 if bagged else 1.0, random_state=0).fit(X, y)
+    _compiled_matches(ensemble, X, proba=False)
+
+
+def test_packed_trees_reproduce_every_tree():
+    X, y = load_diabetes(return_X_y=True)
+    rng = np.random.default_rng(0)
+    features = [None, np.sort(rng.choice(X.shape[1], 5, replace=False))]
+    trees = [DecisionTreeRegressor(max_depth=depth, random_state=0).fit(X if f is None else X[:, f], y)
+             for depth, f in zip((3, 8), features)]
+    packed = PackedTrees(trees, features)
+    expected = [tree.predict(X if f is None else X[:, f]) for tree, f in zip(trees, features)]
+    np.testing.assert_allclose(packed.predict_values(X, max_cells=64), expected)
+
+    X, y = _string_labels(3)
+    classes = np.unique(y)
+    trees = [DecisionTreeClassifier(max_depth=depth, random_state=0).fit(X, y) for depth in (2, 5)]
+    codes = PackedTrees(trees, [None, None], classes).predict_values(X)
+    np.testing.assert_array_equal(classes[codes.astype(np.intp)], [tree.predict(X) for tree in trees])
@@ -0,0 +1,71 @@
+# tests/test_grid_runner.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Resumable grids: cell ids are stable across expansions of the same spec, a
+#              rerun skips every cell completed in the results store (without loading or
+#              reducing any data), failed cells and new cells are run again, and
+#              resume=False reruns everything.
+
+import pytest
+
+import datasets.registry as registry
+import experiments.grid_runner as grid_runner
+from experiments.grid_runner import expand_cells, load_spec, run_grid
+from utils.results_store import ResultsStore
+
+SPEC = {
+    "name": "resume",
+    "datasets": ["iris"],
+    "dr": [None, {"n_components": 2, "method": "pca"}],
+    "member_sets": {"linear": ["LogisticRegression", "RidgeClassifier"], "ridge": ["RidgeClassifier"]},
+    "strategies": ["hard_voting", "soft_voting"],
+    "seeds": [0],
+}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "CACHE_DIR", str(tmp_path / "cache"))
+    return ResultsStore(str(tmp_path / "results.db"))
+
+
+def _statuses(store):
+    return {run["run_id"]: run["status"] for run in store.runs(experiment="grid:resume")}
+
+
+def test_cell_ids_are_stable_and_unique():
+    cells = expand_cells(load_spec(SPEC))
+    assert len(cells) == 2 * 2 * 2
+    assert [c["cell_id"] for c in cells] == [c["cell_id"] for c in expand_cells(load_spec(dict(SPEC)))]
+    assert len({c["cell_id"] for c in cells}) == len(cells)
+
+
+def test_rerun_skips_completed_cells(store, monkeypatch):
+    first = run_grid(SPEC, store=store, max_workers=1)
+    # RidgeClassifier alone cannot soft-vote: those two cells fail and are not completed
+    failed = {r["cell_id"] for r in first if "error" in r}
+    assert len(first) == 8 and len(failed) == 2
+    statuses = _statuses(store)
+    assert sorted(statuses.values()) == ["completed"] * 6 and not failed & set(statuses)
+
+    prepared = []
+    original = grid_runner.prepare_inputs
+    monkeypatch.setattr(grid_runner, "prepare_inputs",
+                        lambda spec, cells, work_dir: prepared.append(len(cells)) or original(spec, cells, work_dir))
+    second = run_grid(SPEC, store=store, max_workers=1)
+    assert {r["cell_id"] for r in second} == failed
+    assert prepared == [2]
+
+    # Only the cells of the new seed run; the completed ones are not even prepared again
+    extended = dict(SPEC, seeds=[0, 1], member_sets={"linear": SPEC["member_sets"]["linear"]})
+    third = run_grid(extended, store=store, max_workers=1)
+    assert len(third) == 4 and all("error" not in r for r in third)
+    assert prepared == [2, 4]
+    assert run_grid(extended, store=store, max_workers=1) == []
+    assert prepared == [2, 4]
+
+    assert len(run_grid(extended, store=store, max_workers=1, resume=False)) == 8
+
+
+def test_dry_run_runs_nothing(store):
+    assert run_grid(SPEC, store=store, dry_run=True) == []
+    assert _statuses(store) == {}
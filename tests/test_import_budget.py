@@ -0,0 +1,24 @@
+# tests/test_import_budget.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Import hygiene for the lightweight entry points in benchmarks/import_budget.py:
+#              importing a module (in a fresh interpreter) pulls in no forbidden heavy
+#              package and writes no files. The millisecond budgets depend on the machine
+#              and are only checked by python -m benchmarks.import_budget.
+
+import pytest
+
+from benchmarks.import_budget import BUDGETS, ROOT_DIR, _snapshot, main, measure
+
+
+@pytest.mark.parametrize("module", list(BUDGETS))
+def test_import_is_lazy_and_side_effect_free(module):
+    _, forbidden = BUDGETS[module]
+    before = _snapshot(ROOT_DIR)
+    result = measure(module, repeats=1)
+    assert [name for name in result["loaded"] if name in forbidden] == []
+    assert sorted(_snapshot(ROOT_DIR) - before) == []
+
+
+def test_script_fails_when_a_budget_is_exceeded(capsys):
+    assert main(["--modules", "config", "--repeats", "1", "--scale", "0.0001"]) == 1
+    assert "FAIL" in capsys.readouterr().out
@@ -0,0 +1,71 @@
+# tests/test_instrumentation.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Span memory tracking: nested spans on one thread each report their own
+#              peak, and a span overlapping from another thread neither resets the open
+#              span's peak nor reports one of its own.
+
+import threading
+
+import numpy as np
+import pytest
+
+from utils.instrumentation import ListSink, disable_instrumentation, enable_instrumentation, span
+
+MB = 1024 ** 2
+
+
+@pytest.fixture
+def records():
+    sink = ListSink()
+    enable_instrumentation(sink)
+    try:
+        yield sink.records
+    finally:
+        disable_instrumentation()
+
+
+def _by_name(records):
+    return {record["name"]: record for record in records}
+
+
+def test_nested_spans_report_their_own_peaks(records):
+    with span("outer"):
+        big = np.ones(8 * MB // 8)
+        del big
+        with span("inner"):
+            small = np.ones(MB // 8)
+            del small
+    spans = _by_name(records)
+    assert spans["outer"]["peak_mem_mb"] >= 8
+    assert 1 <= spans["inner"]["peak_mem_mb"] < 8
+
+
+def test_concurrent_span_does_not_reset_the_open_peak(records):
+    def work():
+        with span("worker"):
+            np.ones(MB // 8)
+
+    with span("outer"):
+        big = np.ones(8 * MB // 8)
+        del big
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    spans = _by_name(records)
+    assert spans["outer"]["peak_mem_mb"] >= 8
+    assert spans["worker"]["peak_mem_mb"] is None
+
+
+def test_tracking_resumes_once_the_overlap_ends(records):
+    def work():
+        with span("worker"):
+            np.ones(MB // 8)
+
+    thread = threading.Thread(target=work)
+    with span("outer"):
+        thread.start()
+        thread.join()
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    assert [record["peak_mem_mb"] is not None for record in records] == [False, True, True]
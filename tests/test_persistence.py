@@ -0,0 +1,130 @@
+# tests/test_persistence.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: FittedPipeline artifacts: a save/load round trip scores exactly like the
+#              pipeline that was saved, large arrays come back as read-only memory maps,
+#              and stale artifacts (changed data, params or library version) are
+#              reported according to on_stale.
+
+import json
+import os
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from dr.reducer import DimensionalityReducer
+from models.ensemble_models import EnsembleModel
+from models.persistence import MANIFEST_FILE, FittedPipeline, StaleArtifactError
+
+
+def _ensemble():
+    return EnsembleModel("soft_voting", models={"lr": LogisticRegression(max_iter=1000),
+                                                "tree": DecisionTreeClassifier(max_depth=3)},
+                         random_state=0)
+
+
+@pytest.fixture
+def iris():
+    data = load_iris(as_frame=True)
+    return data.data, data.target_names[data.target]
+
+
+@pytest.fixture
+def saved(tmp_path, iris):
+    X, y = iris
+    reducer = DimensionalityReducer(n_components=3, method="pca", random_state=0)
+    ensemble = _ensemble().fit(reducer.fit_transform(X), y)
+    pipeline = FittedPipeline(ensemble, reducer)
+    # A zero threshold writes every numeric array to its own file
+    path = pipeline.save(str(tmp_path / "iris"), X, y, metadata={"dataset": "iris"}, mmap_threshold=0)
+    return pipeline, path
+
+
+def test_round_trip_predictions_match(saved, iris):
+    pipeline, path = saved
+    X, y = iris
+    loaded = FittedPipeline.load(path, X_train=X, y_train=y, on_stale="raise")
+
+    np.testing.assert_array_equal(loaded.predict(X), pipeline.predict(X))
+    np.testing.assert_allclose(loaded.predict_proba(X), pipeline.predict_proba(X))
+    np.testing.assert_array_equal(loaded.classes_, pipeline.classes_)
+    assert loaded.feature_names == [str(c) for c in X.columns]
+    assert loaded.manifest["metadata"] == {"dataset": "iris"}
+    assert loaded.manifest["members"] == list(pipeline.ensemble.estimator_names_)
+
+
+def test_large_arrays_load_as_read_only_memmaps(saved):
+    _, path = saved
+    loaded = FittedPipeline.load(path)
+    coef = loaded.ensemble.estimators_[0].coef_
+    components = loaded.reducer.model.components_
+
+    assert loaded.manifest["arrays"]
+    assert isinstance(coef, np.memmap) and isinstance(components, np.memmap)
+    assert not coef.flags.writeable
+    assert os.path.dirname(coef.filename) == os.path.join(path, "arrays")
+
+    in_memory = FittedPipeline.load(path, mmap=False)
+    assert not isinstance(in_memory.ensemble.estimators_[0].coef_, np.memmap)
+
+
+def test_changed_training_data_follows_on_stale(saved, iris):
+    _, path = saved
+    X, y = iris
+    changed = X.copy()
+    changed.iloc[0, 0] += 1.0
+
+    with pytest.warns(UserWarning, match="training data changed"):
+        FittedPipeline.load(path, X_train=changed, y_train=y)
+    with pytest.raises(StaleArtifactError, match="training data changed"):
+        FittedPipeline.load(path, X_train=changed, y_train=y, on_stale="raise")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        FittedPipeline.load(path, X_train=changed, y_train=y, on_stale="ignore")
+        FittedPipeline.load(path, X_train=X, y_train=y, ensemble=_ensemble())
+
+
+def test_changed_params_and_library_version_are_stale(saved, iris):
+    _, path = saved
+    X, y = iris
+    ensemble = _ensemble()
+    ensemble.models[0].set_params(C=0.5)
+    loaded = FittedPipeline.load(path, on_stale="ignore")
+    assert loaded.stale_reasons(X, y, ensemble) == ["ensemble params changed"]
+
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["libraries"]["sklearn"] = "0.0.1"
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+    with pytest.raises(StaleArtifactError, match="saved with scikit-learn 0.0.1"):
+        FittedPipeline.load(path, on_stale="raise")
+
+
+def test_newer_format_and_unknown_on_stale_are_rejected(saved):
+    _, path = saved
+    with pytest.raises(ValueError, match="Unknown on_stale"):
+        FittedPipeline.load(path, on_stale="skip")
+
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["format_version"] += 1
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError, match="newer than supported"):
+        FittedPipeline.load(path)
+
+
+def test_save_replaces_an_existing_artifact(saved, iris, tmp_path):
+    pipeline, path = saved
+    X, y = iris
+    pipeline.save(path, X, y, metadata={"dataset": "iris", "run": 2})
+
+    assert FittedPipeline.read_manifest(path)["metadata"]["run"] == 2
+    # No staging or previous directory is left next to it
+    assert sorted(os.listdir(tmp_path)) == ["iris"]
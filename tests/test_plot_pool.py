@@ -0,0 +1,56 @@
+# tests/test_plot_pool.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Plot pool modes: 'off' drops jobs, 'sync' renders at once, and every job
+#              spooled by a 'deferred' pool is drawn and removed by render_deferred,
+#              including repeat runs that spool several jobs for the same output path.
+
+import os
+
+from utils.plot_pool import render_deferred
+from utils.visualization import render_strategy_accuracies
+
+
+def test_off_and_sync_modes(tmp_path, plot_mode):
+    path = str(tmp_path / "plots" / "scores.png")
+    pool = plot_mode("off")
+    pool.submit(render_strategy_accuracies, path, "scores", strategy_scores={"hard_voting": 0.5})
+    assert not os.path.exists(path)
+
+    pool = plot_mode("sync")
+    pool.submit(render_strategy_accuracies, path, "scores", strategy_scores={"hard_voting": 0.5})
+    assert os.path.exists(path)
+
+
+def test_render_deferred_draws_and_removes_spooled_jobs(tmp_path, plot_mode):
+    spool_dir = str(tmp_path / "spool")
+    paths = [str(tmp_path / "plots" / f"scores_{n}.png") for n in range(2)]
+    pool = plot_mode("deferred", spool_dir=spool_dir)
+    try:
+        for path in paths:
+            pool.submit(render_strategy_accuracies, path, "scores", strategy_scores={"hard_voting": 0.5})
+    finally:
+        pool.close()
+    assert len(os.listdir(spool_dir)) == 2
+    assert not any(os.path.exists(path) for path in paths)
+
+    assert sorted(render_deferred(spool_dir, max_workers=1)) == paths
+    assert all(os.path.exists(path) for path in paths)
+    assert os.listdir(spool_dir) == []
+
+
+def test_render_deferred_removes_every_job_for_a_shared_path(tmp_path, plot_mode):
+    spool_dir = str(tmp_path / "spool")
+    path = str(tmp_path / "plots" / "scores.png")
+    pool = plot_mode("deferred", spool_dir=spool_dir)
+    try:
+        for accuracy in (0.5, 0.75):
+            pool.submit(render_strategy_accuracies, path, "scores", strategy_scores={"hard_voting": accuracy})
+    finally:
+        pool.close()
+    assert len(os.listdir(spool_dir)) == 2
+
+    rendered = render_deferred(spool_dir, max_workers=1)
+
+    assert rendered == [path, path]
+    assert os.path.exists(path)
+    assert os.listdir(spool_dir) == []
@@ -0,0 +1,61 @@
+# tests/test_registry.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Dataset registry cache builds: chunked .npy conversion, per-process
+#              staging files and Parquet column selection.
+
+import os
+
+import numpy as np
+import pytest
+
+import datasets.registry as registry
+from datasets.registry import load_dataset, register_dataset
+
+
+@pytest.fixture
+def registered():
+    names = []
+
+    def register(name, *args, **kwargs):
+        names.append(name)
+        register_dataset(name, *args, **kwargs)
+
+    yield register
+    for name in names:
+        registry.DATASETS.pop(name, None)
+
+
+def test_npy_source_is_converted_in_row_chunks(tmp_path, registered, monkeypatch):
+    monkeypatch.setattr(registry, "CSV_CHUNK_ROWS", 7)
+    data = np.random.default_rng(0).normal(size=(50, 4))
+    data[:, 1] = np.arange(50) % 3
+    source = tmp_path / "data.npy"
+    np.save(source, data)
+    registered("test_npy_chunks", source=str(source), label_col=1)
+
+    dataset = load_dataset("test_npy_chunks", cache_dir=str(tmp_path / "cache"))
+    np.testing.assert_array_equal(np.asarray(dataset.X), data[:, [0, 2, 3]])
+    np.testing.assert_array_equal(dataset.y, data[:, 1])
+
+
+def test_cache_build_leaves_no_staging_files(tmp_path, registered):
+    source = tmp_path / "data.npy"
+    np.save(source, np.arange(40.0).reshape(10, 4))
+    registered("test_npy_staging", source=str(source))
+
+    load_dataset("test_npy_staging", cache_dir=str(tmp_path / "cache"))
+    assert sorted(os.listdir(tmp_path / "cache" / "test_npy_staging")) == ["X.bin", "meta.json", "y.npy"]
+
+
+def test_parquet_columns_are_applied(tmp_path, registered):
+    pytest.importorskip("pyarrow")
+    import pandas as pd
+
+    frame = pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0], "c": [5.0, 6.0], "target": [0, 1]})
+    source = tmp_path / "data.parquet"
+    frame.to_parquet(source)
+    registered("test_parquet_columns", source=str(source), columns=["a", "c", "target"])
+
+    dataset = load_dataset("test_parquet_columns", cache_dir=str(tmp_path / "cache"))
+    assert dataset.meta["feature_names"] == ["a", "c"]
+    np.testing.assert_array_equal(np.asarray(dataset.X), frame[["a", "c"]].to_numpy())
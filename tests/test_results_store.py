@@ -0,0 +1,81 @@
+# tests/test_results_store.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Results store: a run's params, reports, metrics and confusion matrices
+#              round-trip through SQLite, queries aggregate across runs, and writing the
+#              same run_id again (resumed or retried grid cell) replaces its records.
+
+import numpy as np
+import pytest
+
+from utils.results_store import ResultsStore
+
+
+def _write_run(store, accuracy, strategies=("hard_voting",)):
+    with store.run("cell_0001", experiment="grid_test", dataset="iris") as batch:
+        for strategy in strategies:
+            batch.add_strategy(strategy, models=["a", "b"], report="report")
+            batch.add_metric("accuracy", accuracy, strategy=strategy)
+            batch.add_confusion_matrix(strategy, np.eye(2, dtype=int), labels=[0, 1])
+
+
+def test_rerun_replaces_metrics(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    _write_run(store, 0.5)
+    _write_run(store, 0.75)
+
+    rows = store.query("SELECT value FROM metrics WHERE run_id = ? AND metric = 'accuracy'", ("cell_0001",))
+    assert [row["value"] for row in rows] == [0.75]
+    assert len(store.query("SELECT * FROM runs")) == 1
+
+
+def test_rerun_drops_strategies_no_longer_written(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    _write_run(store, 0.5, strategies=("hard_voting", "soft_voting"))
+    _write_run(store, 0.5, strategies=("hard_voting",))
+
+    for table in ("strategies", "confusion_matrices", "metrics"):
+        rows = store.query(f"SELECT strategy FROM {table} WHERE run_id = ?", ("cell_0001",))
+        assert [row["strategy"] for row in rows] == ["hard_voting"]
+
+
+def test_failed_run_is_recorded(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    try:
+        with store.run("cell_0002", experiment="grid_test", dataset="iris") as batch:
+            batch.add_metric("accuracy", 0.1, strategy="hard_voting")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert store.runs()[0]["status"] == "failed"
+
+
+def test_run_round_trips(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    cm = np.array([[5, 1], [0, 4]])
+    with store.run("run_a", experiment="bagging_linear_clf", dataset="iris",
+                   params={"random_seed": 42, "models": ["lr", "tree"]}) as batch:
+        batch.add_strategy("soft_voting", models=["lr", "tree"], report="precision ...")
+        batch.add_metric("accuracy", 0.9, strategy="soft_voting")
+        batch.add_metric("accuracy", 0.8, strategy="soft_voting", model="lr")
+        batch.add_confusion_matrix("soft_voting", cm, labels=np.array([0, 1]))
+
+    run = store.runs(dataset="iris")[0]
+    assert (run["run_id"], run["status"]) == ("run_a", "completed")
+    assert run["params"] == {"random_seed": 42, "models": ["lr", "tree"]}
+    assert store.report("run_a", "soft_voting") == "precision ..."
+    matrix, labels = store.confusion_matrix("run_a", "soft_voting")
+    np.testing.assert_array_equal(matrix, cm)
+    assert labels == [0, 1]
+    assert [row["value"] for row in store.metric_history(model="lr")] == [0.8]
+
+
+def test_strategy_summary_aggregates_runs(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    for run_id, accuracy in (("run_a", 0.8), ("run_b", 0.9)):
+        with store.run(run_id, experiment="grid_test", dataset="iris") as batch:
+            batch.add_metric("accuracy", accuracy, strategy="hard_voting")
+
+    (summary,) = store.strategy_summary(dataset="iris")
+    assert summary["n_runs"] == 2
+    assert summary["mean_value"] == pytest.approx(0.85)
+    assert summary["best_value"] == 0.9
@@ -0,0 +1,68 @@
+# tests/test_sampling.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Bootstrap bagging: each member's rows, columns and out-of-bag score follow
+#              from its own seed, independent of member order, the other members and
+#              the executor.
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from models import sampling
+from models.ensemble_models import EnsembleModel
+
+# Three bagged members leave many rows in-bag for all of them; that warning is expected here
+pytestmark = pytest.mark.filterwarnings("ignore:.*in-bag for every member")
+
+
+def test_member_seed_depends_only_on_ensemble_seed_and_name():
+    seeds = sampling.member_seeds(42, ["a", "b", "c"])
+    reordered = sampling.member_seeds(42, ["c", "x", "a"])
+    assert seeds[0].generate_state(4).tolist() == reordered[2].generate_state(4).tolist()
+    assert seeds[2].generate_state(4).tolist() == reordered[0].generate_state(4).tolist()
+    assert seeds[0].generate_state(4).tolist() != seeds[1].generate_state(4).tolist()
+    assert seeds[0].generate_state(4).tolist() != sampling.member_seeds(7, ["a"])[0].generate_state(4).tolist()
+
+
+def test_draw_indices_is_reproducible_per_seed():
+    first = sampling.draw_indices(sampling.member_seeds(0, ["a"])[0], 100, 6, max_features=0.5,
+                                  bootstrap=True, bootstrap_features=False)
+    again = sampling.draw_indices(sampling.member_seeds(0, ["a"])[0], 100, 6, max_features=0.5,
+                                  bootstrap=True, bootstrap_features=False)
+    np.testing.assert_array_equal(first[0], again[0])
+    np.testing.assert_array_equal(first[1], again[1])
+    assert len(first[0]) == 100 and len(np.unique(first[0])) < 100
+    assert len(first[1]) == 3 and len(np.unique(first[1])) == 3
+
+
+def _bagged(models, executor="serial"):
+    return EnsembleModel("soft_voting", models=models, bootstrap=True, max_features=0.75,
+                         oob_score=True, random_state=0, executor=executor, n_jobs=2)
+
+
+def _members():
+    return {"lr": LogisticRegression(max_iter=1000), "tree": DecisionTreeClassifier(max_depth=3),
+            "stump": DecisionTreeClassifier(max_depth=1)}
+
+
+def test_bagged_fit_is_deterministic_across_runs_and_executors():
+    X, y = load_iris(return_X_y=True)
+    first = _bagged(_members()).fit(X, y)
+    threaded = _bagged(_members(), executor="thread").fit(X, y)
+
+    assert first.oob_score_ == threaded.oob_score_
+    np.testing.assert_allclose(first.oob_decision_function_, threaded.oob_decision_function_)
+    for a, b in zip(first.estimators_samples_, threaded.estimators_samples_):
+        np.testing.assert_array_equal(a, b)
+    np.testing.assert_allclose(first.predict_proba(X), threaded.predict_proba(X))
+
+
+def test_member_sample_does_not_depend_on_other_members():
+    X, y = load_iris(return_X_y=True)
+    full = _bagged(_members()).fit(X, y)
+    single = _bagged({"tree": DecisionTreeClassifier(max_depth=3)}).fit(X, y)
+
+    np.testing.assert_array_equal(full.estimators_samples_[1], single.estimators_samples_[0])
+    np.testing.assert_array_equal(full.estimators_features_[1], single.estimators_features_[0])
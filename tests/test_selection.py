@@ -0,0 +1,93 @@
+# tests/test_selection.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Ensemble selection on cached validation predictions: every greedy step
+#              adds the best member, its recorded accuracy is what the subset ensemble
+#              actually scores on the selection set, the selected subset's accuracy
+#              never drops as more steps are allowed, and backward pruning keeps a
+#              subset within tolerance.
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_digits
+from sklearn.linear_model import LogisticRegression, RidgeClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from models.ensemble_models import EnsembleModel
+from models.selection import greedy_selection, prune_by_contribution, validation_predictions
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    X, y = load_digits(return_X_y=True)
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.3, random_state=0, stratify=y)
+    models = {"lr": LogisticRegression(max_iter=2000), "tree": DecisionTreeClassifier(max_depth=5),
+              "stump": DecisionTreeClassifier(max_depth=2), "nb": GaussianNB(), "knn": KNeighborsClassifier(),
+              "ridge": RidgeClassifier()}
+    ensemble = EnsembleModel("hard_voting", models=models, random_state=0).fit(X_train, y_train)
+    return ensemble, X_val, y_val, validation_predictions(ensemble, X_val, y_val)
+
+
+def _subset_accuracy(ensemble, X, y, strategy, weights):
+    subset = ensemble.subset(list(weights), weights)
+    subset.strategy = strategy
+    return float(np.mean(subset.predict(X) == y))
+
+
+@pytest.mark.parametrize("strategy", ["hard_voting", "soft_voting"])
+def test_greedy_selection_is_monotone_on_the_selection_set(fitted, strategy):
+    ensemble, X_val, y_val, preds = fitted
+    runs = [greedy_selection(preds, strategy, max_steps=steps) for steps in range(13)]
+    best = [run["best"]["accuracy"] for run in runs]
+    history = runs[-1]["history"]
+
+    # Single steps may lose accuracy (repeats reweight the vote), the selected subset never does
+    assert all(later >= earlier for earlier, later in zip(best, best[1:]))
+    assert best[-1] > best[0]
+    assert [run["history"] for run in runs] == [history[:steps + 1] for steps in range(13)]
+    # Smallest subset reaching the top accuracy, since no latency was given
+    top = max(entry["accuracy"] for entry in history)
+    assert runs[-1]["best"] is next(entry for entry in history if entry["accuracy"] == top)
+    for entry in history:
+        assert entry["accuracy"] == pytest.approx(
+            _subset_accuracy(ensemble, X_val, y_val, strategy, entry["weights"]))
+    if strategy == "soft_voting":
+        assert "ridge" not in set().union(*(entry["members"] for entry in history))
+
+
+def test_each_greedy_step_adds_the_best_member(fitted):
+    ensemble, X_val, y_val, preds = fitted
+    history = greedy_selection(preds, "soft_voting", max_steps=4)["history"]
+    names = [name for name, ok in zip(preds.names, preds.has_proba_) if ok]
+
+    for previous, entry in zip(history, history[1:]):
+        options = []
+        for name in names:
+            weights = dict(previous["weights"])
+            weights[name] = weights.get(name, 0) + 1
+            options.append(_subset_accuracy(ensemble, X_val, y_val, "soft_voting", weights))
+        assert entry["accuracy"] == pytest.approx(max(options))
+
+
+def test_selection_without_replacement_uses_each_member_once(fitted):
+    _, _, _, preds = fitted
+    history = greedy_selection(preds, "hard_voting", with_replacement=False)["history"]
+
+    assert [entry["size"] for entry in history] == list(range(1, len(preds.names) + 1))
+    assert all(set(entry["weights"].values()) == {1} for entry in history)
+
+
+def test_pruning_keeps_a_subset_within_tolerance(fitted):
+    ensemble, X_val, y_val, preds = fitted
+    latency = {name: 1.0 + i for i, name in enumerate(preds.names)}
+    result = prune_by_contribution(preds, "hard_voting", tolerance=0.01, latency=latency)
+    history = result["history"]
+    baseline = history[0]["accuracy"]
+
+    assert [entry["size"] for entry in history] == list(range(len(preds.names), 0, -1))
+    assert baseline == pytest.approx(np.mean(ensemble.predict(X_val) == y_val))
+    assert result["best"]["accuracy"] >= baseline - 0.01
+    eligible = [entry for entry in history if entry["accuracy"] >= baseline - 0.01]
+    assert result["best"]["latency_s"] == min(entry["latency_s"] for entry in eligible)
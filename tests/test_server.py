@@ -0,0 +1,182 @@
+# tests/test_server.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: ScoringServer end to end, in process: requests over TCP (keep-alive) and a
+#              Unix socket are parsed and scored like the saved pipeline, malformed,
+#              unknown, wrong-method and oversized requests map to 400/404/405/413, and
+#              the process-worker MicroBatcher serves the same predictions.
+
+import asyncio
+import json
+import sys
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+import serving.server as server
+from models.ensemble_models import EnsembleModel
+from models.persistence import FittedPipeline
+from serving.batcher import MicroBatcher
+from serving.server import ScoringServer
+
+
+@pytest.fixture(scope="module")
+def artifact(tmp_path_factory):
+    X, y = load_iris(return_X_y=True)
+    y = np.array(["setosa", "versicolor", "virginica"])[y]
+    ensemble = EnsembleModel("soft_voting", models={"lr": LogisticRegression(max_iter=1000),
+                                                    "tree": DecisionTreeClassifier(max_depth=3)},
+                             random_state=0).fit(X, y)
+    pipeline = FittedPipeline(ensemble)
+    path = pipeline.save(str(tmp_path_factory.mktemp("artifacts") / "iris"), X, y)
+    return path, pipeline, X
+
+
+async def _request(reader, writer, method, path, payload=None, body=None, headers=()):
+    """Sends one HTTP/1.1 request and reads the response: (status, json body, headers)."""
+    if body is None:
+        body = b"" if payload is None else json.dumps(payload).encode()
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+    head += "".join(f"{header}\r\n" for header in headers) + "\r\n"
+    writer.write(head.encode() + body)
+    await writer.drain()
+    return await _response(reader)
+
+
+async def _response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"]))), headers
+
+
+def _with_server(artifact_path, scenario, unix_path=None, **batcher_args):
+    """Runs scenario(connect) against a started server and closes everything afterwards."""
+    async def main():
+        manifest = FittedPipeline.read_manifest(artifact_path)
+        batcher = MicroBatcher(artifact_path=artifact_path, max_wait_ms=1.0, **batcher_args)
+        scoring = ScoringServer(batcher, n_features=manifest["n_features_in"], classes=manifest["classes"])
+        listener = await scoring.start(port=0, unix_path=unix_path)
+        try:
+            if unix_path:
+                connect = lambda: asyncio.open_unix_connection(unix_path)
+            else:
+                connect = lambda: asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+            return await scenario(connect)
+        finally:
+            await scoring.close()
+
+    return asyncio.run(main())
+
+
+def test_requests_are_parsed_and_scored(artifact):
+    path, pipeline, X = artifact
+
+    async def scenario(connect):
+        reader, writer = await connect()
+        try:
+            # One keep-alive connection carries every request
+            responses = [
+                await _request(reader, writer, "POST", "/predict", {"instances": X[:5].tolist()}),
+                await _request(reader, writer, "POST", "/predict?verbose=1", {"instances": X[7].tolist()}),
+                await _request(reader, writer, "POST", "/predict_proba", {"instances": X[:3].tolist()}),
+                await _request(reader, writer, "GET", "/health"),
+                await _request(reader, writer, "GET", "/stats"),
+            ]
+        finally:
+            writer.close()
+        return responses
+
+    predict, single, proba, health, stats = _with_server(path, scenario)
+    assert [r[0] for r in (predict, single, proba, health, stats)] == [200] * 5
+    assert predict[1] == {"predictions": pipeline.predict(X[:5]).tolist()}
+    assert single[1] == {"predictions": pipeline.predict(X[7:8]).tolist()}
+    np.testing.assert_allclose(proba[1]["probabilities"], pipeline.predict_proba(X[:3]))
+    assert proba[1]["classes"] == ["setosa", "versicolor", "virginica"]
+    assert health[1] == {"status": "ok", "n_features": 4, "classes": proba[1]["classes"]}
+    assert predict[2]["connection"] == "keep-alive"
+    assert stats[1]["requests"] == 3
+
+
+def test_errors_map_to_status_codes(artifact, monkeypatch):
+    path, _, X = artifact
+    monkeypatch.setattr(server, "MAX_BODY_BYTES", 1024)
+
+    async def scenario(connect):
+        reader, writer = await connect()
+        statuses = [
+            await _request(reader, writer, "POST", "/predict", body=b"{not json"),
+            await _request(reader, writer, "POST", "/predict", {"rows": X[:2].tolist()}),
+            await _request(reader, writer, "POST", "/predict", {"instances": []}),
+            await _request(reader, writer, "POST", "/predict", {"instances": X[:2, :3].tolist()}),
+            await _request(reader, writer, "POST", "/score", {"instances": X[:2].tolist()}),
+            await _request(reader, writer, "GET", "/predict_proba"),
+        ]
+        # Still served on the same connection after every error above
+        statuses.append(await _request(reader, writer, "POST", "/predict", {"instances": X[:1].tolist()}))
+        writer.close()
+
+        results = [(status, body["error"] if "error" in body else None) for status, body, _ in statuses]
+        for request in (b"BROKEN\r\n\r\n",
+                        b"POST /predict HTTP/1.1\r\nContent-Length: 2048\r\n\r\n" + b"x" * 2048,
+                        b"POST /predict HTTP/1.1\r\nContent-Length: many\r\n\r\n"):
+            reader, writer = await connect()
+            writer.write(request)
+            await writer.drain()
+            status, body, headers = await _response(reader)
+            # The request could not be read to its end, so the server closes the connection
+            assert headers["connection"] == "close" and await reader.read() == b""
+            writer.close()
+            results.append((status, body["error"]))
+        return results
+
+    results = _with_server(path, scenario)
+    assert [status for status, _ in results] == [400, 400, 400, 400, 404, 405, 200, 400, 413, 400]
+    assert "Expected JSON" in results[0][1] and "Expected JSON" in results[1][1]
+    assert "non-empty" in results[2][1]
+    assert "Expected 4 features per row, got 3" in results[3][1]
+    assert "Unknown endpoint /score" in results[4][1]
+    assert "expects POST" in results[5][1]
+    assert "Malformed request line" in results[7][1]
+    assert "larger than 1024 bytes" in results[8][1]
+    assert "Content-Length" in results[9][1]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets")
+def test_unix_socket_transport(artifact, tmp_path):
+    path, pipeline, X = artifact
+
+    async def scenario(connect):
+        reader, writer = await connect()
+        response = await _request(reader, writer, "POST", "/predict", {"instances": X[:4].tolist()},
+                                  headers=["Connection: close"])
+        assert await reader.read() == b""
+        writer.close()
+        return response
+
+    status, body, headers = _with_server(path, scenario, unix_path=str(tmp_path / "scoring.sock"))
+    assert status == 200 and headers["connection"] == "close"
+    assert body == {"predictions": pipeline.predict(X[:4]).tolist()}
+
+
+def test_process_workers_serve_the_same_predictions(artifact):
+    path, pipeline, X = artifact
+
+    async def scenario(connect):
+        async def one(rows):
+            reader, writer = await connect()
+            try:
+                return await _request(reader, writer, "POST", "/predict_proba", {"instances": X[rows].tolist()})
+            finally:
+                writer.close()
+
+        return await asyncio.gather(*[one(slice(i, i + 10)) for i in range(0, 60, 10)])
+
+    responses = _with_server(path, scenario, worker_kind="process", workers=1)
+    assert [status for status, _, _ in responses] == [200] * 6
+    probabilities = np.vstack([body["probabilities"] for _, body, _ in responses])
+    np.testing.assert_allclose(probabilities, pipeline.predict_proba(X[:60]))
@@ -0,0 +1,130 @@
+# tests/test_tuning.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Member tuning: the successive-halving budget schedule, top-k survivors
+#              at each rung, warm-started survivors resuming their previous fit, seeded
+#              determinism, and experiment search spaces that only yield members usable
+#              by every voting strategy.
+
+import itertools
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+from experiments.classification.linear.bagging_linear_clf import BaggingLinearClassifierExperiment
+from models.tuning import MemberTuner
+
+
+def test_search_spaces_keep_soft_voting_members_probabilistic():
+    experiment = BaggingLinearClassifierExperiment.__new__(BaggingLinearClassifierExperiment)
+    models = experiment._define_models()
+    for name, space in experiment._search_spaces().items():
+        if not hasattr(models[name], "predict_proba") and "loss" not in space:
+            continue
+        for values in itertools.product(*space.values()):
+            model = models[name].set_params(**dict(zip(space, values)))
+            assert hasattr(model, "predict_proba"), (name, dict(zip(space, values)))
+
+
+class _Probe(BaseEstimator, ClassifierMixin):
+    """Scores best when log10(alpha) is near a target that moves with the training rows."""
+
+    def __init__(self, alpha=1.0):
+        self.alpha = alpha
+
+    def fit(self, X, y):
+        self.n_rows_ = len(X)
+        self.classes_ = np.unique(y)
+        return self
+
+    def score(self, X, y):
+        return -abs(np.log10(self.alpha) - (-4 + 2 * self.n_rows_ / 800))
+
+
+class _WarmProbe(BaseEstimator, ClassifierMixin):
+    """Counts iterations, continuing from the previous fit under warm_start."""
+
+    def __init__(self, alpha=1.0, max_iter=27, warm_start=False):
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.warm_start = warm_start
+
+    def fit(self, X, y):
+        if not (self.warm_start and hasattr(self, "iterations_")):
+            self.iterations_, self.calls_ = 0, []
+        self.iterations_ += self.max_iter
+        self.calls_.append(self.max_iter)
+        self.classes_ = np.unique(y)
+        return self
+
+    def score(self, X, y):
+        return -abs(np.log10(self.alpha) + 2)
+
+
+def _binary_data(n_samples=1000):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_samples, 4))
+    return X, (X[:, 0] + 0.5 * rng.normal(size=n_samples) > 0).astype(int)
+
+
+def _rungs(history):
+    rungs = {}
+    for record in history:
+        rungs.setdefault(record["rung"], []).append(record)
+    return [rungs[r] for r in sorted(rungs)]
+
+
+def test_schedule_grows_the_budget_by_factor_up_to_the_maximum():
+    tuner = MemberTuner({}, factor=3)
+    assert tuner._schedule(9, 30, 800) == [89, 267, 800]
+    # Fewer rungs when the budget range is too narrow for all the candidates
+    assert tuner._schedule(27, 100, 300) == [100, 300]
+    assert tuner._schedule(1, 10, 800) == [800]
+
+
+def test_halving_keeps_the_top_third_at_each_rung():
+    X, y = _binary_data()
+    space = {"alpha": list(np.logspace(-5, -1, 9))}
+    tuner = MemberTuner({"probe": space}, factor=3, random_state=0).fit({"probe": _Probe()}, X, y)
+
+    rungs = _rungs(tuner.history_)
+    assert [len(rung) for rung in rungs] == [9, 3, 1]
+    assert [{r["resource"] for r in rung} for rung in rungs] == [{89}, {267}, {800}]
+    assert tuner.resources_["probe"]["resource"] == "n_samples"
+    for previous, rung in zip(rungs, rungs[1:]):
+        top = sorted(previous, key=lambda r: -r["score"])[:len(rung)]
+        assert sorted(r["params"]["alpha"] for r in rung) == sorted(r["params"]["alpha"] for r in top)
+    assert tuner.best_params_["probe"] == rungs[-1][0]["params"]
+    assert tuner.best_estimators_["probe"].n_rows_ == 800
+
+
+def test_survivors_resume_training_under_warm_start():
+    X, y = _binary_data()
+    space = {"alpha": list(np.logspace(-5, -1, 9))}
+    tuner = MemberTuner({"probe": space}, factor=3, random_state=0).fit({"probe": _WarmProbe()}, X, y)
+
+    assert tuner.resources_["probe"] == {"resource": "max_iter", "warm_start": True,
+                                         "min_resources": 1, "max_resources": 27}
+    assert [{r["resource"] for r in rung} for rung in _rungs(tuner.history_)] == [{3}, {9}, {27}]
+    best = tuner.best_estimators_["probe"]
+    # Each rung only runs the iterations added to the budget, on top of the previous fit
+    assert best.calls_ == [3, 6, 18] and best.iterations_ == 27
+    assert tuner.best_params_["probe"] == {"alpha": 0.01}
+    assert tuner.tuned_models()["probe"].get_params()["max_iter"] == 27
+
+
+def test_search_is_deterministic_for_a_fixed_seed():
+    X, y = load_iris(return_X_y=True)
+    spaces = {"sgd": {"alpha": [1e-5, 1e-4, 1e-3, 1e-2], "loss": ["log_loss", "modified_huber"]}}
+
+    def run(executor):
+        models = {"sgd": SGDClassifier(max_iter=30, tol=None), "lr": LogisticRegression(max_iter=1000)}
+        return MemberTuner(spaces, method="hyperband", random_state=7, executor=executor, n_jobs=2).fit(models, X, y)
+
+    first, again, threaded = run("serial"), run("serial"), run("thread")
+    assert first.history_ == again.history_ == threaded.history_
+    assert first.best_params_ == again.best_params_ == threaded.best_params_
+    np.testing.assert_array_equal(first.best_estimators_["sgd"].coef_, threaded.best_estimators_["sgd"].coef_)
+    assert MemberTuner(spaces, method="hyperband", random_state=8).fit(
+        {"sgd": SGDClassifier(max_iter=30, tol=None)}, X, y).history_ != first.history_
@@ -0,0 +1,21 @@
+# tests/test_visualization.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Plot helpers: a run in which every strategy failed has no scores to
+#              chart, so nothing is submitted or drawn.
+
+import os
+
+from utils.visualization import plot_strategy_accuracies, render_strategy_accuracies
+
+
+def test_empty_strategy_scores_are_not_submitted(tmp_path, plot_mode):
+    spool_dir = tmp_path / "spool"
+    plot_mode("deferred", spool_dir=str(spool_dir))
+    assert plot_strategy_accuracies({}) is None
+    assert not spool_dir.exists() or os.listdir(spool_dir) == []
+
+
+def test_render_empty_strategy_scores_draws_nothing(tmp_path):
+    path = tmp_path / "scores.png"
+    render_strategy_accuracies(str(path), {})
+    assert not path.exists()
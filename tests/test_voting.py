@@ -0,0 +1,125 @@
+# tests/test_voting.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Vectorized combination engine against reference NumPy/SciPy results:
+#              hard voting against the per-row np.bincount baseline, soft voting with
+#              members that saw different classes, regression combiners (mean, median,
+#              trimmed mean) and the one-off warning for trims that collapse to the mean
+#              or median.
+
+import warnings
+
+import numpy as np
+import pytest
+from scipy import stats
+from sklearn.linear_model import Ridge
+
+from models.ensemble_models import EnsembleModel
+from models.voting import check_trim, combine_values, hard_vote, soft_vote
+
+
+def _bincount_vote(predictions, classes, weights=None):
+    """The original per-row loop: np.bincount(...).argmax() over encoded labels."""
+    codes = np.searchsorted(classes, predictions)
+    return np.array([classes[np.bincount(codes[:, i], weights=weights, minlength=len(classes)).argmax()]
+                     for i in range(predictions.shape[1])])
+
+
+@pytest.mark.parametrize("n_models", [2, 3, 4, 7])
+def test_hard_vote_matches_bincount_baseline(n_models):
+    classes = np.array(["setosa", "versicolor", "virginica"])
+    predictions = np.random.default_rng(n_models).choice(classes, size=(n_models, 500))
+    # Even member counts produce ties, which both must break toward the first class
+    np.testing.assert_array_equal(hard_vote(predictions, classes), _bincount_vote(predictions, classes))
+
+
+def test_weighted_hard_vote_matches_bincount_baseline():
+    classes = np.array([0, 1, 2, 3])
+    predictions = np.random.default_rng(1).integers(0, 4, size=(5, 500))
+    weights = np.array([0.5, 2.0, 1.0, 1.0, 0.25])
+    np.testing.assert_array_equal(hard_vote(predictions, classes, weights),
+                                  _bincount_vote(predictions, classes, weights))
+
+
+def test_soft_vote_aligns_member_classes():
+    classes = np.array([0, 1, 2])
+    full = np.array([[0.2, 0.5, 0.3], [0.6, 0.3, 0.1]])
+    # This member never saw class 1, so its columns are (0, 2)
+    partial = np.array([[0.9, 0.1], [0.4, 0.6]])
+    expected = (full + np.array([[0.9, 0.0, 0.1], [0.4, 0.0, 0.6]])) / 2
+    np.testing.assert_allclose(soft_vote([full, partial], [classes, np.array([0, 2])], classes), expected)
+    np.testing.assert_allclose(soft_vote([full, partial], [classes, np.array([0, 2])], classes, [3.0, 1.0]),
+                               (3 * full + np.array([[0.9, 0.0, 0.1], [0.4, 0.0, 0.6]])) / 4)
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).normal(size=(7, 50))
+
+
+def test_averaging_matches_numpy(values):
+    np.testing.assert_allclose(combine_values(values, "averaging"), values.mean(axis=0))
+    weights = np.arange(1.0, 8.0)
+    np.testing.assert_allclose(combine_values(values, "averaging", weights=weights),
+                               np.average(values, axis=0, weights=weights))
+
+
+def test_median_matches_numpy(values):
+    np.testing.assert_allclose(combine_values(values, "median"), np.median(values, axis=0))
+    np.testing.assert_allclose(combine_values(values[:6], "median"), np.median(values[:6], axis=0))
+
+
+@pytest.mark.parametrize("n_models, trim", [(5, 0.2), (7, 0.2), (7, 0.3), (10, 0.25)])
+def test_trimmed_mean_matches_scipy(n_models, trim):
+    rng = np.random.default_rng(n_models)
+    subset = rng.normal(size=(n_models, 50))
+    np.testing.assert_allclose(combine_values(subset, "trimmed_mean", trim=trim),
+                               stats.trim_mean(subset, trim, axis=0))
+
+
+def test_trimmed_mean_differs_from_mean_and_median_for_five_members():
+    # The regression experiments bag five members with trim 0.2
+    subset = np.random.default_rng(1).normal(size=(5, 50))
+    trimmed = combine_values(subset, "trimmed_mean", trim=0.2)
+    assert not np.allclose(trimmed, subset.mean(axis=0))
+    assert not np.allclose(trimmed, np.median(subset, axis=0))
+
+
+@pytest.mark.parametrize("n_models, trim, collapses_to", [
+    (3, 0.25, "averaging"),
+    (4, 0.25, "median"),
+    (5, 0.4, "median"),
+])
+def test_degenerate_trim_warns(n_models, trim, collapses_to):
+    subset = np.random.default_rng(2).normal(size=(n_models, 20))
+    with pytest.warns(UserWarning, match="trimmed_mean equals"):
+        check_trim(trim, n_models)
+    np.testing.assert_allclose(combine_values(subset.copy(), "trimmed_mean", trim=trim),
+                               combine_values(subset, collapses_to))
+
+
+def test_effective_trim_does_not_warn():
+    subset = np.random.default_rng(3).normal(size=(5, 20))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert check_trim(0.2, 5) == 1
+        # The per-batch kernel never warns, even for a degenerate trim
+        combine_values(subset, "trimmed_mean", trim=0.1)
+
+
+def test_ensemble_warns_about_a_degenerate_trim_once():
+    X = np.random.default_rng(4).normal(size=(300, 3))
+    y = X @ np.array([1.0, 2.0, 3.0])
+    models = {name: Ridge(alpha=alpha) for name, alpha in (("a", 0.1), ("b", 1.0), ("c", 10.0), ("d", 100.0))}
+    ensemble = EnsembleModel("trimmed_mean", models=models, trim=0.1)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        ensemble.fit(X, y)
+        ensemble.predict(X)
+        list(ensemble.predict_iter(X, batch_size=50))
+    assert [str(w.message) for w in caught] == [
+        "trim=0.1 removes no member out of 4; trimmed_mean equals averaging."]
+
+
+def test_out_of_range_trim_is_rejected_before_fitting():
+    with pytest.raises(ValueError, match="trim must be in"):
+        EnsembleModel("trimmed_mean", models={"a": Ridge()}, trim=0.5).fit(np.eye(3), np.arange(3.0))
@@ -2,10 +2,218 @@
 # Authors: David Blodgett and Microsoft Copilot
 # Description: Evaluation utilities for classification and regression models,
 #              including metrics computation and optional console printing.
+#              Labels are encoded once and the confusion matrix is built with a single
+#              bincount; accuracy, precision/recall/F1 and the text report are all
+#              derived from it, and the report is only formatted when requested.
+#              evaluate_many() scores a stack of prediction vectors (strategies x
+#              folds x seeds) in one pass; RegressionAccumulator scores regression
+#              output chunk by chunk.
 
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+import numpy as np
 
-def evaluate_classification(y_true, y_pred, verbose=True):
+REPORT_HEADERS = ("precision", "recall", "f1-score", "support")
+
+
+def _labels(y_true, y_pred, labels=None):
+    if labels is not None:
+        return np.asarray(labels)
+    return np.unique(np.concatenate([np.unique(np.asarray(y_true)), np.unique(np.asarray(y_pred))]))
+
+
+def _encode(values, labels):
+    """Positions of values in the sorted labels array (ValueError for unknown labels)."""
+    values = np.asarray(values)
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    pos = np.clip(np.searchsorted(sorted_labels, values), 0, len(labels) - 1)
+    if not np.array_equal(sorted_labels[pos], values):
+        unknown = np.unique(values[sorted_labels[pos] != values])
+        raise ValueError(f"Labels not in the label set: {unknown[:10].tolist()}")
+    return order[pos]
+
+
+def compute_confusion_matrix(y_true, y_pred, labels=None):
+    """
+    Confusion matrix from one vectorized count (rows: true, columns: predicted).
+
+    Parameters:
+    y_true (array-like): Ground truth labels
+    y_pred (array-like): Predicted labels
+    labels (array-like): Label order (default: sorted union of both)
+
+    Returns:
+    tuple: (confusion_matrix: ndarray, labels: ndarray)
+    """
+    labels = _labels(y_true, y_pred, labels)
+    k = len(labels)
+    codes = _encode(y_true, labels) * k + _encode(y_pred, labels)
+    return np.bincount(codes, minlength=k * k).reshape(k, k), labels
+
+
+def _safe_divide(numerator, denominator):
+    # Undefined precision/recall (no predictions / no support) count as 0, like sklearn's default
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), 0.0)
+
+
+def _scores(cm):
+    """Per-class precision, recall, F1 and support of (..., k, k) confusion matrices."""
+    tp = np.diagonal(cm, axis1=-2, axis2=-1).astype(np.float64)
+    predicted = cm.sum(axis=-2)
+    support = cm.sum(axis=-1)
+    precision = _safe_divide(tp, predicted)
+    recall = _safe_divide(tp, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    return precision, recall, f1, support
+
+
+class ClassificationMetrics:
+    """
+    Metrics derived from a single confusion matrix. The text report is only
+    built when report() is called, and then cached.
+    """
+
+    def __init__(self, cm, labels):
+        self.confusion_matrix = np.asarray(cm)
+        self.labels = np.asarray(labels)
+        self.precision, self.recall, self.f1, self.support = _scores(self.confusion_matrix)
+        self._report = {}
+
+    @property
+    def n_samples(self):
+        return int(self.support.sum())
+
+    @property
+    def accuracy(self):
+        return float(np.trace(self.confusion_matrix) / max(self.n_samples, 1))
+
+    def average(self, kind="macro"):
+        """(precision, recall, f1) averaged 'macro' (unweighted) or 'weighted' (by support)."""
+        if kind == "macro":
+            weights = np.ones(len(self.labels))
+        elif kind == "weighted":
+            weights = self.support.astype(np.float64)
+        else:
+            raise ValueError(f"Unknown average '{kind}'. Options: ('macro', 'weighted')")
+        total = weights.sum() or 1.0
+        return tuple(float(np.dot(weights, values) / total)
+                     for values in (self.precision, self.recall, self.f1))
+
+    def as_dict(self):
+        """Same layout as sklearn's classification_report(output_dict=True)."""
+        result = {str(label): dict(zip(REPORT_HEADERS, (float(p), float(r), float(f), float(s))))
+                  for label, p, r, f, s in zip(self.labels, self.precision, self.recall, self.f1, self.support)}
+        result["accuracy"] = self.accuracy
+        for kind in ("macro", "weighted"):
+            result[f"{kind} avg"] = dict(zip(REPORT_HEADERS, (*self.average(kind), float(self.n_samples))))
+        return result
+
+    def report(self, digits=2):
+        """Text report in sklearn's classification_report format."""
+        if digits in self._report:
+            return self._report[digits]
+        names = [str(label) for label in self.labels]
+        width = max(max(len(name) for name in names), len("weighted avg"), digits)
+        row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+        text = ("{:>{width}s} " + " {:>9}" * len(REPORT_HEADERS)).format("", *REPORT_HEADERS, width=width)
+        text += "\n\n"
+        for row in zip(names, self.precision, self.recall, self.f1, self.support):
+            text += row_fmt.format(*row, width=width, digits=digits)
+        text += "\n"
+        text += ("{:>{width}s} " + " {:>9.{digits}}" * 2 + " {:>9.{digits}f}" + " {:>9}\n").format(
+            "accuracy", "", "", self.accuracy, self.n_samples, width=width, digits=digits)
+        for kind in ("macro", "weighted"):
+            text += row_fmt.format(f"{kind} avg", *self.average(kind), self.n_samples, width=width, digits=digits)
+        self._report[digits] = text
+        return text
+
+
+class MetricsBatch:
+    """
+    Confusion matrices of many prediction vectors, shape (n_vectors, n_folds, k, k),
+    with vectorized accuracy / F1 and per-vector ClassificationMetrics on demand.
+    """
+
+    def __init__(self, cms, labels, keys=None):
+        self.confusion_matrices = cms
+        self.labels = labels
+        self.keys = list(range(cms.shape[0])) if keys is None else list(keys)
+
+    @property
+    def n_folds(self):
+        return self.confusion_matrices.shape[1]
+
+    def fold_accuracy(self):
+        """(n_vectors, n_folds) accuracy of every vector on every fold."""
+        cms = self.confusion_matrices
+        correct = np.trace(cms, axis1=-2, axis2=-1)
+        return _safe_divide(correct, cms.sum(axis=(-2, -1)))
+
+    def accuracy(self):
+        """(n_vectors,) pooled accuracy over all folds."""
+        cms = self.confusion_matrices.sum(axis=1)
+        return _safe_divide(np.trace(cms, axis1=-2, axis2=-1), cms.sum(axis=(-2, -1)))
+
+    def macro_f1(self):
+        """(n_vectors,) pooled macro-averaged F1."""
+        return _scores(self.confusion_matrices.sum(axis=1))[2].mean(axis=-1)
+
+    def metrics(self, key, fold=None):
+        """ClassificationMetrics of one vector, pooled over folds unless fold is given."""
+        cms = self.confusion_matrices[self.keys.index(key)]
+        return ClassificationMetrics(cms.sum(axis=0) if fold is None else cms[fold], self.labels)
+
+    def __getitem__(self, key):
+        return self.metrics(key)
+
+
+def evaluate_many(y_true, predictions, folds=None, labels=None):
+    """
+    Scores many prediction vectors against the same labels with one bincount.
+
+    Parameters:
+    y_true (array-like): Ground truth labels, shape (n_samples,)
+    predictions (array-like or dict): (n_vectors, n_samples) predictions, or
+        {key: predictions} for named vectors (e.g. (strategy, seed) tuples)
+    folds (array-like): Optional fold id per sample; metrics are kept per fold
+    labels (array-like): Label order (default: sorted union of all labels)
+
+    Returns:
+    MetricsBatch
+    """
+    keys = None
+    if isinstance(predictions, dict):
+        keys = list(predictions.keys())
+        predictions = [predictions[key] for key in keys]
+    y_pred = np.asarray(predictions)
+    if y_pred.ndim == 1:
+        y_pred = y_pred[None, :]
+    y_true = np.asarray(y_true)
+    labels = _labels(y_true, y_pred.ravel(), labels)
+    k = len(labels)
+    n_vectors, n_samples = y_pred.shape
+
+    folds = np.zeros(n_samples, dtype=np.intp) if folds is None else np.asarray(folds, dtype=np.intp)
+    n_folds = int(folds.max()) + 1 if n_samples else 1
+    # Per-sample part of the flat index is shared by all vectors
+    base = (folds * k + _encode(y_true, labels)) * k
+    offsets = (np.arange(n_vectors, dtype=np.intp) * (n_folds * k * k))[:, None]
+    codes = offsets + base[None, :] + _encode(y_pred.ravel(), labels).reshape(n_vectors, n_samples)
+    cms = np.bincount(codes.ravel(), minlength=n_vectors * n_folds * k * k)
+    return MetricsBatch(cms.reshape(n_vectors, n_folds, k, k), labels, keys)
+
+
+def evaluate(y_true, y_pred, labels=None):
+    """
+    Single-pass classification metrics; call .report() for the text report.
+
+    Returns:
+    ClassificationMetrics
+    """
+    return ClassificationMetrics(*compute_confusion_matrix(y_true, y_pred, labels))
+
+
+def evaluate_classification(y_true, y_pred, verbose=True, report=True):
     """
     Computes accuracy, confusion matrix, and classification report.
 
@@ -13,17 +221,126 @@ def evaluate_classification(y_true, y_pred, verbose=True):
     y_true (array-like): Ground truth labels
     y_pred (array-like): Predicted labels
     verbose (bool): If True, prints results to console
+    report (bool): If False, the text report is skipped (returned as None)
 
     Returns:
     tuple: (accuracy: float, confusion_matrix: ndarray, report: str)
     """
-    acc = accuracy_score(y_true, y_pred)
-    cm = confusion_matrix(y_true, y_pred)
-    report = classification_report(y_true, y_pred)
+    metrics = evaluate(y_true, y_pred)
+    acc, cm = metrics.accuracy, metrics.confusion_matrix
+    text = metrics.report() if report or verbose else None
 
     if verbose:
         print(f"Accuracy: {acc:.4f}")
         print("Confusion Matrix:\n", cm)
-        print("\nClassification Report:\n", report)
+        print("\nClassification Report:\n", text)
+
+    return acc, cm, text if report else None
+
+
+def evaluate_regression(y_true, y_pred, verbose=False):
+    """
+    MSE, RMSE, MAE and R^2 from one pass over the residuals. y_pred may be a
+    (n_vectors, n_samples) stack, in which case every metric is an array.
+
+    Parameters:
+    y_true (array-like): Ground truth targets
+    y_pred (array-like): Predicted targets
+    verbose (bool): If True, prints results to console
 
-    return acc, cm, report
+    Returns:
+    dict: mse, rmse, mae, r2
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    residual = y_pred - y_true
+    mse = np.mean(residual ** 2, axis=-1)
+    variance = np.var(y_true)
+    metrics = {
+        "mse": mse,
+        "rmse": np.sqrt(mse),
+        "mae": np.mean(np.abs(residual), axis=-1),
+        "r2": 1.0 - mse / variance if variance > 0 else np.zeros_like(mse),
+    }
+    if y_pred.ndim == 1:
+        metrics = {name: float(value) for name, value in metrics.items()}
+
+    if verbose:
+        print("  ".join(f"{name.upper()}: {value:.4f}" for name, value in metrics.items()))
+    return metrics
+
+
+class RegressionAccumulator:
+    """
+    Streaming MSE/RMSE/MAE/R^2: update() with one chunk of targets and
+    predictions at a time, so predictions are never held in memory at once.
+    The target variance is merged chunk by chunk (Chan et al.) to stay stable
+    on large-offset targets.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.squared_error = 0.0
+        self.absolute_error = 0.0
+
+    def update(self, y_true, y_pred):
+        y_true = np.asarray(y_true, dtype=np.float64).ravel()
+        residual = np.asarray(y_pred, dtype=np.float64).ravel() - y_true
+        n_chunk = len(y_true)
+        if not n_chunk:
+            return self
+        chunk_mean = float(y_true.mean())
+        chunk_m2 = float(np.sum((y_true - chunk_mean) ** 2))
+        total = self.n + n_chunk
+        delta = chunk_mean - self.mean
+        self.m2 += chunk_m2 + delta ** 2 * self.n * n_chunk / total
+        self.mean += delta * n_chunk / total
+        self.n = total
+        self.squared_error += float(np.dot(residual, residual))
+        self.absolute_error += float(np.abs(residual).sum())
+        return self
+
+    def merge(self, other):
+        """Combines the totals of another accumulator (e.g. from a parallel worker)."""
+        if other.n:
+            total = self.n + other.n
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta ** 2 * self.n * other.n / total
+            self.mean += delta * other.n / total
+            self.n = total
+            self.squared_error += other.squared_error
+            self.absolute_error += other.absolute_error
+        return self
+
+    def result(self):
+        """dict: n, mse, rmse, mae, r2 (same keys as evaluate_regression plus n)."""
+        n = max(self.n, 1)
+        mse = self.squared_error / n
+        return {
+            "n": self.n,
+            "mse": mse,
+            "rmse": float(np.sqrt(mse)),
+            "mae": self.absolute_error / n,
+            "r2": 1.0 - self.squared_error / self.m2 if self.m2 > 0 else 0.0,
+        }
+
+
+def evaluate_regression_stream(model, X, y, batch_size=65536):
+    """
+    Scores an EnsembleModel (or BoostedEnsemble) chunk by chunk through predict_iter.
+
+    Parameters:
+    model (EnsembleModel): Fitted regression ensemble (anything with predict_iter)
+    X (array-like): Features (array, DataFrame or memmap)
+    y (array-like): Targets
+    batch_size (int): Rows per chunk
+
+    Returns:
+    dict: n, mse, rmse, mae, r2
+    """
+    accumulator = RegressionAccumulator()
+    for rows, y_pred in model.predict_iter(X, batch_size=batch_size):
+        accumulator.update(y[rows], y_pred)
+    return accumulator.result()
@@ -0,0 +1,232 @@
+# utils/instrumentation.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Lightweight timing/memory instrumentation. span() and @instrument record
+#              wall time, CPU time and peak traced memory per named block and emit
+#              structured records to pluggable sinks. Disabled by default, in which case
+#              a span is a shared no-op object and decorated calls go straight through.
+#
+# tracemalloc keeps a single process-wide peak, so a span only tracks memory when every
+# span already tracking it is open on the same thread (properly nested). Spans that
+# overlap with another thread's traced span (thread-pool fits) report peak_mem_mb=None,
+# and the enclosing span's peak includes the other threads' allocations.
+#
+# Enable from code with enable_instrumentation(...) or from the shell with
+#     ENSEMBLE_TRACE=path/to/spans.jsonl python mainworkflow.py
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+
+class _State:
+    enabled = False
+    trace_memory = False
+    sinks = []
+    # Open spans tracking memory, across all threads
+    memory_spans = 0
+
+
+_STATE = _State()
+_LOCAL = threading.local()
+_MEMORY_LOCK = threading.Lock()
+
+
+# === Sinks ===
+
+class ListSink:
+    """Keeps records in memory (handy for notebooks and comparisons)."""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+
+class JsonlSink:
+    """Appends one JSON object per span to a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+class LoggerSink:
+    """Writes each record as a JSON string to the shared ensemble logger."""
+
+    def __init__(self, logger_name="ensemble_logger", level=logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def __call__(self, record):
+        self.logger.log(self.level, "span " + json.dumps(record, default=str))
+
+
+def enable_instrumentation(*sinks, trace_memory=True):
+    """
+    Turns instrumentation on.
+
+    Parameters:
+        *sinks: Callables receiving each record dict; defaults to a new ListSink
+        trace_memory (bool): Track peak Python/NumPy allocations with tracemalloc
+                             (adds allocation overhead while enabled)
+
+    Returns:
+        list: The active sinks (the default ListSink exposes .records)
+    """
+    _STATE.sinks = list(sinks) or [ListSink()]
+    _STATE.trace_memory = trace_memory
+    _STATE.memory_spans = 0
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _STATE.enabled = True
+    return _STATE.sinks
+
+
+def disable_instrumentation():
+    """Turns instrumentation off and stops memory tracing."""
+    _STATE.enabled = False
+    if _STATE.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _STATE.trace_memory = False
+    _STATE.sinks = []
+
+
+def is_enabled():
+    return _STATE.enabled
+
+
+# === Spans ===
+
+class _NullSpan:
+    """Returned by span() while disabled: entering/exiting does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attaches attributes discovered inside the block (e.g. row counts)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = getattr(_LOCAL, "stack", None)
+        if stack is None:
+            stack = _LOCAL.stack = []
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        self.child_peak = 0
+        self.mem_start = None
+        if _STATE.trace_memory and tracemalloc.is_tracing():
+            with _MEMORY_LOCK:
+                own = sum(1 for s in stack if s.mem_start is not None)
+                # Another thread's span is tracking: resetting the peak would corrupt it
+                if _STATE.memory_spans == own:
+                    current, peak = tracemalloc.get_traced_memory()
+                    # Resetting the peak hides the parent's peak so far; remember it there
+                    if stack:
+                        stack[-1].child_peak = max(stack[-1].child_peak, peak)
+                    tracemalloc.reset_peak()
+                    self.mem_start = current
+                    _STATE.memory_spans += 1
+        stack.append(self)
+        self.start_time = time.time()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        stack = _LOCAL.stack
+        stack.pop()
+
+        peak_mb = None
+        if self.mem_start is not None:
+            with _MEMORY_LOCK:
+                _STATE.memory_spans = max(_STATE.memory_spans - 1, 0)
+                if tracemalloc.is_tracing():
+                    _, peak = tracemalloc.get_traced_memory()
+                    peak = max(peak, self.child_peak)
+                    peak_mb = max(peak - self.mem_start, 0) / 1024 ** 2
+                    if stack:
+                        stack[-1].child_peak = max(stack[-1].child_peak, peak)
+
+        record = {
+            "name": self.name,
+            "start": self.start_time,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "peak_mem_mb": peak_mb,
+            "depth": self.depth,
+            "parent": self.parent,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "error": None if exc_type is None else exc_type.__name__,
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        for sink in _STATE.sinks:
+            sink(record)
+        return False
+
+
+def span(name, **attrs):
+    """
+    Context manager timing a block:
+
+        with span("dr.fit", n_components=2):
+            ...
+
+    Returns a shared no-op object when instrumentation is disabled.
+    """
+    if not _STATE.enabled:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def instrument(name=None):
+    """
+    Decorator recording a span around every call of the function. The span
+    name defaults to module.qualname.
+    """
+    def decorator(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _STATE.enabled:
+                return fn(*args, **kwargs)
+            with _Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+if os.environ.get("ENSEMBLE_TRACE"):
+    enable_instrumentation(JsonlSink(os.environ["ENSEMBLE_TRACE"]))
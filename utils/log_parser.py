@@ -2,54 +2,207 @@
 # Authors: David Blodgett and Microsoft Copilot
 # Description: Parses experiment log files and summarizes key info like accuracy,
 #              errors, and timestamps for quick reviews across runs.
+#              Summaries are cached in an index (size/mtime/offset per file), so only
+#              new or grown files are parsed, in parallel, on each call. Structured
+#              run_*.jsonl records are read directly; legacy .log text is regex-scanned.
 
+import json
 import os
 import re
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from config import LOGS_DIR
 
+INDEX_FILENAME = ".summary_index.json"
+INDEX_VERSION = 1
+# Below this many files to parse, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 8
+
+TIMESTAMP_RE = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
+ACCURACY_RE = re.compile(r"accuracy[:\s]+([0-9.]+)")
+STRATEGY_RE = re.compile(r"Running strategy: (\w+)")
+
+
+def _new_summary(filepath):
+    return {"file": os.path.basename(filepath), "timestamp": None, "accuracy": None,
+            "error": None, "strategies": {}, "_strategy": None}
+
+
+def _parse_log_lines(summary, lines):
+    """Folds legacy text log lines into a summary (resumable across calls)."""
+    for line in lines:
+        if not summary["timestamp"]:
+            match = TIMESTAMP_RE.search(line)
+            if match:
+                summary["timestamp"] = match.group(1)
+
+        strategy_match = STRATEGY_RE.search(line)
+        if strategy_match:
+            summary["_strategy"] = strategy_match.group(1)
+
+        if "accuracy" in line.lower():
+            acc_match = ACCURACY_RE.search(line.lower())
+            if acc_match:
+                try:
+                    value = float(acc_match.group(1))
+                except ValueError:
+                    value = None
+                if value is not None:
+                    summary["accuracy"] = value
+                    # Only the final test accuracy counts per strategy, not OOB lines
+                    if summary["_strategy"] and "model accuracy" in line.lower():
+                        summary["strategies"].setdefault(summary["_strategy"], {})["accuracy"] = value
+
+        if "ERROR" in line or "Exception" in line:
+            summary["error"] = line.strip()
+    return summary
+
+
+def _parse_jsonl_lines(summary, lines):
+    """Folds structured run records into a summary."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not summary["timestamp"] and record.get("ts"):
+            summary["timestamp"] = record["ts"].replace("T", " ")[:19]
+        summary.setdefault("run_id", record.get("run_id"))
+        for key in ("experiment", "dataset"):
+            if record.get(key) is not None:
+                summary[key] = record[key]
+        kind = record.get("kind")
+        if kind == "metric":
+            strategy = record.get("strategy") or "_run"
+            summary["strategies"].setdefault(strategy, {})[record["metric"]] = record["value"]
+            if record["metric"] == "accuracy":
+                summary["accuracy"] = record["value"]
+        elif kind == "error":
+            summary["error"] = record.get("message")
+    return summary
+
+
+def _read_new_lines(filepath, offset):
+    """
+    Reads complete lines after `offset`. A trailing partial line (a writer
+    mid-append) is left for the next call.
+
+    Returns:
+    tuple: (lines, new_offset)
+    """
+    with open(filepath, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    text = data[:end].decode("utf-8", errors="replace")
+    return text.splitlines(), offset + end
+
+
+def _parse_incremental(filepath, summary=None, offset=0):
+    """Parses a file from `offset`, continuing `summary` if given."""
+    summary = summary or _new_summary(filepath)
+    lines, offset = _read_new_lines(filepath, offset)
+    if filepath.endswith(".jsonl"):
+        _parse_jsonl_lines(summary, lines)
+    else:
+        _parse_log_lines(summary, lines)
+    return summary, offset
+
+
+def _parse_job(job):
+    filepath, summary, offset = job
+    summary, offset = _parse_incremental(filepath, summary, offset)
+    return filepath, summary, offset
+
+
 def parse_log_file(filepath):
     """
     Parses a single log file and extracts relevant summary metrics.
 
     Parameters:
-    filepath (str): Full path to the log file
+    filepath (str): Full path to the log file (.log text or .jsonl run records)
 
     Returns:
-    dict: Summary with timestamp, accuracy (if found), and any error messages
+    dict: Summary with timestamp, accuracy (if found), per-strategy metrics and any error messages
     """
-    summary = {"file": os.path.basename(filepath), "timestamp": None, "accuracy": None, "error": None}
+    summary, _ = _parse_incremental(filepath)
+    return _public(summary)
 
-    with open(filepath, "r") as f:
-        for line in f:
-            if not summary["timestamp"]:
-                match = re.search(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})", line)
-                if match:
-                    summary["timestamp"] = match.group(1)
 
-            if "accuracy" in line.lower():
-                acc_match = re.search(r"accuracy[:\s]+([0-9.]+)", line.lower())
-                if acc_match:
-                    summary["accuracy"] = float(acc_match.group(1))
+def _public(summary):
+    return {k: v for k, v in summary.items() if not k.startswith("_")}
 
-            if "ERROR" in line or "Exception" in line:
-                summary["error"] = line.strip()
 
-    return summary
+def _load_index(index_path):
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return index.get("files", {}) if index.get("version") == INDEX_VERSION else {}
+
 
-def summarize_all_logs():
+def _save_index(index_path, files):
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": INDEX_VERSION, "files": files}, f)
+    os.replace(tmp_path, index_path)
+
+
+def summarize_all_logs(logs_dir=None, use_index=True, workers=None):
     """
-    Summarizes all log files found in the LOGS_DIR.
+    Summarizes all log files (.log and run_*.jsonl) found in the LOGS_DIR.
+
+    Files whose size and mtime match the index are not reopened; files that
+    only grew are parsed from their last offset; new or rewritten files are
+    parsed from the start. Many changed files are parsed in a process pool.
+
+    Parameters:
+    logs_dir (str): Directory to scan, defaults to LOGS_DIR
+    use_index (bool): Reuse and update the summary index
+    workers (int): Process pool size for parsing (None = CPU count)
 
     Returns:
     list: Sorted summaries by timestamp
     """
-    summaries = []
-    for fname in os.listdir(LOGS_DIR):
-        if fname.endswith(".log"):
-            path = os.path.join(LOGS_DIR, fname)
-            summaries.append(parse_log_file(path))
+    logs_dir = logs_dir or LOGS_DIR
+    if not os.path.isdir(logs_dir):
+        return []
+    index_path = os.path.join(logs_dir, INDEX_FILENAME)
+    index = _load_index(index_path) if use_index else {}
+
+    entries, jobs = {}, []
+    with os.scandir(logs_dir) as scan:
+        for entry in scan:
+            if not entry.name.endswith((".log", ".jsonl")) or not entry.is_file():
+                continue
+            stat = entry.stat()
+            cached = index.get(entry.name)
+            entries[entry.name] = (entry.path, stat)
+            if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            if cached and stat.st_size > cached["size"] and cached["offset"] <= stat.st_size:
+                jobs.append((entry.path, cached["summary"], cached["offset"]))
+            else:
+                jobs.append((entry.path, None, 0))
+
+    if len(jobs) >= PARALLEL_MIN_FILES and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(_parse_job, jobs, chunksize=max(1, len(jobs) // 64)))
+    else:
+        parsed = [_parse_job(job) for job in jobs]
+
+    files = {name: index[name] for name in entries if name in index}
+    for filepath, summary, offset in parsed:
+        stat = entries[os.path.basename(filepath)][1]
+        files[os.path.basename(filepath)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                             "offset": offset, "summary": summary}
+    if use_index and (parsed or len(files) != len(index)):
+        _save_index(index_path, files)
 
+    summaries = [_public(files[name]["summary"]) for name in entries]
     summaries = sorted(summaries, key=lambda x: x["timestamp"] or "")
     return summaries
 
@@ -66,6 +219,9 @@ def print_summary_table(summaries):
         acc_display = f"{entry['accuracy']:.4f}" if entry["accuracy"] is not None else "N/A"
         error_display = entry["error"] if entry["error"] else ""
         print(f"{entry['timestamp']} | {entry['file']} | Accuracy: {acc_display} {error_display}")
+        for strategy, metrics in entry.get("strategies", {}).items():
+            metric_display = ", ".join(f"{k}: {v:.4f}" for k, v in metrics.items())
+            print(f"    {strategy}: {metric_display}")
     print("-" * 60)
 
 if __name__ == "__main__":
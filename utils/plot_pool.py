@@ -0,0 +1,222 @@
+# utils/plot_pool.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Background plot rendering. Plot functions hand a job (renderer, output
+#              path, plot data) to the active PlotPool instead of drawing inline:
+#                'sync'     - render immediately in this process (original behaviour)
+#                'async'    - queue to a spawned worker pool using the Agg backend and
+#                             return at once; flush_plots() waits for the queue
+#                'deferred' - pickle the job to a spool directory; render_deferred()
+#                             (or python -m utils.plot_pool) draws them later
+#                'off'      - drop plot jobs (batch sweeps)
+#
+# Select the mode with set_plot_mode(...) or the ENSEMBLE_PLOTS environment variable.
+
+import atexit
+import glob
+import itertools
+import os
+import pickle
+import threading
+
+from config import PLOTS_DIR, logger
+
+PLOT_MODES = ("sync", "async", "deferred", "off")
+DEFAULT_SPOOL_DIR = os.path.join(PLOTS_DIR, ".deferred")
+
+
+def default_workers():
+    """
+    Each render worker pays a one-off matplotlib/seaborn import (~1 s), so
+    use at most two and leave one CPU for the experiment itself.
+    """
+    return max(1, min(2, (os.cpu_count() or 1) - 1))
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _render(renderer, path, data):
+    """Runs one plot job; renderers draw with pyplot and save to `path`."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    renderer(path, **data)
+    return path
+
+
+class PlotPool:
+    """
+    Dispatches plot jobs according to `mode`. Async jobs run in worker
+    processes, so the plot data must be picklable and the renderer a
+    module-level function.
+    """
+
+    def __init__(self, mode="async", max_workers=None, spool_dir=None):
+        """
+        Parameters:
+            mode (str): 'sync', 'async', 'deferred' or 'off'
+            max_workers (int): Render processes for 'async'; defaults to
+                               default_workers()
+            spool_dir (str): Where 'deferred' jobs are written
+        """
+        if mode not in PLOT_MODES:
+            raise ValueError(f"Unknown plot mode '{mode}'. Options: {PLOT_MODES}")
+        self.mode = mode
+        self.max_workers = max_workers or default_workers()
+        self.spool_dir = spool_dir or DEFAULT_SPOOL_DIR
+        self._executor = None
+        self._pending = []
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def _pool(self):
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: workers never inherit the parent's threads or GUI backend
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker)
+        return self._executor
+
+    def submit(self, renderer, path, description="plot", **data):
+        """
+        Hands one plot job to the pool.
+
+        Parameters:
+            renderer (callable): Module-level function renderer(path, **data)
+            path (str): Output image path
+            description (str): Used in the progress message
+            **data: Plot data passed to the renderer
+
+        Returns:
+            Future for 'async', the path for 'sync'/'deferred', None for 'off'
+        """
+        if self.mode == "off":
+            return None
+        if self.mode == "sync":
+            _render(renderer, path, data)
+            print(f" Saved {description} to: {path}")
+            return path
+        if self.mode == "deferred":
+            os.makedirs(self.spool_dir, exist_ok=True)
+            job_path = os.path.join(self.spool_dir, f"{os.getpid()}_{next(self._counter):06d}.pkl")
+            tmp_path = job_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump((renderer, os.path.abspath(path), data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, job_path)
+            print(f" Deferred {description}: {path}")
+            return path
+
+        future = self._pool().submit(_render, renderer, os.path.abspath(path), data)
+        with self._lock:
+            self._pending.append((description, path, future))
+        print(f" Queued {description}: {path}")
+        return future
+
+    def flush(self, timeout=None):
+        """
+        Waits for queued async jobs. Failed jobs are logged, not raised.
+
+        Returns:
+            list: Paths rendered since the last flush
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        rendered = []
+        for description, path, future in pending:
+            try:
+                future.result(timeout=timeout)
+                rendered.append(path)
+            except Exception as e:
+                logger.error(f"Rendering {description} ({path}) failed: {e}")
+        if pending:
+            print(f" Rendered {len(rendered)}/{len(pending)} queued plots")
+        return rendered
+
+    def close(self):
+        """Flushes and shuts the worker processes down."""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_ACTIVE = None
+
+
+def get_plot_pool():
+    """The process-wide pool, created from ENSEMBLE_PLOTS (default 'async') on first use."""
+    global _ACTIVE
+    if _ACTIVE is None:
+        _ACTIVE = PlotPool(mode=os.environ.get("ENSEMBLE_PLOTS", "async"))
+    return _ACTIVE
+
+
+def set_plot_mode(mode, **kwargs):
+    """Replaces the process-wide pool (closing the old one) and returns the new one."""
+    global _ACTIVE
+    if _ACTIVE is not None:
+        _ACTIVE.close()
+    _ACTIVE = PlotPool(mode=mode, **kwargs)
+    return _ACTIVE
+
+
+def submit_plot(renderer, path, description="plot", **data):
+    """submit() on the process-wide pool."""
+    return get_plot_pool().submit(renderer, path, description, **data)
+
+
+def flush_plots(timeout=None):
+    """Waits for every queued plot of the process-wide pool."""
+    if _ACTIVE is None:
+        return []
+    return _ACTIVE.flush(timeout)
+
+
+def render_deferred(spool_dir=None, max_workers=None):
+    """
+    Renders (and removes) every job written by a 'deferred' pool.
+
+    Returns:
+        list: Rendered paths
+    """
+    jobs = sorted(glob.glob(os.path.join(spool_dir or DEFAULT_SPOOL_DIR, "*.pkl")))
+    if not jobs:
+        return []
+    pool = PlotPool(mode="async" if len(jobs) > 1 else "sync", max_workers=max_workers)
+    # Tracked per job file: repeat runs spool several jobs for the same output path
+    submitted = []
+    for job_path in jobs:
+        with open(job_path, "rb") as f:
+            renderer, path, data = pickle.load(f)
+        try:
+            submitted.append((job_path, path, pool.submit(renderer, path, os.path.basename(path), **data)))
+        except Exception as e:
+            logger.error(f"Rendering {path} failed: {e}")
+    pool.flush()
+    pool.close()
+    rendered = []
+    for job_path, path, result in submitted:
+        # Failed jobs stay in the spool for another attempt
+        if hasattr(result, "exception") and result.exception() is not None:
+            continue
+        rendered.append(path)
+        try:
+            os.remove(job_path)
+        except FileNotFoundError:
+            pass
+    return rendered
+
+
+@atexit.register
+def _close_active():
+    # Scripts that never flush still get their queued plots
+    if _ACTIVE is not None:
+        _ACTIVE.close()
+
+
+if __name__ == "__main__":
+    render_deferred()
@@ -0,0 +1,254 @@
+# utils/results_store.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Embedded SQLite results store (WAL mode) for experiment runs. Each run's
+#              strategy, metric and confusion-matrix records are buffered in memory and
+#              written in one transaction, so parallel experiments can share one database
+#              safely. Query helpers replace parsing summary CSVs and per-strategy text files.
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from config import RESULTS_DIR
+
+DEFAULT_DB_PATH = os.path.join(RESULTS_DIR, "results.db")
+BUSY_TIMEOUT_MS = 30_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    experiment  TEXT,
+    dataset     TEXT,
+    started_at  TEXT,
+    finished_at TEXT,
+    status      TEXT,
+    params      TEXT
+);
+CREATE TABLE IF NOT EXISTS strategies (
+    run_id     TEXT NOT NULL REFERENCES runs(run_id),
+    dataset    TEXT,
+    strategy   TEXT NOT NULL,
+    models     TEXT,
+    report     TEXT,
+    created_at TEXT,
+    PRIMARY KEY (run_id, strategy)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id     TEXT NOT NULL REFERENCES runs(run_id),
+    dataset    TEXT,
+    strategy   TEXT,
+    model      TEXT,
+    metric     TEXT NOT NULL,
+    value      REAL,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS confusion_matrices (
+    run_id     TEXT NOT NULL REFERENCES runs(run_id),
+    strategy   TEXT NOT NULL,
+    labels     TEXT,
+    matrix     TEXT,
+    PRIMARY KEY (run_id, strategy)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_dataset_time ON runs(dataset, started_at);
+CREATE INDEX IF NOT EXISTS idx_strategies_dataset ON strategies(dataset, strategy, created_at);
+CREATE INDEX IF NOT EXISTS idx_metrics_lookup ON metrics(dataset, strategy, metric, created_at);
+CREATE INDEX IF NOT EXISTS idx_metrics_run ON metrics(run_id);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec="milliseconds")
+
+
+class RunBatch:
+    """
+    Buffers the records of one run; ResultsStore.run() flushes them in a
+    single transaction when the block exits.
+    """
+
+    def __init__(self, run_id, experiment, dataset, params):
+        self.run_id = run_id
+        self.experiment = experiment
+        self.dataset = dataset
+        self.params = params
+        self.started_at = _now()
+        self.strategies = []
+        self.metrics = []
+        self.confusion_matrices = []
+
+    def add_strategy(self, strategy, models=None, report=None):
+        self.strategies.append((self.run_id, self.dataset, strategy,
+                                json.dumps(list(models or [])), report, _now()))
+
+    def add_metric(self, metric, value, strategy=None, model=None):
+        self.metrics.append((self.run_id, self.dataset, strategy, model, metric,
+                             None if value is None else float(value), _now()))
+
+    def add_confusion_matrix(self, strategy, matrix, labels=None):
+        labels = None if labels is None else np.asarray(labels).tolist()
+        self.confusion_matrices.append((self.run_id, strategy, json.dumps(labels),
+                                        json.dumps(np.asarray(matrix).tolist())))
+
+
+class ResultsStore:
+    """
+    SQLite-backed store of experiment results. Connections are short-lived
+    and the database runs in WAL mode with a busy timeout, so several
+    processes can write and read concurrently.
+    """
+
+    def __init__(self, path=None):
+        """
+        Parameters:
+            path (str): Database file, defaults to results/results.db
+        """
+        self.path = path or DEFAULT_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _write(self, statements):
+        """Runs (sql, rows) pairs in one IMMEDIATE transaction, retrying on lock contention."""
+        for attempt in range(5):
+            try:
+                with self._connect() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        for sql, rows in statements:
+                            if rows:
+                                conn.executemany(sql, rows)
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                return
+            except sqlite3.OperationalError as exc:
+                if "locked" not in str(exc) or attempt == 4:
+                    raise
+                time.sleep(0.1 * (attempt + 1))
+
+    @contextmanager
+    def run(self, run_id, experiment=None, dataset=None, params=None):
+        """
+        Collects one run's records and writes them together on exit. The run
+        is stored with status 'completed', or 'failed' if the block raised.
+
+            with store.run(run_id, experiment="bagging_linear_clf", dataset="iris") as run:
+                run.add_metric("accuracy", 0.93, strategy="hard_voting")
+        """
+        batch = RunBatch(run_id, experiment, dataset, params or {})
+        status = "completed"
+        try:
+            yield batch
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            self.write_batch(batch, status)
+
+    def write_batch(self, batch, status="completed"):
+        """
+        Writes a RunBatch in a single transaction. Re-writing a run_id (a resumed
+        or retried grid cell) replaces its earlier records instead of adding to them.
+        """
+        run_row = (batch.run_id, batch.experiment, batch.dataset, batch.started_at, _now(),
+                   status, json.dumps(batch.params, default=str))
+        run_key = [(batch.run_id,)]
+        self._write([
+            ("DELETE FROM metrics WHERE run_id = ?", run_key),
+            ("DELETE FROM strategies WHERE run_id = ?", run_key),
+            ("DELETE FROM confusion_matrices WHERE run_id = ?", run_key),
+            ("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)", [run_row]),
+            ("INSERT OR REPLACE INTO strategies VALUES (?, ?, ?, ?, ?, ?)", batch.strategies),
+            ("INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?)", batch.metrics),
+            ("INSERT OR REPLACE INTO confusion_matrices VALUES (?, ?, ?, ?)", batch.confusion_matrices),
+        ])
+
+    # === Query helpers ===
+
+    def query(self, sql, params=()):
+        """Runs a read query and returns a list of dicts."""
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def runs(self, dataset=None, experiment=None, status=None, limit=None):
+        """Runs, newest first, optionally filtered."""
+        clauses, params = [], []
+        for column, value in (("dataset", dataset), ("experiment", experiment), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY started_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        rows = self.query(sql, params)
+        for row in rows:
+            row["params"] = json.loads(row["params"]) if row["params"] else {}
+        return rows
+
+    def metric_history(self, metric="accuracy", dataset=None, strategy=None, model=None):
+        """Every recorded value of a metric over time (oldest first)."""
+        clauses, params = ["metric = ?"], [metric]
+        for column, value in (("dataset", dataset), ("strategy", strategy), ("model", model)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return self.query(
+            "SELECT run_id, dataset, strategy, model, value, created_at FROM metrics WHERE "
+            + " AND ".join(clauses) + " ORDER BY created_at", params)
+
+    def strategy_summary(self, metric="accuracy", dataset=None):
+        """Per dataset/strategy: number of runs, mean/best/latest value of a metric."""
+        where, params = "metric = ? AND model IS NULL", [metric]
+        if dataset is not None:
+            where += " AND dataset = ?"
+            params.append(dataset)
+        return self.query(f"""
+            SELECT dataset, strategy, COUNT(DISTINCT run_id) AS n_runs, AVG(value) AS mean_value,
+                   MAX(value) AS best_value,
+                   (SELECT m2.value FROM metrics m2
+                     WHERE m2.metric = m.metric AND m2.model IS NULL
+                       AND m2.dataset IS m.dataset AND m2.strategy IS m.strategy
+                     ORDER BY m2.created_at DESC LIMIT 1) AS latest_value
+            FROM metrics m WHERE {where}
+            GROUP BY dataset, strategy ORDER BY dataset, mean_value DESC""", params)
+
+    def confusion_matrix(self, run_id, strategy):
+        """Returns (matrix ndarray, labels) for a run/strategy, or None."""
+        rows = self.query("SELECT labels, matrix FROM confusion_matrices WHERE run_id = ? AND strategy = ?",
+                          (run_id, strategy))
+        if not rows:
+            return None
+        return np.asarray(json.loads(rows[0]["matrix"])), json.loads(rows[0]["labels"])
+
+    def report(self, run_id, strategy):
+        """The stored text classification report for a run/strategy, or None."""
+        rows = self.query("SELECT report FROM strategies WHERE run_id = ? AND strategy = ?",
+                          (run_id, strategy))
+        return rows[0]["report"] if rows else None
+
+    def to_dataframe(self, rows):
+        """Converts query-helper output to a pandas DataFrame."""
+        import pandas as pd
+
+        return pd.DataFrame(rows)
@@ -0,0 +1,72 @@
+# utils/run_records.py
+# Authors: David Blodgett and Microsoft Copilot
+# Description: Structured JSON-lines run records. Experiments emit one JSON object per
+#              metric/event into logs/run_<run_id>.jsonl so summaries never have to
+#              regex-scan free-form log text.
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+from config import LOGS_DIR
+
+RECORD_FILE_PREFIX = "run_"
+RECORD_FILE_SUFFIX = ".jsonl"
+
+
+def new_run_id():
+    """Sortable, collision-safe run identifier (timestamp + short random suffix)."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class RunRecorder:
+    """
+    Appends structured records for one run. Every record carries the run id,
+    a timestamp and the fixed context given at construction (e.g. experiment,
+    dataset), plus the fields passed to record().
+    """
+
+    def __init__(self, run_id=None, logs_dir=None, **context):
+        """
+        Parameters:
+            run_id (str): Run identifier, generated when omitted
+            logs_dir (str): Directory for the .jsonl file, defaults to LOGS_DIR
+            **context: Fields added to every record (experiment, dataset, ...)
+        """
+        self.run_id = run_id or new_run_id()
+        self.context = context
+        self.path = os.path.join(logs_dir or LOGS_DIR,
+                                 f"{RECORD_FILE_PREFIX}{self.run_id}{RECORD_FILE_SUFFIX}")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def record(self, kind, **fields):
+        """
+        Writes one record.
+
+        Parameters:
+            kind (str): Record type, e.g. 'metric', 'event' or 'error'
+            **fields: Payload, e.g. strategy='hard_voting', metric='accuracy', value=0.93
+        """
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"),
+                  "run_id": self.run_id, "kind": kind, **self.context, **fields}
+        line = json.dumps(record, default=_to_json)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+        return record
+
+    def metric(self, metric, value, **fields):
+        """Shorthand for record('metric', metric=..., value=...)."""
+        return self.record("metric", metric=metric, value=float(value), **fields)
+
+    def error(self, message, **fields):
+        return self.record("error", message=message, **fields)
+
+
+def _to_json(value):
+    """Fallback encoder for NumPy scalars/arrays and other objects."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
@@ -2,11 +2,15 @@
 # Authors: David Blodgett and Microsoft Copilot
 # Description: Contains visualization utilities for model evaluation results,
 #              including confusion matrix plots and accuracy comparison graphs.
+#              plot_* functions prepare the data and submit a render_* job to the
+#              plot pool, which renders in the background (or inline/later/never).
 
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import confusion_matrix
+
+from utils.plot_pool import submit_plot
+
+# matplotlib/seaborn are imported inside the render_* functions, which run in
+# the plot pool (see utils/plot_pool.py), so importing this module stays cheap
 
 def get_plot_path(subdir, filename):
     """
@@ -23,21 +27,20 @@ def get_plot_path(subdir, filename):
     os.makedirs(plot_dir, exist_ok=True)
     return os.path.join(plot_dir, filename)
 
-def plot_strategy_accuracies(strategy_scores):
-    """
-    Plots a bar chart of accuracies per voting strategy.
+def render_strategy_accuracies(path, strategy_scores, label="Accuracy"):
+    """Draws the strategy accuracy (or other score) bar chart to `path` (runs in a plot worker)."""
+    if not strategy_scores:
+        return
+    import matplotlib.pyplot as plt
 
-    Parameters:
-    strategy_scores (dict): Strategy name mapped to accuracy score.
-    """
     strategies = list(strategy_scores.keys())
     accuracies = list(strategy_scores.values())
 
     plt.figure(figsize=(8, 5))
     bars = plt.bar(strategies, accuracies, color='skyblue')
-    plt.ylim(0, 1)
-    plt.ylabel("Accuracy")
-    plt.title("Accuracy by Voting Strategy")
+    plt.ylim(min(0, min(accuracies)), 1)
+    plt.ylabel(label)
+    plt.title(f"{label} by {'Voting ' if label == 'Accuracy' else ''}Strategy")
 
     # Add value labels above bars
     for bar in bars:
@@ -46,13 +49,45 @@ def plot_strategy_accuracies(strategy_scores):
                  ha='center', va='bottom', fontsize=10)
 
     plt.tight_layout()
-    filename = f"{'_'.join(strategies)}_accuracy.png"
-    path = get_plot_path("utils", filename)
     plt.savefig(path)
     plt.close()
-    print(f" Saved strategy accuracy plot to: {path}")
 
-def plot_confusion_matrix(y_true, y_pred, title="Confusion Matrix"):
+def render_confusion_matrix(path, cm, title="Confusion Matrix", labels=None):
+    """Draws a confusion matrix heatmap to `path` (runs in a plot worker)."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    ticks = "auto" if labels is None else list(labels)
+    plt.figure(figsize=(6, 5))
+    sns.heatmap(cm, annot=True, fmt='d', cmap="Blues", cbar=False,
+                xticklabels=ticks, yticklabels=ticks)
+    plt.xlabel("Predicted")
+    plt.ylabel("Actual")
+    plt.title(title)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+def plot_strategy_accuracies(strategy_scores, metric="accuracy", label="Accuracy"):
+    """
+    Plots a bar chart of accuracies per voting strategy.
+
+    Parameters:
+    strategy_scores (dict): Strategy name mapped to accuracy score.
+    metric (str): Metric name used in the file name (e.g. 'r2' for regression).
+    label (str): Axis label for the metric.
+
+    Returns:
+    None when there are no scores (every strategy failed); nothing is drawn.
+    """
+    if not strategy_scores:
+        return None
+    filename = f"{'_'.join(strategy_scores.keys())}_{metric}.png"
+    path = get_plot_path("utils", filename)
+    return submit_plot(render_strategy_accuracies, path, f"strategy {metric} plot",
+                       strategy_scores=dict(strategy_scores), label=label)
+
+def plot_confusion_matrix(y_true, y_pred, title="Confusion Matrix", cm=None, labels=None):
     """
     Displays a heatmap of the confusion matrix.
 
@@ -60,16 +95,42 @@ def plot_confusion_matrix(y_true, y_pred, title="Confusion Matrix"):
     y_true (array-like): Ground truth labels.
     y_pred (array-like): Predicted labels.
     title (str): Title for the plot.
+    cm (array-like): Precomputed confusion matrix (skips recomputing it from y_true/y_pred).
+    labels (array-like): Class labels for the axes.
     """
-    cm = confusion_matrix(y_true, y_pred)
-    plt.figure(figsize=(6, 5))
-    sns.heatmap(cm, annot=True, fmt='d', cmap="Blues", cbar=False)
-    plt.xlabel("Predicted")
-    plt.ylabel("Actual")
-    plt.title(title)
-    plt.tight_layout()
+    # numpy is only needed here; a module-level import would break the import budget
+    import numpy as np
+
+    if cm is None:
+        from sklearn.metrics import confusion_matrix
+
+        cm = confusion_matrix(y_true, y_pred)
     filename = f"{title.replace(' ', '_').lower()}.png"
     path = get_plot_path("utils", filename)
-    plt.savefig(path)
-    plt.close()
-    print(f" Saved confusion matrix to: {path}")
+    return submit_plot(render_confusion_matrix, path, "confusion matrix",
+                       cm=np.asarray(cm), title=title, labels=labels)
+
+def plot_run_from_store(run_id, store=None):
+    """
+    Redraws a run's confusion matrices and strategy accuracy chart from the
+    results store (for runs executed with plots off or deferred).
+
+    Parameters:
+    run_id (str): Run identifier in the results store.
+    store (ResultsStore): Store to read, defaults to results/results.db.
+    """
+    from utils.results_store import ResultsStore
+
+    store = store or ResultsStore()
+    scores = {}
+    for row in store.query("SELECT strategy, value FROM metrics WHERE run_id = ? AND metric = ? "
+                           "AND model IS NULL ORDER BY created_at", (run_id, "accuracy")):
+        scores[row["strategy"]] = row["value"]
+        stored = store.confusion_matrix(run_id, row["strategy"])
+        if stored is not None:
+            cm, labels = stored
+            plot_confusion_matrix(None, None, title=f"{row['strategy']} Confusion Matrix",
+                                  cm=cm, labels=labels)
+    if scores:
+        plot_strategy_accuracies(scores)
+    return scores